@@ -0,0 +1,197 @@
+# Importing all needed modules.
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs
+from service_registry import ServiceRegistry
+from registry_store import RegistryStore
+from metrics import RouteMetrics
+
+# Creation of the Service registry, restored from the store after a restart.
+# Every running registry needs its own directory, REGISTRY_DATA_DIR overrides the default of this mode.
+service_registry = ServiceRegistry(RegistryStore(os.environ.get("REGISTRY_DATA_DIR", os.path.join("registry_data", "asgi"))))
+
+# The metrics of the routes, created once at the start.
+route_metrics = {
+    route : RouteMetrics(service_registry.metrics, route)
+    for route in ("create", "read", "watch", "query", "suspicion", "update", "delete", "heartbeat", "heartbeats", "other")
+}
+
+# The event set (and replaced) on every change of the registry, awaited by the long-polls.
+registry_changed = None
+
+# The threads running the calls of the registry that take its locks: the writes, which also write its log
+# and snapshots, the queries and the suspicion levels. The event loop keeps serving the snapshot reads
+# and the watchers meanwhile.
+registry_threads = ThreadPoolExecutor(max_workers=8)
+
+
+async def read_json(receive):
+    '''
+        This function reads the whole request body and decodes it.
+    :param receive: callable
+        The ASGI receive function.
+    :return: dict or None
+        The decoded body or None if the body is empty.
+    '''
+    body, more_body = b"", True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return json.loads(body) if body else None
+
+async def send_response(send, response, status_code : int, content_type : bytes = b"application/json"):
+    '''
+        This function sends a JSON response.
+    :param send: callable
+        The ASGI send function.
+    :param response: dict or bytes
+        The response, the bytes are sent as already encoded JSON.
+    :param status_code: int
+        The status code.
+    :param content_type: bytes, default = b"application/json"
+        The content type of the response.
+    '''
+    body = response if isinstance(response, bytes) else json.dumps(response).encode("utf-8")
+    await send({
+        "type" : "http.response.start",
+        "status" : status_code,
+        "headers" : [(b"content-type", content_type), (b"content-length", str(len(body)).encode())]
+    })
+    await send({"type" : "http.response.body", "body" : body})
+
+async def run_blocking(function, *args):
+    '''
+        This function runs a call of the registry taking its locks in the registry threads and waits for its result.
+    '''
+    return await asyncio.get_running_loop().run_in_executor(registry_threads, function, *args)
+
+async def watch(since : int, timeout : float):
+    '''
+        This function waits for the registry changes without holding a thread, otherwise it works
+        like ServiceRegistry.watch.
+    :param since: int
+        The last revision known by the client.
+    :param timeout: float
+        The maximal number of seconds to wait for changes.
+    :return: dict, int
+        The changes or the full snapshot.
+        The status code.
+    '''
+    deadline = time.monotonic() + timeout
+    while service_registry.change_log.since(since) == [] and time.monotonic() < deadline:
+        try:
+            await asyncio.wait_for(registry_changed.wait(), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            break
+    return service_registry.watch(since, 0)
+
+async def check_heartbeats():
+    '''
+        This function schedules the heartbeat checks from the event loop, the expired services are logged
+        by the registry threads.
+    '''
+    while True:
+        await run_blocking(service_registry.sweep_heartbeats)
+        await asyncio.sleep(service_registry.check_interval)
+
+async def lifespan(receive, send):
+    '''
+        This function starts the heartbeat checks and the change notifications with the server.
+    '''
+    global registry_changed
+    checker = None
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            loop = asyncio.get_running_loop()
+            registry_changed = asyncio.Event()
+
+            def notify_watchers():
+                # Waking up the current watchers, the next ones wait on a fresh event.
+                global registry_changed
+                changed, registry_changed = registry_changed, asyncio.Event()
+                changed.set()
+
+            # The changes can be made from other threads, so the watchers are woken up through the loop.
+            service_registry.change_log.add_listener(lambda revision: loop.call_soon_threadsafe(notify_watchers))
+            checker = asyncio.create_task(check_heartbeats())
+            await send({"type" : "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            if checker is not None:
+                checker.cancel()
+            registry_threads.shutdown(wait=True)
+            await send({"type" : "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    '''
+        The ASGI application serving the same API as main.py.
+    '''
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    method, path = scope["method"], scope["path"]
+    if path == "/metrics" and method == "GET":
+        await send_response(send, service_registry.metrics.render().encode("utf-8"), 200, b"text/plain; version=0.0.4")
+        return
+
+    args = parse_qs(scope["query_string"].decode("utf-8"))
+    start, route = time.perf_counter(), "other"
+    try:
+        if path == "/service":
+            request_body = await read_json(receive)
+            if method == "POST":
+                route = "create"
+                response, status_code = await run_blocking(service_registry.create, request_body)
+            elif method == "GET" and request_body is not None:
+                route = "read"
+                response, status_code = service_registry.read_some(request_body["services"])
+            elif method == "GET":
+                route = "read"
+                response, status_code = service_registry.read_all()
+            elif method == "PUT":
+                route = "update"
+                response, status_code = await run_blocking(service_registry.update, request_body)
+            elif method == "DELETE":
+                route = "delete"
+                response, status_code = await run_blocking(service_registry.delete, request_body)
+            else:
+                response, status_code = {"message" : "Method not allowed!"}, 405
+        elif path == "/service/watch" and method == "GET":
+            route = "watch"
+            since = int(args.get("since", ["-1"])[0])
+            timeout = min(float(args.get("timeout", ["30"])[0]), 60)
+            response, status_code = await watch(since, timeout)
+        elif path == "/service/query" and method == "GET":
+            route = "query"
+            filters = {field : [value for values in values_list for value in values.split(",")] for field, values_list in args.items()}
+            response, status_code = await run_blocking(service_registry.query, filters)
+        elif path == "/service/suspicion" and method == "GET":
+            route = "suspicion"
+            names = args.get("services", [""])[0]
+            response, status_code = await run_blocking(service_registry.suspicion, names.split(",") if names else None)
+        elif path == "/heartbeat" and method == "POST":
+            route = "heartbeats"
+            request_body = await read_json(receive)
+            response, status_code = await run_blocking(service_registry.add_heartbeats, request_body["services"])
+        elif path.startswith("/heartbeat/") and method == "POST":
+            route = "heartbeat"
+            response, status_code = await run_blocking(service_registry.add_heartbeat, path[len("/heartbeat/"):])
+        else:
+            response, status_code = {"message" : "Not found!"}, 404
+    except (KeyError, TypeError, ValueError):
+        response, status_code = {"message" : "Bad request!"}, 400
+    route_metrics[route].record(time.perf_counter() - start, status_code)
+    await send_response(send, response, status_code)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Running the main service on the asyncio event loop.
+    uvicorn.run(app, host="127.0.0.1", port=5000, log_level="warning")
\ No newline at end of file
@@ -0,0 +1,106 @@
+class AttributeIndex:
+    def __init__(self, fields : tuple = ("tags", "host", "zone", "version")):
+        '''
+            The constructor of the Attribute Index.
+            The index keeps for every indexed field of the registration the names of the services having
+            each value, so the services can be filtered without scanning the whole registry.
+        :param fields: tuple, default = ("tags", "host", "zone", "version")
+            The indexed fields of the registration.
+        '''
+        self.fields = fields
+        self.index = {field : {} for field in fields}
+
+    def values(self, service : dict, field : str) -> set:
+        '''
+            This function returns the indexed values of a field of the service.
+            The list fields (like tags) are indexed by every element, the values are indexed as strings
+            because the queries come from the url parameters.
+        :param service: dict
+            The information of the service.
+        :param field: str
+            The indexed field.
+        :return: set
+            The values of the field.
+        '''
+        value = service.get(field)
+        if value is None:
+            return set()
+        if isinstance(value, (list, tuple, set)):
+            return {str(element) for element in value}
+        return {str(value)}
+
+    def add(self, name : str, service : dict):
+        '''
+            This function adds a service to the index.
+        :param name: str
+            The name of the service.
+        :param service: dict
+            The information of the service.
+        '''
+        for field in self.fields:
+            for value in self.values(service, field):
+                self.index[field].setdefault(value, set()).add(name)
+
+    def remove(self, name : str, service : dict):
+        '''
+            This function removes a service from the index.
+        :param name: str
+            The name of the service.
+        :param service: dict
+            The information of the service as it was indexed.
+        '''
+        for field in self.fields:
+            for value in self.values(service, field):
+                names = self.index[field].get(value)
+                if names is not None:
+                    names.discard(name)
+                    # Dropping the empty entries, so the index doesn't grow with the values seen in the past.
+                    if not names:
+                        del self.index[field][value]
+
+    def replace(self, name : str, old_service : dict, new_service : dict):
+        '''
+            This function moves a service to its new values, touching only the fields that changed.
+        :param name: str
+            The name of the service.
+        :param old_service: dict
+            The information of the service as it was indexed.
+        :param new_service: dict
+            The new information of the service.
+        '''
+        for field in self.fields:
+            old_values, new_values = self.values(old_service, field), self.values(new_service, field)
+            for value in old_values - new_values:
+                names = self.index[field][value]
+                names.discard(name)
+                if not names:
+                    del self.index[field][value]
+            for value in new_values - old_values:
+                self.index[field].setdefault(value, set()).add(name)
+
+    def query(self, filters : dict) -> set:
+        '''
+            This function returns the names of the services matching the filters.
+            The services must match every field of the filters and any of the values given for a field.
+        :param filters: dict
+            The dictionary mapping the indexed fields to the lists of accepted values.
+        :return: set
+            The names of the matching services.
+        '''
+        # Collecting for every field the services having any of the accepted values.
+        candidates = []
+        for field, accepted_values in filters.items():
+            field_index = self.index[field]
+            matches = [field_index[value] for value in accepted_values if value in field_index]
+            if not matches:
+                return set()
+            candidates.append(matches[0] if len(matches) == 1 else set().union(*matches))
+
+        # Intersecting the candidates starting from the smallest set.
+        candidates.sort(key=len)
+        result = set(candidates[0]) if candidates else set()
+        for names in candidates[1:]:
+            result &= names
+            if not result:
+                break
+        return result
\ No newline at end of file
@@ -0,0 +1,117 @@
+# Importing all needed modules.
+import argparse
+import contextlib
+import io
+import statistics
+import threading
+import time
+from service_registry import ServiceRegistry
+
+
+def build_registry(services_count : int, expired_ratio : float) -> ServiceRegistry:
+    '''
+        This function creates a Service Registry filled with services.
+    :param services_count: int
+        The number of registered services.
+    :param expired_ratio: float
+        The share of services whose deadline has already passed.
+    :return: ServiceRegistry
+        The filled Service Registry.
+    '''
+    service_registry = ServiceRegistry()
+    for index in range(services_count):
+        service_registry.create({"name" : f"service-{index}", "host" : "127.0.0.1", "port" : index})
+
+    # Moving the heartbeats of a share of services in the past, so the sweeps have work to do.
+    for index in range(int(services_count * expired_ratio)):
+        name = f"service-{index}"
+        service_registry.heartbeats[name] -= 2 * service_registry.time_threashold
+        service_registry.expiry_index.schedule(name, service_registry.heartbeats[name] + service_registry.time_threashold)
+    return service_registry
+
+def full_scan(service_registry : ServiceRegistry) -> int:
+    '''
+        This function reproduces the full scan of the heartbeats done before the expiry index.
+    :param service_registry: ServiceRegistry
+        The Service Registry to scan.
+    :return: int
+        The number of dead services.
+    '''
+    dead = 0
+    service_registry.heartbeats_lock.acquire()
+    for service in service_registry.heartbeats:
+        if time.time() - service_registry.heartbeats[service] > service_registry.time_threashold:
+            dead += 1
+    service_registry.heartbeats_lock.release()
+    return dead
+
+def percentile(values : list, q : float) -> float:
+    '''
+        This function returns the q-th percentile of the values.
+    '''
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q / 100 * len(values)))]
+
+def measure(services_count : int, sweep, expired_ratio : float, heartbeats_count : int) -> dict:
+    '''
+        This function measures the cost of a sweep and the heartbeat latency while sweeps run back to back.
+    :param services_count: int
+        The number of registered services.
+    :param sweep: callable
+        The sweep function taking the Service Registry.
+    :param expired_ratio: float
+        The share of services whose deadline has already passed.
+    :param heartbeats_count: int
+        The number of heartbeats sent while sweeping.
+    :return: dict
+        The measured values in milliseconds.
+    '''
+    service_registry = build_registry(services_count, expired_ratio)
+
+    # Measuring the cost of a single sweep.
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sweep(service_registry)
+    sweep_ms = (time.perf_counter() - start) * 1000
+
+    # Running the sweeps in a loop, as a stress version of the checker thread.
+    stop = threading.Event()
+    def sweeper():
+        with contextlib.redirect_stdout(io.StringIO()):
+            while not stop.is_set():
+                sweep(service_registry)
+                time.sleep(0.001)
+    thread = threading.Thread(target=sweeper)
+    thread.start()
+
+    # Sending the heartbeats and measuring their latency.
+    latencies = []
+    for index in range(heartbeats_count):
+        name = f"service-{index % services_count}"
+        start = time.perf_counter()
+        service_registry.add_heartbeat(name)
+        latencies.append((time.perf_counter() - start) * 1000)
+    stop.set()
+    thread.join()
+
+    return {
+        "sweep_ms" : sweep_ms,
+        "heartbeat_p50_ms" : statistics.median(latencies),
+        "heartbeat_p99_ms" : percentile(latencies, 99),
+        "heartbeat_max_ms" : max(latencies)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the heartbeat expiry checks.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--expired-ratio", type=float, default=0.01)
+    parser.add_argument("--heartbeats", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'services':>10} {'mode':>12} {'sweep ms':>10} {'hb p50 ms':>10} {'hb p99 ms':>10} {'hb max ms':>10}")
+    for services_count in args.sizes:
+        for mode, sweep in (("full scan", full_scan), ("expiry index", ServiceRegistry.sweep_heartbeats)):
+            result = measure(services_count, sweep, args.expired_ratio, args.heartbeats)
+            print(f"{services_count:>10} {mode:>12} {result['sweep_ms']:>10.3f} "
+                  f"{result['heartbeat_p50_ms']:>10.4f} {result['heartbeat_p99_ms']:>10.4f} {result['heartbeat_max_ms']:>10.3f}")
\ No newline at end of file
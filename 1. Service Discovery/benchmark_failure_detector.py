@@ -0,0 +1,111 @@
+# Importing all needed modules.
+import argparse
+import random
+import statistics
+from failure_detector import PhiAccrualDetector
+
+
+class FixedThresholdDetector:
+    def __init__(self, threshold : float = 30):
+        '''
+            The constructor of the Fixed Threshold Detector, the check used before the phi accrual detector.
+        :param threshold: float, default = 30
+            The number of seconds of silence after which the service is considered dead.
+        '''
+        self.threshold = threshold
+        self.last = None
+
+    def heartbeat(self, now : float):
+        self.last = now
+
+    def deadline(self, fallback : float) -> float:
+        return self.last + self.threshold
+
+
+def generate_trace(interval : float, jitter : float, pause_probability : float, pause_range : tuple, beats : int) -> list:
+    '''
+        This function generates the heartbeat timestamps of a service that dies after the last one.
+    :param interval: float
+        The mean interval between the heartbeats.
+    :param jitter: float
+        The standard deviation of the intervals as a share of the interval.
+    :param pause_probability: float
+        The probability that a heartbeat is delayed by a pause (like a garbage collection or a network hiccup).
+    :param pause_range: tuple
+        The minimal and maximal length of a pause in seconds.
+    :param beats: int
+        The number of heartbeats.
+    :return: list
+        The timestamps of the heartbeats.
+    '''
+    timestamps, now = [], 0.0
+    for _ in range(beats):
+        now += max(random.gauss(interval, interval * jitter), 0.001)
+        if random.random() < pause_probability:
+            now += random.uniform(*pause_range)
+        timestamps.append(now)
+    return timestamps
+
+def evaluate(detector_factory, traces : list) -> dict:
+    '''
+        This function replays the traces through the detectors.
+    :param detector_factory: callable
+        The function creating a detector for a service.
+    :param traces: list
+        The heartbeat timestamps of the services.
+    :return: dict
+        The false positive rate and the detection times.
+    '''
+    false_positives, intervals, detection_times = 0, 0, []
+    for trace in traces:
+        detector = detector_factory()
+        for index, timestamp in enumerate(trace):
+            # A heartbeat arriving after the deadline means the live service was declared dead.
+            if index > 0:
+                intervals += 1
+                if timestamp > detector.deadline(30):
+                    false_positives += 1
+            detector.heartbeat(timestamp)
+
+        # The service dies after the last heartbeat, the deadline tells when it is noticed.
+        detection_times.append(detector.deadline(30) - trace[-1])
+    detection_times.sort()
+    return {
+        "false_positive_rate" : false_positives / intervals,
+        "detection_mean" : statistics.mean(detection_times),
+        "detection_p99" : detection_times[int(0.99 * (len(detection_times) - 1))]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the failure detectors on synthetic heartbeat traces.")
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--beats", type=int, default=300)
+    parser.add_argument("--pause-probability", type=float, default=0.01)
+    args = parser.parse_args()
+
+    random.seed(0)
+    scenarios = {
+        "fast, steady (1 s, 5% jitter)" : (1.0, 0.05),
+        "fast, jittery (1 s, 40% jitter)" : (1.0, 0.4),
+        "slow, jittery (10 s, 30% jitter)" : (10.0, 0.3)
+    }
+    detectors = {
+        "fixed 30 s" : FixedThresholdDetector,
+        "phi 8 no pause" : lambda: PhiAccrualDetector(threshold=8, acceptable_pause=0.0),
+        "phi 3" : lambda: PhiAccrualDetector(threshold=3),
+        "phi 8" : lambda: PhiAccrualDetector(threshold=8),
+        "phi 12" : lambda: PhiAccrualDetector(threshold=12)
+    }
+
+    print(f"{'scenario':<34} {'detector':<14} {'false positives':>16} {'detect mean s':>14} {'detect p99 s':>13}")
+    for scenario, (interval, jitter) in scenarios.items():
+        # Pauses of 2 to 5 intervals are injected into the traces.
+        traces = [
+            generate_trace(interval, jitter, args.pause_probability, (2 * interval, 5 * interval), args.beats)
+            for _ in range(args.services)
+        ]
+        for name, detector_factory in detectors.items():
+            result = evaluate(detector_factory, traces)
+            print(f"{scenario:<34} {name:<14} {result['false_positive_rate']:>16.5f} "
+                  f"{result['detection_mean']:>14.2f} {result['detection_p99']:>13.2f}")
\ No newline at end of file
@@ -0,0 +1,75 @@
+# Importing all needed modules.
+import argparse
+import random
+import time
+import tracemalloc
+from attribute_index import AttributeIndex
+from service_registry import ServiceRegistry
+
+
+def random_service(index : int) -> dict:
+    '''
+        This function generates the registration of a service.
+    '''
+    return {
+        "name" : f"service-{index}",
+        "host" : f"10.0.{index % 250}.{index % 200}",
+        "port" : 8000 + index % 1000,
+        "zone" : random.choice(["a", "b", "c", "d"]),
+        "version" : random.choice(["1.0", "1.1", "2.0"]),
+        "tags" : random.sample(["cache", "db", "api", "web", "queue", "auth", "search", "ml"], 2)
+    }
+
+def full_scan(services, filters : dict) -> dict:
+    '''
+        This function filters the services by scanning all of them, as a client downloading read_all() would.
+    '''
+    index = AttributeIndex(tuple(filters))
+    return {
+        name : service
+        for name, service in services.items()
+        if all(index.values(service, field) & set(values) for field, values in filters.items())
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the attribute index of the Service Registry.")
+    parser.add_argument("--services", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+    registrations = [random_service(index) for index in range(args.services)]
+
+    # Measuring the memory taken by the index alone.
+    tracemalloc.start()
+    attribute_index = AttributeIndex()
+    for registration in registrations:
+        attribute_index.add(registration["name"], registration)
+    index_memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Index memory for {args.services} services: {index_memory / 2 ** 20:.1f} MiB")
+
+    service_registry = ServiceRegistry()
+    for registration in registrations:
+        service_registry.create(registration)
+
+    queries = [
+        {"tags" : ["cache"], "zone" : ["a"]},
+        {"tags" : ["cache"], "zone" : ["a"], "version" : ["2.0"]},
+        {"host" : ["10.0.7.7"]},
+        {"tags" : ["db", "queue"], "zone" : ["b", "c"]}
+    ]
+    print(f"{'query':<60} {'matches':>8} {'index ms':>9} {'scan ms':>9}")
+    for filters in queries:
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            response, _ = service_registry.query(filters)
+        index_ms = (time.perf_counter() - start) * 1000 / args.repeat
+
+        start = time.perf_counter()
+        scanned = full_scan(service_registry.services, filters)
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        assert scanned.keys() == response.keys()
+        print(f"{str(filters):<60} {len(response):>8} {index_ms:>9.3f} {scan_ms:>9.1f}")
\ No newline at end of file
@@ -0,0 +1,197 @@
+# Importing all needed modules.
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import threading
+import time
+from service_registry import ServiceRegistry
+from timed_lock import TimedLock
+
+
+class VirtualServices:
+    def __init__(self, services_count : int):
+        '''
+            The constructor of the Virtual Services, the names of the services currently registered by the harness.
+        :param services_count: int
+            The number of services registered at the start.
+        '''
+        self.names = [f"virtual-{index}" for index in range(services_count)]
+        self.next_index = services_count
+        self.lock = threading.Lock()
+
+    def pick(self) -> str:
+        '''
+            This function returns a random registered service.
+        '''
+        with self.lock:
+            return random.choice(self.names)
+
+    def replace(self):
+        '''
+            This function takes a random service out of the registered ones and names its replacement.
+        :return: str, str
+            The name of the leaving service.
+            The name of the joining service.
+        '''
+        with self.lock:
+            position = random.randrange(len(self.names))
+            leaving, joining = self.names[position], f"virtual-{self.next_index}"
+            self.names[position] = joining
+            self.next_index += 1
+            return leaving, joining
+
+
+def summarize(samples : list, duration : float = None) -> dict:
+    '''
+        This function summarizes the latency samples in milliseconds.
+    :param samples: list
+        The samples in seconds.
+    :param duration: float, default = None
+        The length of the run, used for the throughput.
+    :return: dict
+        The count, throughput and percentiles of the samples.
+    '''
+    samples = sorted(samples)
+    def percentile(q):
+        return samples[min(len(samples) - 1, int(q / 100 * len(samples)))] * 1000 if samples else None
+    summary = {
+        "count" : len(samples),
+        "p50_ms" : percentile(50),
+        "p90_ms" : percentile(90),
+        "p99_ms" : percentile(99),
+        "p999_ms" : percentile(99.9),
+        "max_ms" : samples[-1] * 1000 if samples else None
+    }
+    if duration is not None:
+        summary["per_second"] = len(samples) / duration
+    return summary
+
+def git_revision() -> str:
+    '''
+        This function returns the current git revision, so the results of different versions can be diffed.
+    '''
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return "unknown"
+
+def run(args) -> dict:
+    '''
+        This function runs the virtual services against an in-process registry.
+    :param args: argparse.Namespace
+        The configuration of the run.
+    :return: dict
+        The results of the run.
+    '''
+    random.seed(args.seed)
+    service_registry = ServiceRegistry()
+
+    # Measuring the wait and hold times of the heartbeats lock.
+    lock_waits, lock_holds = [], []
+    service_registry.heartbeats_lock = TimedLock(service_registry.heartbeats_lock, lock_waits.append, lock_holds.append)
+
+    # Registering the virtual services.
+    virtual_services = VirtualServices(args.services)
+    for name in virtual_services.names:
+        service_registry.create({"name" : name, "host" : "127.0.0.1", "port" : 0, "tags" : ["virtual"]})
+    lock_waits.clear()
+    lock_holds.clear()
+
+    # The operations with their rates per second, the churn replaces a service (deregister and register).
+    operations = {
+        "heartbeat" : (args.services / args.heartbeat_interval, lambda: service_registry.add_heartbeat(virtual_services.pick())),
+        "lookup" : (args.lookup_rate, lambda: service_registry.read_some([virtual_services.pick()])),
+        "read_all" : (args.read_all_rate, service_registry.read_all),
+        "churn" : (args.churn_rate, None)
+    }
+    latencies = {operation : [] for operation in operations}
+    latencies["register"], latencies["deregister"] = [], []
+    operations = {operation : spec for operation, spec in operations.items() if spec[0] > 0}
+    names, weights = list(operations), [operations[operation][0] for operation in operations]
+    total_rate = sum(weights)
+
+    def churn():
+        leaving, joining = virtual_services.replace()
+        start = time.perf_counter()
+        service_registry.delete({"name" : leaving})
+        latencies["deregister"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        service_registry.create({"name" : joining, "host" : "127.0.0.1", "port" : 0, "tags" : ["virtual"]})
+        latencies["register"].append(time.perf_counter() - start)
+
+    stop = threading.Event()
+    def worker():
+        # Pacing the operations, so all the workers together keep the configured rates.
+        interval = args.workers / total_rate
+        next_time = time.perf_counter()
+        while not stop.is_set():
+            operation = random.choices(names, weights)[0]
+            if operation == "churn":
+                churn()
+            else:
+                start = time.perf_counter()
+                operations[operation][1]()
+                latencies[operation].append(time.perf_counter() - start)
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    sweeps, dead_found = [], []
+    def sweeper():
+        while not stop.wait(args.check_interval):
+            start = time.perf_counter()
+            dead_found.extend(service_registry.sweep_heartbeats())
+            sweeps.append(time.perf_counter() - start)
+
+    # Running the workers and the heartbeat checks for the configured duration.
+    threads = [threading.Thread(target=worker) for _ in range(args.workers)] + [threading.Thread(target=sweeper)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+
+    return {
+        "revision" : git_revision(),
+        "python" : platform.python_version(),
+        "config" : vars(args),
+        "duration" : duration,
+        "operations" : {operation : summarize(samples, duration) for operation, samples in latencies.items() if samples},
+        "heartbeats_lock" : {
+            "wait" : summarize(lock_waits),
+            "hold" : summarize(lock_holds)
+        },
+        "sweeps" : dict(summarize(sweeps), dead_found=len(dead_found)),
+        "registry_size" : len(service_registry.services)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Heartbeat storm benchmark of the Service Registry.")
+    parser.add_argument("--services", type=int, default=10000)
+    parser.add_argument("--heartbeat-interval", type=float, default=1.0, help="seconds between the heartbeats of a service")
+    parser.add_argument("--lookup-rate", type=float, default=2000, help="lookups per second")
+    parser.add_argument("--read-all-rate", type=float, default=5, help="full registry reads per second")
+    parser.add_argument("--churn-rate", type=float, default=50, help="services replaced per second")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--check-interval", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None, help="the JSON file for the results, printed if not given")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w", encoding="utf-8") as output_file:
+            json.dump(results, output_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
\ No newline at end of file
@@ -0,0 +1,42 @@
+# Importing all needed modules.
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+from service_registry import ServiceRegistry
+from registry_store import RegistryStore
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark of the warm restart of the Service Registry.")
+    parser.add_argument("--services", type=int, default=100000)
+    parser.add_argument("--updates", type=int, default=5000)
+    parser.add_argument("--snapshot-every", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Filling the registry, the log is compacted into snapshots on the way.
+        service_registry = ServiceRegistry(RegistryStore(directory, args.snapshot_every))
+        start = time.perf_counter()
+        for index in range(args.services):
+            service_registry.create({"name" : f"service-{index}", "host" : "127.0.0.1", "port" : index, "tags" : ["api"]})
+        for index in range(args.updates):
+            service_registry.update({"name" : f"service-{index}", "version" : "2"})
+        write_seconds = time.perf_counter() - start
+        service_registry.store.close()
+
+        # Restarting the registry from the snapshot and the log.
+        start = time.perf_counter()
+        restored_registry = ServiceRegistry(RegistryStore(directory, args.snapshot_every))
+        restore_seconds = time.perf_counter() - start
+
+        # Checking that no restored service is declared dead right away.
+        with contextlib.redirect_stdout(io.StringIO()):
+            dead = restored_registry.sweep_heartbeats()
+
+        assert restored_registry.services == service_registry.services
+        print(f"Logged {args.services + args.updates} changes in {write_seconds:.2f} s "
+              f"({(args.services + args.updates) / write_seconds:.0f} changes/s).")
+        print(f"Restored {len(restored_registry.services)} services at revision "
+              f"{restored_registry.change_log.revision} in {restore_seconds * 1000:.1f} ms, {len(dead)} declared dead.")
\ No newline at end of file
@@ -0,0 +1,87 @@
+# Importing all needed modules.
+import collections
+import itertools
+import threading
+
+
+class ChangeLog:
+    def __init__(self, max_size : int = 10000):
+        '''
+            The constructor of the Change Log.
+            Every change of the registry gets a monotonically increasing revision, the last max_size
+            changes are kept in memory for the watchers.
+        :param max_size: int, default = 10000
+            The maximal number of changes kept in the log.
+        '''
+        self.revision = 0
+        self.events = collections.deque(maxlen=max_size)
+        self.condition = threading.Condition()
+        self.listeners = []
+
+    def add_listener(self, listener):
+        '''
+            This function adds a function called with the revision of every new change.
+            It is used by the watchers that can't block a thread on the condition, like the asyncio ones.
+        :param listener: callable
+            The function called with the revision, it must not block.
+        '''
+        self.listeners.append(listener)
+
+    def append(self, event_type : str, name : str, service : dict = None) -> int:
+        '''
+            This function records a change and wakes up the watchers.
+        :param event_type: str
+            The type of the change (create, update, delete, expire, recover).
+        :param name: str
+            The name of the changed service.
+        :param service: dict, default = None
+            The information of the service after the change.
+        :return: int
+            The revision of the change.
+        '''
+        with self.condition:
+            self.revision += 1
+            self.events.append({
+                "revision" : self.revision,
+                "type" : event_type,
+                "name" : name,
+                "service" : service
+            })
+            self.condition.notify_all()
+            for listener in self.listeners:
+                listener(self.revision)
+            return self.revision
+
+    def since(self, revision : int):
+        '''
+            This function returns the changes made after a revision.
+        :param revision: int
+            The last revision known by the watcher.
+        :return: list or None
+            The list of changes or None if the revision isn't covered by the log anymore.
+        '''
+        with self.condition:
+            # The watcher is up to date.
+            if revision == self.revision:
+                return []
+
+            # The revision is unknown or already fell off the end of the log.
+            oldest_revision = self.events[0]["revision"] if self.events else self.revision + 1
+            if revision > self.revision or revision < oldest_revision - 1:
+                return None
+
+            # The revisions in the log are consecutive, so the position of the first change is known.
+            return list(itertools.islice(self.events, revision - oldest_revision + 1, None))
+
+    def wait(self, revision : int, timeout : float) -> bool:
+        '''
+            This function blocks until there are changes after the revision or the timeout passes.
+        :param revision: int
+            The last revision known by the watcher.
+        :param timeout: float
+            The maximal number of seconds to wait.
+        :return: bool
+            True if there are new changes, False otherwise.
+        '''
+        with self.condition:
+            return self.condition.wait_for(lambda: self.revision != revision, timeout)
\ No newline at end of file
@@ -0,0 +1,99 @@
+# Importing all needed modules.
+import heapq
+
+
+class ExpiryIndex:
+    def __init__(self, compaction_factor : int = 2):
+        '''
+            The constructor of the Expiry Index.
+            The index keeps the heartbeat deadlines of the services in a min-heap, so only the
+            services whose deadline has passed are touched when checking the heartbeats.
+        :param compaction_factor: int, default = 2
+            The heap is rebuilt when it holds more than compaction_factor entries per service.
+        '''
+        # Setting up the current deadlines and the heap of (deadline, service name) entries.
+        # The heap may hold outdated entries, they are skipped when they reach the top.
+        self.deadlines = {}
+        self.heap = []
+        self.compaction_factor = compaction_factor
+
+    def __len__(self):
+        '''
+            This function returns the number of services with a pending deadline.
+        '''
+        return len(self.deadlines)
+
+    def __contains__(self, service_name : str):
+        '''
+            This function checks if the service has a pending deadline.
+        '''
+        return service_name in self.deadlines
+
+    def schedule(self, service_name : str, deadline : float):
+        '''
+            This function sets (or moves) the deadline of a service in O(log n).
+        :param service_name: str
+            The name of the service.
+        :param deadline: float
+            The timestamp after which the service is considered dead.
+        '''
+        self.deadlines[service_name] = deadline
+        heapq.heappush(self.heap, (deadline, service_name))
+
+        # Rebuilding the heap when the outdated entries start to dominate it.
+        if len(self.heap) > self.compaction_factor * len(self.deadlines) + 64:
+            self.compact()
+
+    def schedule_many(self, deadlines : dict):
+        '''
+            This function sets the deadlines of many services at once in O(n).
+        :param deadlines: dict
+            The dictionary mapping the names of the services to their deadlines.
+        '''
+        self.deadlines.update(deadlines)
+        self.compact()
+
+    def remove(self, service_name : str):
+        '''
+            This function removes the deadline of a service.
+            The heap entry is dropped lazily when it reaches the top of the heap.
+        :param service_name: str
+            The name of the service.
+        '''
+        self.deadlines.pop(service_name, None)
+
+    def next_deadline(self):
+        '''
+            This function returns the earliest pending deadline or None if there is no deadline.
+        :return: float or None
+            The earliest deadline.
+        '''
+        # Dropping the outdated entries from the top of the heap.
+        while self.heap and self.deadlines.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_expired(self, now : float) -> list:
+        '''
+            This function removes and returns the services whose deadline has passed.
+        :param now: float
+            The current timestamp.
+        :return: list
+            The names of the expired services.
+        '''
+        expired = []
+        while self.heap and self.heap[0][0] <= now:
+            deadline, service_name = heapq.heappop(self.heap)
+
+            # Skipping the entries that were moved or removed after being pushed.
+            if self.deadlines.get(service_name) == deadline:
+                del self.deadlines[service_name]
+                expired.append(service_name)
+        return expired
+
+    def compact(self):
+        '''
+            This function rebuilds the heap from the current deadlines, dropping outdated entries.
+        '''
+        self.heap = [(deadline, service_name) for service_name, deadline in self.deadlines.items()]
+        heapq.heapify(self.heap)
\ No newline at end of file
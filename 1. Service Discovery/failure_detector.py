@@ -0,0 +1,121 @@
+# Importing all needed modules.
+import math
+import sys
+from array import array
+from statistics import NormalDist
+
+
+class PhiAccrualDetector:
+    def __init__(self, threshold : float = 8.0, window_size : int = 50, min_std_deviation : float = 0.1,
+                 acceptable_pause : float = 3.0, min_samples : int = 10):
+        '''
+            The constructor of the Phi Accrual Detector.
+            The detector keeps a sliding window of the intervals between the heartbeats of a service and
+            tells how suspicious the silence of the service is: phi = -log10(P(the next heartbeat is still
+            coming)), assuming normally distributed intervals.
+        :param threshold: float, default = 8.0
+            The phi above which the service is considered dead.
+        :param window_size: int, default = 50
+            The number of the last intervals kept in the window.
+        :param min_std_deviation: float, default = 0.1
+            The lower bound of the standard deviation in seconds, so a perfectly regular service isn't
+            declared dead after a few milliseconds of delay.
+        :param acceptable_pause: float, default = 3.0
+            The number of seconds added to the mean interval, so the pauses of a live service (a garbage
+            collection, a network hiccup) don't get it declared dead.
+        :param min_samples: int, default = 10
+            The number of intervals needed before phi replaces the fixed timeout, a few intervals don't
+            estimate their standard deviation.
+        '''
+        self.threshold = threshold
+        self.window_size = window_size
+        self.min_samples = min(min_samples, window_size)
+        self.min_std_deviation = min_std_deviation
+        self.acceptable_pause = acceptable_pause
+
+        # The number of standard deviations after which phi reaches the threshold, 10 ** -threshold is
+        # used instead of 1 - 10 ** -threshold to keep the precision for the high thresholds.
+        self.threshold_deviations = -NormalDist().inv_cdf(10 ** -threshold)
+
+        # Setting up the ring buffer of the intervals with their running sums.
+        self.intervals = array("f")
+        self.position = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.last = None
+
+    def heartbeat(self, now : float):
+        '''
+            This function records the arrival of a heartbeat.
+        :param now: float
+            The timestamp of the heartbeat.
+        '''
+        if self.last is not None:
+            if len(self.intervals) < self.window_size:
+                self.intervals.append(now - self.last)
+            else:
+                # Overwriting the oldest interval of the full window.
+                oldest = self.intervals[self.position]
+                self.total -= oldest
+                self.total_squares -= oldest * oldest
+                self.intervals[self.position] = now - self.last
+
+            # Reading the interval back as it was stored in single precision.
+            interval = self.intervals[self.position]
+            self.total += interval
+            self.total_squares += interval * interval
+            self.position = (self.position + 1) % self.window_size
+
+            # Recomputing the sums once per window, so the rounding errors don't accumulate.
+            if self.position == 0:
+                self.total = math.fsum(self.intervals)
+                self.total_squares = math.fsum(value * value for value in self.intervals)
+        self.last = now
+
+    def ready(self) -> bool:
+        '''
+            This function checks if the window has enough intervals to estimate their distribution.
+        '''
+        return len(self.intervals) >= self.min_samples
+
+    def mean(self) -> float:
+        '''
+            This function returns the mean interval between the heartbeats, including the acceptable pause.
+        '''
+        return self.total / len(self.intervals) + self.acceptable_pause
+
+    def std_deviation(self) -> float:
+        '''
+            This function returns the standard deviation of the intervals, bounded from below.
+        '''
+        count = len(self.intervals)
+        variance = max(self.total_squares / count - (self.total / count) ** 2, 0.0)
+        return max(math.sqrt(variance), self.min_std_deviation)
+
+    def phi(self, now : float) -> float:
+        '''
+            This function returns the suspicion level of the service.
+        :param now: float
+            The current timestamp.
+        :return: float
+            The phi value, 0 if there are not enough intervals yet.
+        '''
+        if not self.ready():
+            return 0.0
+        deviations = (now - self.last - self.mean()) / self.std_deviation()
+
+        # Bounding the probability by the smallest float, so phi stays finite for the long silences.
+        probability_later = max(0.5 * math.erfc(deviations / math.sqrt(2)), sys.float_info.min)
+        return -math.log10(probability_later)
+
+    def deadline(self, fallback : float) -> float:
+        '''
+            This function returns the timestamp when phi reaches the threshold.
+        :param fallback: float
+            The fixed number of seconds after the last heartbeat used while there are not enough intervals.
+        :return: float
+            The deadline of the service.
+        '''
+        if not self.ready():
+            return self.last + fallback
+        return self.last + self.mean() + self.threshold_deviations * self.std_deviation()
\ No newline at end of file
@@ -0,0 +1,164 @@
+# Importing all needed modules.
+import argparse
+import random
+import threading
+import requests
+
+
+class HeartbeatAggregator:
+    def __init__(self, registry_url : str, interval : float = 10, jitter : float = 0.2, on_unknown = None):
+        '''
+            The constructor of the Heartbeat Aggregator.
+            The aggregator collects the heartbeats of the services running on the same host and
+            sends them to the Service Registry in a single batch.
+        :param registry_url: str
+            The url of the Service Registry, for example http://127.0.0.1:5000.
+        :param interval: float, default = 10
+            The number of seconds between two flushes.
+        :param jitter: float, default = 0.2
+            The share of the interval used to randomize the flushes of different hosts.
+        :param on_unknown: callable, default = None
+            The function called with the list of services unknown by the registry, so they can re-register.
+        '''
+        self.registry_url = registry_url
+        self.interval = interval
+        self.jitter = jitter
+        self.on_unknown = on_unknown
+
+        # Setting up the heartbeats waiting for the next flush and the services unknown by the registry.
+        self.pending = {}
+        self.unknown = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def beat(self, service_name : str, metadata : dict = None):
+        '''
+            This function records a local heartbeat, it will be sent with the next flush.
+        :param service_name: str
+            The name of the service sending the heartbeat.
+        :param metadata: dict, default = None
+            The information of the service to be updated with the heartbeat.
+        '''
+        with self.lock:
+            if metadata:
+                # The service may have beaten without metadata before, its entry is then None.
+                current_metadata = self.pending.get(service_name)
+                self.pending[service_name] = {**(current_metadata or {}), **metadata}
+            else:
+                self.pending.setdefault(service_name, None)
+
+    def flush(self) -> dict:
+        '''
+            This function sends all the collected heartbeats to the registry in one request.
+        :return: dict
+            The lists of renewed and unknown services returned by the registry.
+        '''
+        # Taking the collected heartbeats, new heartbeats go to the next batch.
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        if not pending:
+            return {"renewed" : [], "unknown" : []}
+
+        batch = [
+            {"name" : service_name, "metadata" : metadata} if metadata else service_name
+            for service_name, metadata in pending.items()
+        ]
+        try:
+            response = requests.post(f"{self.registry_url}/heartbeat", json={"services" : batch}, timeout=self.interval)
+            response.raise_for_status()
+        except requests.RequestException:
+            # Putting the heartbeats back, so they are retried with the next flush.
+            # The metadata collected meanwhile is newer, so it overrides the metadata of the failed batch.
+            with self.lock:
+                for service_name, metadata in pending.items():
+                    newer_metadata = self.pending.get(service_name)
+                    if metadata:
+                        self.pending[service_name] = {**metadata, **(newer_metadata or {})}
+                    elif service_name not in self.pending:
+                        self.pending[service_name] = None
+            raise
+        result = response.json()
+
+        # Remembering the unknown services and notifying them that they should re-register.
+        with self.lock:
+            self.unknown.difference_update(result["renewed"])
+            self.unknown.update(result["unknown"])
+        if result["unknown"] and self.on_unknown is not None:
+            self.on_unknown(result["unknown"])
+        return result
+
+    def forget_unknown(self, service_name : str) -> bool:
+        '''
+            This function checks if the registry reported the service as unknown and forgets it,
+            so the service is told once to re-register.
+        :param service_name: str
+            The name of the service.
+        :return: bool
+            True if the service was unknown by the registry.
+        '''
+        with self.lock:
+            if service_name not in self.unknown:
+                return False
+            self.unknown.discard(service_name)
+            return True
+
+    def run(self):
+        '''
+            This function flushes the heartbeats every interval seconds, randomized with the jitter.
+        '''
+        while not self.stopped.wait(self.interval * (1 + random.uniform(-self.jitter, self.jitter))):
+            try:
+                self.flush()
+            except requests.RequestException as error:
+                print(f"Heartbeat flush failed - {error}")
+
+    def start(self):
+        '''
+            This function starts the flushing thread.
+        '''
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self):
+        '''
+            This function stops the flushing thread.
+        '''
+        self.stopped.set()
+
+
+if __name__ == "__main__":
+    from flask import Flask, request
+
+    parser = argparse.ArgumentParser(description="Per-host aggregator of the heartbeat requests.")
+    parser.add_argument("--registry", default="http://127.0.0.1:5000")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--interval", type=float, default=10)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    args = parser.parse_args()
+
+    # Creating the aggregator and the Flask application receiving the local heartbeats.
+    aggregator = HeartbeatAggregator(args.registry, args.interval, args.jitter)
+    app = Flask(__name__)
+
+    @app.route("/heartbeat/<service>", methods=["POST"])
+    def heartbeat(service):
+        '''
+            This function collects the local heartbeat requests.
+        '''
+        # Telling the service to re-register if the registry doesn't know it.
+        if aggregator.forget_unknown(service):
+            return {
+                "message" : "Not registered service!"
+            }, 404
+        # Rejecting the metadata that isn't a JSON object, it couldn't be merged into the service.
+        metadata = request.get_json(silent=True)
+        if metadata is not None and not isinstance(metadata, dict):
+            return {
+                "message" : "The metadata must be a JSON object!"
+            }, 400
+        aggregator.beat(service, metadata)
+        return {
+            "message" : "Heartbeat received!"
+        }, 200
+
+    aggregator.start()
+    app.run(host="127.0.0.1", port=args.port)
\ No newline at end of file
@@ -0,0 +1,168 @@
+# Importing all needed modules.
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlparse
+
+
+class HttpConnection:
+    def __init__(self, host : str, port : int):
+        '''
+            The constructor of the HTTP Connection, a minimal keep-alive HTTP/1.1 client.
+        :param host: str
+            The host of the server.
+        :param port: int
+            The port of the server.
+        '''
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method : str, path : str, body : dict = None):
+        '''
+            This function sends a request, reopening the connection if the server closed it.
+        :param method: str
+            The HTTP method.
+        :param path: str
+            The path with the query string.
+        :param body: dict, default = None
+            The JSON body of the request.
+        :return: int, bytes
+            The status code.
+            The response body.
+        '''
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        headers = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Length: {len(payload)}\r\n"
+        if body is not None:
+            headers += "Content-Type: application/json\r\n"
+        self.writer.write(headers.encode("ascii") + b"\r\n" + payload)
+
+        # Reading the status line and the headers.
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        version, status_code = status_line.split()[:2]
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        # Reading the body and closing the connection if the server doesn't keep it alive.
+        if "content-length" in response_headers:
+            response_body = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            response_body = await self.reader.read()
+        if version == b"HTTP/1.0" or response_headers.get("connection", "").lower() == "close" \
+                or "content-length" not in response_headers:
+            self.close()
+        return int(status_code), response_body
+
+    def close(self):
+        '''
+            This function closes the connection.
+        '''
+        if self.writer is not None:
+            self.writer.close()
+            self.reader, self.writer = None, None
+
+
+def percentile(values : list, q : float) -> float:
+    '''
+        This function returns the q-th percentile of the sorted values.
+    '''
+    return values[min(len(values) - 1, int(q / 100 * len(values)))] if values else float("nan")
+
+async def heartbeat_worker(host : str, port : int, names : list, stop_at : float, latencies : list, errors : list):
+    '''
+        This function sends heartbeats over one keep-alive connection until the end of the test.
+    '''
+    connection = HttpConnection(host, port)
+    while time.monotonic() < stop_at:
+        start = time.perf_counter()
+        try:
+            status_code, _ = await connection.request("POST", f"/heartbeat/{random.choice(names)}")
+            if status_code == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status_code)
+        except (OSError, ValueError, asyncio.IncompleteReadError) as error:
+            errors.append(type(error).__name__)
+            connection.close()
+            await asyncio.sleep(0.1)
+    connection.close()
+
+async def watch_worker(host : str, port : int, stop_at : float, answered : list, errors : list):
+    '''
+        This function keeps a long-poll open on the watch endpoint until the end of the test.
+    '''
+    connection, since = HttpConnection(host, port), -1
+    while time.monotonic() < stop_at:
+        try:
+            timeout = max(stop_at - time.monotonic(), 0.1)
+            status_code, body = await connection.request("GET", f"/service/watch?since={since}&timeout={timeout:.1f}")
+            since = json.loads(body)["revision"]
+            answered.append(status_code)
+        except (OSError, ValueError, KeyError, asyncio.IncompleteReadError) as error:
+            errors.append(type(error).__name__)
+            connection.close()
+            await asyncio.sleep(0.1)
+    connection.close()
+
+async def run(url : str, connections : int, watchers : int, services : int, duration : float) -> dict:
+    '''
+        This function runs the load test against one server.
+    '''
+    parsed = urlparse(url)
+    host, port = parsed.hostname, parsed.port or 80
+
+    # Registering the services that send the heartbeats.
+    names = [f"load-test-{index}" for index in range(services)]
+    connection = HttpConnection(host, port)
+    for name in names:
+        await connection.request("POST", "/service", {"name" : name, "host" : "127.0.0.1", "port" : 0})
+    connection.close()
+
+    latencies, errors, answered = [], [], []
+    stop_at = time.monotonic() + duration
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(heartbeat_worker(host, port, names, stop_at, latencies, errors) for _ in range(connections)),
+        *(watch_worker(host, port, stop_at, answered, errors) for _ in range(watchers))
+    )
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests_per_second" : len(latencies) / elapsed,
+        "p50_ms" : percentile(latencies, 50) * 1000,
+        "p99_ms" : percentile(latencies, 99) * 1000,
+        "errors" : len(errors),
+        "long_polls_answered" : len(answered)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Heartbeat load test comparing the serving modes of the Service Registry.")
+    parser.add_argument("--target", action="append", default=[],
+                        help="name=url of a running registry, e.g. flask=http://127.0.0.1:5000 (python main.py) "
+                             "or asgi=http://127.0.0.1:8000 (uvicorn asgi_main:app --port 8000), started with "
+                             "REGISTRY_DATA_DIR set to a scratch directory, so the load-test-* services aren't kept")
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--watchers", type=int, default=500)
+    parser.add_argument("--services", type=int, default=1000)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7} {'long-polls':>10}")
+    for target in args.target or ["flask=http://127.0.0.1:5000"]:
+        name, _, url = target.partition("=")
+        result = asyncio.run(run(url, args.connections, args.watchers, args.services, args.duration))
+        print(f"{name:<8} {result['requests_per_second']:>9.0f} {result['p50_ms']:>8.2f} {result['p99_ms']:>9.2f} "
+              f"{result['errors']:>7} {result['long_polls_answered']:>10}")
\ No newline at end of file
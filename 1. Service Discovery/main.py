@@ -1,15 +1,48 @@
 # Importing all needed modules.
-from flask import Flask, request
+from flask import Flask, Response, request
 from service_registry import ServiceRegistry
+from registry_store import RegistryStore
+from metrics import RouteMetrics
+import functools
+import os
 import threading
+import time
 
 # Creating the Flask application.
 app = Flask(__name__)
 
-# Creation of the Service registry.
-service_registry = ServiceRegistry()
+# Creation of the Service registry, restored from the store after a restart.
+# Every running registry needs its own directory, REGISTRY_DATA_DIR overrides the default of this mode.
+service_registry = ServiceRegistry(RegistryStore(os.environ.get("REGISTRY_DATA_DIR", os.path.join("registry_data", "flask"))))
+
+
+def instrumented(route : str):
+    '''
+        This function returns the decorator recording the count, errors and latency of a route.
+        The metrics of the route are created once, the requests only update them.
+    :param route: str
+        The name of the route in the metrics.
+    '''
+    route_metrics = RouteMetrics(service_registry.metrics, route)
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = function(*args, **kwargs)
+            except Exception:
+                # Flask answers the unhandled errors with 500, they are recorded as such.
+                route_metrics.record(time.perf_counter() - start, 500)
+                raise
+            status_code = response[1] if isinstance(response, tuple) else response.status_code
+            route_metrics.record(time.perf_counter() - start, status_code)
+            return response
+        return wrapper
+    return decorator
 
 @app.route("/service", methods=["POST"])
+@instrumented("create")
 def create():
     '''
         This function processes the registration requests.
@@ -19,6 +52,7 @@ def create():
     return response, status_code
 
 @app.route("/service", methods=["GET"])
+@instrumented("read")
 def read():
     '''
         THis function processes the requests of getting information about services.
@@ -27,10 +61,49 @@ def read():
     if request_body is not None:
         response, status_code = service_registry.read_some(request_body["services"])
     else:
+        # Sending the cached JSON of the current snapshot.
         response, status_code = service_registry.read_all()
+        return Response(response, status=status_code, mimetype="application/json")
+    return response, status_code
+
+@app.route("/service/watch", methods=["GET"])
+@instrumented("watch")
+def watch():
+    '''
+        This function processes the long-poll requests for the registry changes.
+    '''
+    # A client without a known revision gets the full snapshot.
+    since = request.args.get("since", default=-1, type=int)
+    timeout = min(request.args.get("timeout", default=30, type=float), 60)
+    response, status_code = service_registry.watch(since, timeout)
+    return response, status_code
+
+@app.route("/service/query", methods=["GET"])
+@instrumented("query")
+def query():
+    '''
+        This function processes the requests filtering the services by the indexed fields.
+        For example /service/query?tags=cache&zone=a,b returns the services tagged cache in zone a or b.
+    '''
+    filters = {
+        field : [value for values in values_list for value in values.split(",")]
+        for field, values_list in request.args.lists()
+    }
+    response, status_code = service_registry.query(filters)
+    return response, status_code
+
+@app.route("/service/suspicion", methods=["GET"])
+@instrumented("suspicion")
+def suspicion():
+    '''
+        This function processes the requests of getting the suspicion levels of the services.
+    '''
+    names = request.args.get("services")
+    response, status_code = service_registry.suspicion(names.split(",") if names else None)
     return response, status_code
 
 @app.route("/service", methods=["PUT"])
+@instrumented("update")
 def update():
     '''
         THis function processes the update requests.
@@ -40,6 +113,7 @@ def update():
     return response, status_code
 
 @app.route("/service", methods=["DELETE"])
+@instrumented("delete")
 def delete():
     '''
         THis function processes the delete requests.
@@ -49,6 +123,7 @@ def delete():
     return response, status_code
 
 @app.route("/heartbeat/<service>", methods=["POST"])
+@instrumented("heartbeat")
 def heartbeat(service):
     '''
         This function processes the heartbeat requests.
@@ -56,6 +131,23 @@ def heartbeat(service):
     response, status_code = service_registry.add_heartbeat(service)
     return response, status_code
 
+@app.route("/heartbeat", methods=["POST"])
+@instrumented("heartbeats")
+def heartbeats():
+    '''
+        This function processes the batched heartbeat requests.
+    '''
+    request_body = request.json
+    response, status_code = service_registry.add_heartbeats(request_body["services"])
+    return response, status_code
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    '''
+        This function exposes the metrics of the registry in the Prometheus text format.
+    '''
+    return Response(service_registry.metrics.render(), mimetype="text/plain; version=0.0.4")
+
 
 # Starting up the processing of checking heartbeats.
 threading.Thread(target=service_registry.check_heartbeats).start()
@@ -0,0 +1,168 @@
+# Importing all needed modules.
+import bisect
+import threading
+
+# The default buckets of the latency histograms in seconds, from 10 microseconds to 10 seconds.
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def render_labels(labels : dict) -> str:
+    '''
+        This function renders the labels of a metric in the Prometheus text format.
+    :param labels: dict
+        The labels of the metric.
+    :return: str
+        The rendered labels, for example {route="create"}, or an empty string.
+    '''
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class Counter:
+    def __init__(self, name : str, labels : dict = None):
+        '''
+            The constructor of the Counter, a monotonically increasing value.
+        :param name: str
+            The name of the metric.
+        :param labels: dict, default = None
+            The labels of the metric, rendered once when the counter is created.
+        '''
+        self.name = name
+        self.labels = render_labels(labels)
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount : int = 1):
+        with self.lock:
+            self.value += amount
+
+    def render(self) -> list:
+        return [f"{self.name}{self.labels} {self.value}"]
+
+
+class Gauge:
+    def __init__(self, name : str, function, labels : dict = None):
+        '''
+            The constructor of the Gauge, a value read from a function when the metrics are rendered.
+        :param name: str
+            The name of the metric.
+        :param function: callable
+            The function returning the current value.
+        :param labels: dict, default = None
+            The labels of the metric.
+        '''
+        self.name = name
+        self.labels = render_labels(labels)
+        self.function = function
+
+    def render(self) -> list:
+        return [f"{self.name}{self.labels} {self.function()}"]
+
+
+class Histogram:
+    def __init__(self, name : str, labels : dict = None, buckets : tuple = LATENCY_BUCKETS):
+        '''
+            The constructor of the Histogram.
+            The counts of the buckets are preallocated, so an observation is a bisect and two additions.
+        :param name: str
+            The name of the metric.
+        :param labels: dict, default = None
+            The labels of the metric.
+        :param buckets: tuple, default = LATENCY_BUCKETS
+            The sorted upper bounds of the buckets.
+        '''
+        self.name = name
+        self.labels = labels or {}
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value : float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[index] += 1
+            self.total += value
+
+    def render(self) -> list:
+        with self.lock:
+            counts, total = list(self.counts), self.total
+
+        # Rendering the cumulative counts of the buckets.
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{render_labels(dict(self.labels, le=bound))} {cumulative}")
+        lines.append(f"{self.name}_sum{render_labels(self.labels)} {total}")
+        lines.append(f"{self.name}_count{render_labels(self.labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        '''
+            The constructor of the Metrics Registry.
+            The metrics are created once at the start, the hot paths only update the created objects.
+        '''
+        self.families = {}
+
+    def add(self, metric, metric_type : str, description : str):
+        '''
+            This function adds a metric to its family.
+        '''
+        family = self.families.setdefault(metric.name, {"type" : metric_type, "help" : description, "metrics" : []})
+        family["metrics"].append(metric)
+        return metric
+
+    def counter(self, name : str, description : str, labels : dict = None) -> Counter:
+        return self.add(Counter(name, labels), "counter", description)
+
+    def gauge(self, name : str, description : str, function, labels : dict = None) -> Gauge:
+        return self.add(Gauge(name, function, labels), "gauge", description)
+
+    def histogram(self, name : str, description : str, labels : dict = None, buckets : tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.add(Histogram(name, labels, buckets), "histogram", description)
+
+    def render(self) -> str:
+        '''
+            This function renders all the metrics in the Prometheus text format.
+        :return: str
+            The rendered metrics.
+        '''
+        lines = []
+        for name, family in self.families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for metric in family["metrics"]:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RouteMetrics:
+    def __init__(self, metrics_registry : MetricsRegistry, route : str):
+        '''
+            The constructor of the Route Metrics, the metrics of the requests of one route.
+        :param metrics_registry: MetricsRegistry
+            The registry the metrics are added to.
+        :param route: str
+            The name of the route.
+        '''
+        labels = {"route" : route}
+        self.requests = metrics_registry.counter("registry_requests_total", "The number of processed requests.", labels)
+        self.errors = metrics_registry.counter("registry_request_errors_total", "The number of requests answered with an error status.", labels)
+        self.duration = metrics_registry.histogram("registry_request_duration_seconds", "The time spent processing the requests.", labels)
+
+    def record(self, duration : float, status_code : int):
+        '''
+            This function records a processed request.
+        :param duration: float
+            The processing time in seconds.
+        :param status_code: int
+            The status code of the response.
+        '''
+        self.requests.inc()
+        if status_code >= 400:
+            self.errors.inc()
+        self.duration.observe(duration)
\ No newline at end of file
@@ -0,0 +1,114 @@
+# Importing all needed modules.
+import json
+from collections.abc import Mapping
+
+
+class ServicesView(Mapping):
+    def __init__(self, shards : tuple):
+        '''
+            The constructor of the Services View.
+            The view is an immutable mapping of the services split into shards by the name of the service,
+            so a change copies only the shard of the changed service instead of the whole registry.
+        :param shards: tuple
+            The dictionaries holding the services, they are never modified after the view is created.
+        '''
+        self.shards = shards
+        self.size = sum(map(len, shards))
+
+    @classmethod
+    def from_dict(cls, services : dict, shards_count : int = 256):
+        '''
+            This function creates a view from a dictionary of services.
+        :param services: dict
+            The dictionary mapping the names of the services to their information.
+        :param shards_count: int, default = 256
+            The number of shards.
+        :return: ServicesView
+            The created view.
+        '''
+        shards = [{} for _ in range(shards_count)]
+        for name, service in services.items():
+            shards[hash(name) % shards_count][name] = service
+        return cls(tuple(shards))
+
+    def __getitem__(self, name : str):
+        return self.shards[hash(name) % len(self.shards)][name]
+
+    def __contains__(self, name : str):
+        return name in self.shards[hash(name) % len(self.shards)]
+
+    def __iter__(self):
+        for shard in self.shards:
+            yield from shard
+
+    def __len__(self):
+        return self.size
+
+    def replace(self, name : str, service : dict = None):
+        '''
+            This function returns a new view with the service set, or removed if service is None.
+        :param name: str
+            The name of the service.
+        :param service: dict, default = None
+            The new information of the service.
+        :return: ServicesView
+            The new view, it shares all the unchanged shards with this one.
+        '''
+        index = hash(name) % len(self.shards)
+        shard = dict(self.shards[index])
+        if service is None:
+            shard.pop(name, None)
+        else:
+            shard[name] = service
+        shards = list(self.shards)
+        shards[index] = shard
+        return ServicesView(tuple(shards))
+
+
+class RegistrySnapshot:
+    def __init__(self, services : ServicesView, revision : int, previous = None):
+        '''
+            The constructor of the Registry Snapshot.
+            A snapshot is published by the registry after every change and is never modified afterwards,
+            so the readers can use it without any lock.
+        :param services: ServicesView
+            The services of the registry.
+        :param revision: int
+            The revision of the last change included in the snapshot.
+        :param previous: RegistrySnapshot, default = None
+            The previous snapshot, the serialized shards that didn't change are reused from it.
+        '''
+        self.services = services
+        self.revision = revision
+        self.serialized = None
+
+        # Setting up the cache of the serialized shards as (shard, bytes) pairs.
+        if previous is not None:
+            self.fragments = list(previous.fragments)
+        else:
+            self.fragments = [None] * len(services.shards)
+
+    @property
+    def body(self) -> bytes:
+        '''
+            This function returns the services serialized to JSON.
+            The serialization is done once by the first reader of the snapshot and only the shards changed
+            since the previous snapshot are encoded again. Two readers racing on an empty cache just
+            serialize the same snapshot twice.
+        :return: bytes
+            The JSON encoded services.
+        '''
+        serialized = self.serialized
+        if serialized is None:
+            parts = []
+            for index, shard in enumerate(self.services.shards):
+                fragment = self.fragments[index]
+                if fragment is None or fragment[0] is not shard:
+                    # Encoding the shard without its braces, so the shards can be joined into one object.
+                    fragment = (shard, json.dumps(shard, separators=(",", ":")).encode("utf-8")[1:-1])
+                    self.fragments[index] = fragment
+                if fragment[1]:
+                    parts.append(fragment[1])
+            serialized = b"{" + b",".join(parts) + b"}"
+            self.serialized = serialized
+        return serialized
\ No newline at end of file
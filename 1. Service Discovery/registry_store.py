@@ -0,0 +1,137 @@
+# Importing all needed modules.
+import json
+import os
+import pickle
+import threading
+
+
+class RegistryStore:
+    def __init__(self, directory : str, snapshot_every : int = 10000, fsync : bool = False):
+        '''
+            The constructor of the Registry Store.
+            The store keeps an append-only log of the registry changes and a periodically compacted
+            snapshot, so a restarted registry gets back its services.
+        :param directory: str
+            The directory where the log and the snapshot are kept.
+        :param snapshot_every: int, default = 10000
+            The number of logged changes after which the log is compacted into a snapshot.
+        :param fsync: bool, default = False
+            If True every change is synced to the disk. Flushing alone is enough to survive a crash of
+            the process, syncing also covers the crash of the machine.
+        '''
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.log_path = os.path.join(directory, "registry.log")
+        self.snapshot_path = os.path.join(directory, "registry.snapshot")
+
+        # Opening the log for appending.
+        os.makedirs(directory, exist_ok=True)
+        self.log_file = open(self.log_path, "a", encoding="utf-8")
+        self.logged_changes = 0
+        self.revision = 0
+        self.lock = threading.Lock()
+
+    def load(self):
+        '''
+            This function restores the registry from the snapshot and the changes logged after it.
+        :return: dict, int
+            The services of the registry.
+            The revision of the last restored change.
+        '''
+        services, revision = {}, 0
+
+        # Reading the snapshot.
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+            services, revision = snapshot["services"], snapshot["revision"]
+
+        # Reading the changes logged after the snapshot.
+        changes, valid_size = [], 0
+        with open(self.log_path, "rb") as log_file:
+            for line in log_file:
+                # The last line may be cut by a crash in the middle of a write.
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    changes.append(json.loads(line))
+                except ValueError:
+                    break
+                valid_size += len(line)
+        self.logged_changes = len(changes)
+
+        # Cutting the broken tail, so the next changes are appended after the last complete one.
+        if valid_size < os.path.getsize(self.log_path):
+            with self.lock:
+                self.log_file.flush()
+                os.truncate(self.log_path, valid_size)
+
+        # Replaying the changes in the order of their revisions.
+        changes.sort(key=lambda change: change["revision"])
+        for change in changes:
+            if change["revision"] <= revision:
+                continue
+            if change["type"] == "delete":
+                services.pop(change["name"], None)
+            elif change["type"] in ("create", "update"):
+                services[change["name"]] = change["service"]
+            # The expire and recover changes only advance the revision, the heartbeats aren't restored.
+            revision = change["revision"]
+        self.revision = revision
+        return services, revision
+
+    def append(self, change : dict):
+        '''
+            This function appends a change of the registry to the log.
+        :param change: dict
+            The change with the revision, type, name and service keys. Every change of the change log is appended,
+            so a restarted registry continues after the last revision its watchers saw.
+        '''
+        line = json.dumps(change, separators=(",", ":")) + "\n"
+        with self.lock:
+            self.log_file.write(line)
+            self.log_file.flush()
+            if self.fsync:
+                os.fsync(self.log_file.fileno())
+            self.logged_changes += 1
+            self.revision = max(self.revision, change["revision"])
+
+    def needs_snapshot(self) -> bool:
+        '''
+            This function checks if the log is long enough to be compacted into a snapshot.
+        :return: bool
+            True if the snapshot should be written.
+        '''
+        return self.logged_changes >= self.snapshot_every
+
+    def snapshot(self, services : dict):
+        '''
+            This function writes the snapshot of the registry and starts a new log.
+            The services must include every logged change, the registry calls it under its write lock
+            after publishing the last change.
+        :param services: dict
+            The services of the registry, they are not modified while the snapshot is written.
+        '''
+        with self.lock:
+            revision = self.revision
+
+            # Writing the snapshot to a temporary file and replacing the old one atomically.
+            temporary_path = self.snapshot_path + ".tmp"
+            with open(temporary_path, "wb") as snapshot_file:
+                pickle.dump({"revision" : revision, "services" : services}, snapshot_file, pickle.HIGHEST_PROTOCOL)
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+            os.replace(temporary_path, self.snapshot_path)
+
+            # Starting a new log, the changes before the snapshot are not needed anymore.
+            self.log_file.close()
+            self.log_file = open(self.log_path, "w", encoding="utf-8")
+            self.logged_changes = 0
+
+    def close(self):
+        '''
+            This function closes the log.
+        '''
+        with self.lock:
+            self.log_file.close()
\ No newline at end of file
@@ -1,18 +1,109 @@
 # Importing all needed modules.
+import gc
 import time
+import random
 import threading
+from expiry_index import ExpiryIndex
+from change_log import ChangeLog
+from registry_snapshot import RegistrySnapshot, ServicesView
+from attribute_index import AttributeIndex
+from failure_detector import PhiAccrualDetector
+from metrics import MetricsRegistry
+from timed_lock import TimedLock
 
 
 class ServiceRegistry:
-    def __init__(self):
+    def __init__(self, store = None, grace_period : float = 30, indexed_fields : tuple = ("tags", "host", "zone", "version"),
+                 suspicion_threshold : float = 8.0, acceptable_pause : float = 3.0, min_std_deviation : float = 0.1,
+                 min_samples : int = 10):
         '''
             The constructor of the Service Registry.
+        :param store: RegistryStore, default = None
+            The store used to persist the services, the registry is kept only in memory if None.
+        :param grace_period: float, default = 30
+            The maximal number of seconds added to the deadlines of the restored services, so they are
+            not declared dead all at once after a restart.
+        :param indexed_fields: tuple, default = ("tags", "host", "zone", "version")
+            The fields of the registrations that can be used in the queries.
+        :param suspicion_threshold: float, default = 8.0
+            The phi above which a service is considered dead by its failure detector.
+        :param acceptable_pause: float, default = 3.0
+            The seconds of pause tolerated by the failure detectors on top of the mean heartbeat interval.
+        :param min_std_deviation: float, default = 0.1
+            The lower bound of the standard deviation of the heartbeat intervals in the failure detectors.
+        :param min_samples: int, default = 10
+            The number of heartbeat intervals a failure detector needs before it replaces the fixed threshold.
         '''
         # Setting up the service and heartbeat registry.
-        self.services = {}
+        # The services are published as immutable snapshots, the writers are serialized by the write lock.
+        self.snapshot = RegistrySnapshot(ServicesView.from_dict({}), 0)
+        self.write_lock = threading.Lock()
         self.heartbeats = {}
-        self.heartbeats_lock = threading.Lock()
+
+        # Setting up the metrics of the registry, the heartbeats lock reports its wait and hold times.
+        self.metrics = MetricsRegistry()
+        self.heartbeats_lock = TimedLock(
+            threading.Lock(),
+            self.metrics.histogram("registry_heartbeats_lock_wait_seconds", "The time spent waiting for the heartbeats lock.").observe,
+            self.metrics.histogram("registry_heartbeats_lock_hold_seconds", "The time the heartbeats lock was held.").observe
+        )
+        self.sweep_duration = self.metrics.histogram("registry_sweep_duration_seconds", "The duration of the heartbeat checks.")
+        self.expired_services = self.metrics.counter("registry_expired_services_total", "The number of services declared dead.")
+        self.metrics.gauge("registry_services", "The number of registered services.", lambda: len(self.services))
+        self.metrics.gauge("registry_suspected_dead_services", "The number of services currently declared dead.", lambda: len(self.dead_services))
+        self.metrics.gauge("registry_revision", "The revision of the last change of the registry.", lambda: self.change_log.revision)
         self.time_threashold = 30
+        self.check_interval = 1
+
+        # Setting up the adaptive failure detectors of the services, the fixed threshold is used only
+        # until a detector has seen enough heartbeats.
+        self.failure_detectors = {}
+        self.suspicion_threshold = suspicion_threshold
+        self.detector_config = {
+            "threshold" : suspicion_threshold,
+            "acceptable_pause" : acceptable_pause,
+            "min_std_deviation" : min_std_deviation,
+            "min_samples" : min_samples
+        }
+
+        # Setting up the deadline ordered index of the heartbeats and the set of dead services.
+        self.expiry_index = ExpiryIndex()
+        self.dead_services = set()
+
+        # Setting up the log of the registry changes used by the watchers.
+        self.change_log = ChangeLog()
+
+        # Setting up the index of the registration fields, it is updated under the write lock.
+        self.attribute_index = AttributeIndex(indexed_fields)
+
+        # Restoring the services from the store.
+        self.store = store
+        self.grace_period = grace_period
+        if self.store is not None:
+            # Pausing the garbage collector while the many small objects of the registry are created.
+            gc.disable()
+            try:
+                services, self.change_log.revision = self.store.load()
+                self.snapshot = RegistrySnapshot(ServicesView.from_dict(services), self.change_log.revision)
+                for name, service in services.items():
+                    self.attribute_index.add(name, service)
+
+                # Spreading the deadlines of the restored services over the grace window.
+                now = time.time()
+                self.heartbeats = dict.fromkeys(services, now)
+                self.expiry_index.schedule_many({
+                    name : now + self.time_threashold + self.grace_period * random.random()
+                    for name in services
+                })
+            finally:
+                gc.enable()
+
+    @property
+    def services(self) -> ServicesView:
+        '''
+            This function returns the services of the current snapshot, they must not be modified.
+        '''
+        return self.snapshot.services
 
     def create(self, request_body : dict):
         '''
@@ -26,27 +117,66 @@ class ServiceRegistry:
         # Getting the name of the service.
         name = request_body["name"]
 
-        # Checking the presence of the service.
-        if name in self.services:
-            return {
-                       "message" : "Service already registered!"
-                   }, 208
-        else:
-            # Adding the service to the service and heartbeat registries.
-            self.services[name] = request_body
-            self.heartbeats_lock.acquire()
-            self.heartbeats[name] = time.time()
-            self.heartbeats_lock.release()
-            return request_body, 200
+        with self.write_lock:
+            # Checking the presence of the service.
+            if name in self.services:
+                return {
+                           "message" : "Service already registered!"
+                       }, 208
+            else:
+                # Adding the service to a new version of the services and to the heartbeat registry.
+                services = self.services.replace(name, request_body)
+                self.attribute_index.add(name, request_body)
+                self.heartbeats_lock.acquire()
+                self.renew(name, time.time())
+                self.heartbeats_lock.release()
+                self.publish(services, self.record_change("create", name, request_body))
+                return request_body, 200
+
+    def record_change(self, event_type : str, name : str, service : dict = None) -> int:
+        '''
+            This function records a change of the registry in the change log and in the store.
+        :param event_type: str
+            The type of the change (create, update, delete, expire, recover).
+        :param name: str
+            The name of the changed service.
+        :param service: dict, default = None
+            The information of the service after the change.
+        :return: int
+            The revision of the change.
+        '''
+        revision = self.change_log.append(event_type, name, service)
+
+        # Persisting every change, the expire and recover ones only for their revisions, so the revisions
+        # aren't reused after a restart. The heartbeats themselves are restored with a grace window.
+        if self.store is not None:
+            self.store.append({"revision" : revision, "type" : event_type, "name" : name, "service" : service})
+        return revision
+
+    def publish(self, services : ServicesView, revision : int):
+        '''
+            This function publishes a new snapshot of the services, it must be called with the write lock.
+            The readers see either the previous snapshot or the new one, never a half-applied change.
+        :param services: ServicesView
+            The new services.
+        :param revision: int
+            The revision of the last change included in the services.
+        '''
+        self.snapshot = RegistrySnapshot(services, revision, self.snapshot)
+
+        # Compacting the log of the store once every logged change is published.
+        if self.store is not None and self.store.needs_snapshot():
+            self.store.snapshot(dict(services))
 
     def read_all(self):
         '''
-            This function returns the dictionary of the all registered services.
-        :return: dict, int
-            The service registry.
+            This function returns the all registered services serialized to JSON.
+            It only reads the current snapshot, so it never waits for the writers.
+        :return: bytes, int
+            The JSON encoded service registry.
             The status code.
         '''
-        return self.services, 200
+        return self.snapshot.body, 200
 
     def read_some(self, services_list : list):
         '''
@@ -57,7 +187,8 @@ class ServiceRegistry:
             The status code.
         '''
         # Getting the missing services in the service registry from the requested ones.
-        services_dif = set(services_list).difference(self.services.keys())
+        services = self.services
+        services_dif = {service_name for service_name in services_list if service_name not in services}
 
         # If there are missing services then the list of missing services is returned.
         if len(services_dif) > 0:
@@ -67,10 +198,37 @@ class ServiceRegistry:
         else:
             # If all services are present the information of those services is returned.
             return {
-                service_name : self.services[service_name]
+                service_name : services[service_name]
                 for service_name in services_list
             }, 200
 
+    def query(self, filters : dict):
+        '''
+            This function returns the services matching the filters, using the index instead of a full scan.
+        :param filters: dict
+            The dictionary mapping the indexed fields to the lists of accepted values. A service must match
+            every field and any of the values of a field.
+        :return: dict, int
+            The dictionary with the matching services or the error message.
+            The status code.
+        '''
+        # Checking that the filters use only the indexed fields.
+        not_indexed = [field for field in filters if field not in self.attribute_index.fields]
+        if not filters or not_indexed:
+            return {
+                "message" : "Filter by the indexed fields!",
+                "indexed_fields" : list(self.attribute_index.fields)
+            }, 400
+
+        # Reading the index and the snapshot together, so they describe the same services.
+        with self.write_lock:
+            names = self.attribute_index.query(filters)
+            services = self.services
+        return {
+            service_name : services[service_name]
+            for service_name in names
+        }, 200
+
     def update(self, request_body : dict):
         '''
             This function updates the information about a service.
@@ -83,15 +241,18 @@ class ServiceRegistry:
         # Getting the name of the service.
         name = request_body["name"]
 
-        # If the service is present then it's information is updated.
-        if name in self.services:
-            self.services[name].update(request_body)
-            return self.services[name], 200
-        else:
-            # If the service is missing the error message is returned.
-            return {
-                "message" : "No such service!"
-            }, 404
+        with self.write_lock:
+            # If the service is present then a new version of it's information is published.
+            if name in self.services:
+                services = self.services.replace(name, {**self.services[name], **request_body})
+                self.attribute_index.replace(name, self.services[name], services[name])
+                self.publish(services, self.record_change("update", name, services[name]))
+                return services[name], 200
+            else:
+                # If the service is missing the error message is returned.
+                return {
+                    "message" : "No such service!"
+                }, 404
 
     def delete(self, request_body : dict):
         '''
@@ -104,21 +265,76 @@ class ServiceRegistry:
         '''
         # Getting the name of the service from request body.
         name = request_body["name"]
-        if name in self.services:
-            # Getting the service information and deleting it from service registry.
-            service_info = self.services[name]
-            del self.services[name]
-            
-            # Deleting the service from heartbeats.
-            self.heartbeats_lock.acquire()
-            del self.heartbeats[name]
-            self.heartbeats_lock.release()
-            return service_info, 200
-        else:
-            # Returning the error message if the requested service isn't present in registry.
+        with self.write_lock:
+            if name in self.services:
+                # Getting the service information and deleting it from a new version of the services.
+                service_info = self.services[name]
+                services = self.services.replace(name)
+                self.attribute_index.remove(name, service_info)
+
+                # Deleting the service from heartbeats.
+                self.heartbeats_lock.acquire()
+                del self.heartbeats[name]
+                self.failure_detectors.pop(name, None)
+                self.expiry_index.remove(name)
+                self.dead_services.discard(name)
+                self.heartbeats_lock.release()
+                self.publish(services, self.record_change("delete", name, service_info))
+                return service_info, 200
+            else:
+                # Returning the error message if the requested service isn't present in registry.
+                return {
+                    "message" : "No such service!"
+                }, 404
+
+    def renew(self, service_name : str, now : float):
+        '''
+            This function records a heartbeat of the service and moves its deadline to the moment when
+            its failure detector reaches the suspicion threshold. It must be called with the heartbeats lock.
+        :param service_name: str
+            The name of the service.
+        :param now: float
+            The timestamp of the heartbeat.
+        '''
+        # Creating the detector with the first heartbeat, the restored services get one only when they beat.
+        detector = self.failure_detectors.get(service_name)
+        if detector is None:
+            detector = self.failure_detectors[service_name] = PhiAccrualDetector(**self.detector_config)
+        detector.heartbeat(now)
+        self.heartbeats[service_name] = now
+        self.expiry_index.schedule(service_name, detector.deadline(self.time_threashold))
+
+    def suspicion(self, services_list : list = None):
+        '''
+            This function returns the suspicion levels (phi) of the services.
+        :param services_list: list, default = None
+            The names of the services, all the services are returned if None.
+        :return: dict, int
+            The dictionary with the suspicion levels or the list of missing services.
+            The status code.
+        '''
+        self.heartbeats_lock.acquire()
+        if services_list is None:
+            services_list = list(self.heartbeats)
+        services_dif = [service_name for service_name in services_list if service_name not in self.heartbeats]
+        now = time.time()
+        suspicion = {
+            service_name : round(self.failure_detectors[service_name].phi(now), 3)
+            if service_name in self.failure_detectors else 0.0
+            for service_name in services_list
+            if service_name in self.heartbeats
+        }
+        self.heartbeats_lock.release()
+
+        # If there are missing services then the list of missing services is returned.
+        if len(services_dif) > 0:
             return {
-                "message" : "No such service!"
+                "missing_services" : services_dif
             }, 404
+        return {
+            "threshold" : self.suspicion_threshold,
+            "services" : suspicion
+        }, 200
 
     def add_heartbeat(self, service_name : str):
         '''
@@ -129,34 +345,150 @@ class ServiceRegistry:
             The new values of the service.
             The status code.
         '''
-        # Checking if the service is registered.
+        # Checking if the service is registered under the lock, so a concurrent delete can't be undone by the renewal.
+        self.heartbeats_lock.acquire()
         if service_name not in self.heartbeats:
+            self.heartbeats_lock.release()
+
             # Returning the error message and 404 status code.
             return {
                 "message" : "Not registered service!"
             }, 404
-        else:
-            # Updating the last heartbeat timestamp.
-            self.heartbeats_lock.acquire()
-            self.heartbeats[service_name] = time.time()
-            self.heartbeats_lock.release()
 
-            # Returning the success message and the 200 status code.
+        # Updating the last heartbeat timestamp.
+        self.renew(service_name, time.time())
+        recovered = service_name in self.dead_services
+        self.dead_services.discard(service_name)
+        self.heartbeats_lock.release()
+
+        # Notifying the watchers that a dead service is alive again.
+        if recovered:
+            self.record_change("recover", service_name, self.services.get(service_name))
+
+        # Returning the success message and the 200 status code.
+        return {
+            "message" : "Heartbeat received!"
+        }, 200
+
+    def add_heartbeats(self, heartbeats : list):
+        '''
+            This function updates the heartbeat timestamps for a batch of services under a single
+            acquisition of the heartbeats lock.
+        :param heartbeats: list
+            The names of the services or dictionaries with the "name" and optional "metadata" keys.
+        :return: dict, int
+            The lists of renewed and unknown services.
+            The status code.
+        '''
+        # Normalizing the batch to the (name, metadata) pairs.
+        heartbeats = [
+            (heartbeat, None) if isinstance(heartbeat, str) else (heartbeat["name"], heartbeat.get("metadata"))
+            for heartbeat in heartbeats
+        ]
+
+        # Rejecting the batch if some metadata can't be merged into the information of a service.
+        if any(metadata is not None and not isinstance(metadata, dict) for _, metadata in heartbeats):
+            return {
+                "message" : "The metadata must be a JSON object!"
+            }, 400
+        renewed, unknown, recovered = [], [], []
+
+        # Renewing all the known services at once.
+        self.heartbeats_lock.acquire()
+        now = time.time()
+        for service_name, _ in heartbeats:
+            if service_name not in self.heartbeats:
+                unknown.append(service_name)
+                continue
+            self.renew(service_name, now)
+            if service_name in self.dead_services:
+                self.dead_services.discard(service_name)
+                recovered.append(service_name)
+            renewed.append(service_name)
+        self.heartbeats_lock.release()
+
+        # Updating the information of the services whose metadata changed it, all of them are published in a single
+        # snapshot. The sidecars resend the same metadata with every heartbeat, it doesn't make a change.
+        updates = [(service_name, metadata) for service_name, metadata in heartbeats if metadata]
+        if updates:
+            with self.write_lock:
+                services, revision = self.services, None
+                for service_name, metadata in updates:
+                    if service_name not in services:
+                        continue
+                    merged = {**services[service_name], **metadata, "name" : service_name}
+                    if merged != services[service_name]:
+                        services = services.replace(service_name, merged)
+                        self.attribute_index.replace(service_name, self.services[service_name], services[service_name])
+                        revision = self.record_change("update", service_name, services[service_name])
+                if revision is not None:
+                    self.publish(services, revision)
+
+        # Notifying the watchers about the dead services that are alive again.
+        for service_name in recovered:
+            self.record_change("recover", service_name, self.services.get(service_name))
+
+        return {
+            "renewed" : renewed,
+            "unknown" : unknown
+        }, 200
+
+    def watch(self, since : int, timeout : float):
+        '''
+            This function returns the changes of the registry made after a revision.
+            If there are no changes yet, it blocks until some arrive or the timeout passes.
+        :param since: int
+            The last revision known by the client.
+        :param timeout: float
+            The maximal number of seconds to wait for changes.
+        :return: dict, int
+            The changes with the current revision or the full snapshot if the client fell off the log.
+            The status code.
+        '''
+        events = self.change_log.since(since)
+        if events == []:
+            self.change_log.wait(since, timeout)
+            events = self.change_log.since(since)
+
+        # Returning the full snapshot if the log doesn't cover the requested revision anymore.
+        if events is None:
+            snapshot = self.snapshot
             return {
-                "message" : "Heartbeat received!"
+                "revision" : snapshot.revision,
+                "snapshot" : dict(snapshot.services)
             }, 200
+        return {
+            "revision" : events[-1]["revision"] if events else since,
+            "events" : events
+        }, 200
+
+    def sweep_heartbeats(self) -> list:
+        '''
+            This function finds the services whose suspicion level reached the threshold.
+            Only the services whose deadline has passed are touched, so the lock is held for O(k log n)
+            where k is the number of newly dead services.
+        :return: list
+            The names of the services that were found dead during this sweep.
+        '''
+        start = time.perf_counter()
+        self.heartbeats_lock.acquire()
+        expired = self.expiry_index.pop_expired(time.time())
+        self.dead_services.update(expired)
+        self.heartbeats_lock.release()
+        self.sweep_duration.observe(time.perf_counter() - start)
+        self.expired_services.inc(len(expired))
+
+        for service in expired:
+            print(f"Service - {service} seems to be dead!")
+            self.record_change("expire", service, self.services.get(service))
+        return expired
 
     def check_heartbeats(self):
         '''
-            This function checks the last heartbeats of the registered services every 10 seconds
-            and prints the one that didn't send a heartbeat request more than 30 seconds.
+            This function checks the last heartbeats of the registered services every second
+            and prints the ones whose suspicion level reached the threshold.
+            A dead service is printed once, until it sends a heartbeat again.
         '''
         while True:
-            self.heartbeats_lock.acquire()
-            # Iterating through services and checking how long a go the service sent the last heartbeat
-            # request.
-            for service in self.heartbeats:
-                if time.time() - self.heartbeats[service] > self.time_threashold:
-                    print(f"Service - {service} seems to be dead!")
-            self.heartbeats_lock.release()
-            time.sleep(10)
\ No newline at end of file
+            self.sweep_heartbeats()
+            time.sleep(self.check_interval)
\ No newline at end of file
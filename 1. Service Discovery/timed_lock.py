@@ -0,0 +1,49 @@
+# Importing all needed modules.
+import threading
+import time
+
+
+class TimedLock:
+    def __init__(self, lock = None, on_wait = None, on_hold = None):
+        '''
+            The constructor of the Timed Lock.
+            The lock works like threading.Lock and reports how long every acquisition waited for the lock
+            and how long the lock was held.
+        :param lock: threading.Lock, default = None
+            The wrapped lock, a new one is created if None.
+        :param on_wait: callable, default = None
+            The function called with the seconds waited for every acquisition.
+        :param on_hold: callable, default = None
+            The function called with the seconds the lock was held for every release.
+        '''
+        self.lock = lock if lock is not None else threading.Lock()
+        self.on_wait = on_wait
+        self.on_hold = on_hold
+
+        # Only the thread holding the lock reads and writes the acquisition time.
+        self.acquired_at = 0.0
+
+    def acquire(self, blocking : bool = True, timeout : float = -1) -> bool:
+        start = time.perf_counter()
+        acquired = self.lock.acquire(blocking, timeout)
+        if acquired:
+            self.acquired_at = time.perf_counter()
+            if self.on_wait is not None:
+                self.on_wait(self.acquired_at - start)
+        return acquired
+
+    def release(self):
+        held = time.perf_counter() - self.acquired_at
+        self.lock.release()
+        if self.on_hold is not None:
+            self.on_hold(held)
+
+    def locked(self) -> bool:
+        return self.lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
\ No newline at end of file
@@ -0,0 +1,195 @@
+# Importing all needed modules.
+import asyncio
+import json
+import os
+from placement import create_placement
+from async_memcache import AsyncMemcacheClient, MemcacheIllegalKeyError
+from l1_cache import L1Cache
+from serde import CompactSerde
+from ttl_policy import MAX_TTL, TTLPolicy
+
+# Defining the serializer of the cached users, the same as the Flask gateways, so both modes read each other's users.
+SERDE = CompactSerde(compress_threshold=1024)
+
+# Defining the Memcached clients, every one keeps a few persistent pipelined connections shared by all the requests.
+CLIENT_CONFIG = {
+    "serde" : SERDE,
+    "connections" : int(os.environ.get("MEMCACHE_CONNECTIONS", 2)),
+    "timeout" : 0.5
+}
+
+# Defining the placement of the users with the same strategy and node names as the Flask gateways.
+PLACEMENT_STRATEGY = os.environ.get("CACHE_PLACEMENT", "ring")
+PLACEMENT_OPTIONS = {
+    "ring" : {"virtual_nodes" : 160},
+    "maglev" : {"table_size" : 65537}
+}.get(PLACEMENT_STRATEGY, {})
+
+# Defining the Cache Ring, placed with the chosen strategy.
+HASH_RING = create_placement({
+    "memcached-1" : AsyncMemcacheClient(("localhost", 11211), **CLIENT_CONFIG),
+    "memcached-2" : AsyncMemcacheClient(("localhost", 11212), **CLIENT_CONFIG),
+    "memcached-3" : AsyncMemcacheClient(("localhost", 11213), **CLIENT_CONFIG)
+}, PLACEMENT_STRATEGY, **PLACEMENT_OPTIONS)
+
+# Defining the in-process L1 cache of the hot users, disabled if L1_CACHE_MAX_BYTES is 0.
+L1_CACHE_MAX_BYTES = int(os.environ.get("L1_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+L1_CACHE = L1Cache(L1_CACHE_MAX_BYTES, ttl=5) if L1_CACHE_MAX_BYTES else None
+
+# Defining the TTL classes of the cached users, the same as the Flask gateways without the read-through mode.
+# This mode has no user loader, so the stale users are served until their hard TTL.
+TTL_POLICY = TTLPolicy(
+    classes={
+        "default" : {"soft_ttl" : 20, "hard_ttl" : MAX_TTL},
+        "volatile" : {"soft_ttl" : 5, "hard_ttl" : 15}
+    },
+    rules=[
+        {"prefix" : "session-", "class" : "volatile"}
+    ]
+)
+
+# The reads in flight, the concurrent misses of the same user share one request to Memcached.
+IN_FLIGHT = {}
+
+
+async def read_json(receive):
+    '''
+        This function reads the whole request body and decodes it.
+    :param receive: callable
+        The ASGI receive function.
+    :return: dict or None
+        The decoded body or None if the body is empty.
+    '''
+    body, more_body = b"", True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return json.loads(body) if body else None
+
+async def send_response(send, response, status_code : int, headers : list = None):
+    '''
+        This function sends a JSON response.
+    :param send: callable
+        The ASGI send function.
+    :param response: dict
+        The response.
+    :param status_code: int
+        The status code.
+    :param headers: list, default = None
+        The additional headers, as (bytes, bytes) pairs.
+    '''
+    body = json.dumps(response).encode("utf-8")
+    await send({
+        "type" : "http.response.start",
+        "status" : status_code,
+        "headers" : [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + (headers or [])
+    })
+    await send({"type" : "http.response.body", "body" : body})
+
+async def read_cached_value(user_id):
+    '''
+        This function reads the cached user from its responsible Memcached service, the concurrent reads
+        of the same user wait for the same request.
+    '''
+    task = IN_FLIGHT.get(user_id)
+    if task is None:
+        task = asyncio.ensure_future(HASH_RING.get_node(user_id).get(user_id))
+        IN_FLIGHT[user_id] = task
+        task.add_done_callback(lambda _: IN_FLIGHT.pop(user_id, None))
+    # Shielding the shared request, so a cancelled reader doesn't cancel it for the others.
+    return await asyncio.shield(task)
+
+async def save(request_body : dict) -> tuple:
+    '''
+        This function saves the user with the TTL of its class and writes it through to the L1 cache.
+    '''
+    AsyncMemcacheClient.encode_key(request_body["user_id"])
+    envelope, expire = TTL_POLICY.wrap(request_body["user_id"], request_body)
+    try:
+        await HASH_RING.get_node(request_body["user_id"]).set(request_body["user_id"], envelope, expire=expire)
+    except Exception:
+        if L1_CACHE is not None:
+            L1_CACHE.invalidate(request_body["user_id"])
+        raise
+    if L1_CACHE is not None:
+        L1_CACHE.set(request_body["user_id"], request_body)
+    return {
+        "message" : "Saved!"
+    }, 200, None
+
+async def cache(request_body : dict) -> tuple:
+    '''
+        This function returns the cached user, marking the stale one.
+    '''
+    # Rejecting the ids that can't be Memcached keys before they reach the L1 cache or the pipeline.
+    AsyncMemcacheClient.encode_key(request_body["user_id"])
+    # Answering from the L1 cache if the user is there.
+    if L1_CACHE is not None:
+        cached_value = L1_CACHE.get(request_body["user_id"])
+        if cached_value is not None:
+            return cached_value, 200, None
+
+    # Getting the cached value from the responsible Memcached service.
+    try:
+        cached_value = await read_cached_value(request_body["user_id"])
+    except asyncio.TimeoutError:
+        return {
+            "message" : "Timed out"
+        }, 504, None
+    cached_value, stale = TTL_POLICY.unwrap(cached_value)
+    if cached_value and not stale and L1_CACHE is not None:
+        L1_CACHE.set(request_body["user_id"], cached_value)
+
+    # Returning the requested value (marking the stale one) or the error message.
+    if cached_value:
+        return cached_value, 200, [(b"x-cache-status", b"stale" if stale else b"fresh")]
+    else:
+        return {
+            "message" : "No such data"
+        }, 404, None
+
+async def lifespan(receive, send):
+    '''
+        This function closes the Memcached connections with the server, they are opened by the first requests.
+    '''
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type" : "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            for memcache_client in HASH_RING.nodes.values():
+                memcache_client.close()
+            await send({"type" : "lifespan.shutdown.complete"})
+            return
+
+async def app(scope, receive, send):
+    '''
+        The ASGI application serving the /save and /cache endpoints of the Flask gateways on the event loop.
+    '''
+    if scope["type"] == "lifespan":
+        await lifespan(receive, send)
+        return
+
+    method, path = scope["method"], scope["path"]
+    try:
+        if path == "/save" and method == "POST":
+            response, status_code, headers = await save(await read_json(receive))
+        elif path == "/cache" and method == "GET":
+            response, status_code, headers = await cache(await read_json(receive))
+        else:
+            response, status_code, headers = {"message" : "Not found!"}, 404, None
+    except MemcacheIllegalKeyError:
+        response, status_code, headers = {"message" : "Invalid user_id!"}, 400, None
+    except (KeyError, TypeError, ValueError):
+        response, status_code, headers = {"message" : "Bad request!"}, 400, None
+    except (ConnectionError, OSError, asyncio.TimeoutError):
+        response, status_code, headers = {"message" : "Memcached unavailable"}, 503, None
+    await send_response(send, response, status_code, headers)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # Running the gateway on the asyncio event loop, next to the Flask gateways on the ports 5000 and 6000.
+    uvicorn.run(app, host="127.0.0.1", port=int(os.environ.get("PORT", 7000)), log_level="warning")
\ No newline at end of file
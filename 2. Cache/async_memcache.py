@@ -0,0 +1,185 @@
+# Importing all needed modules.
+import asyncio
+import collections
+import itertools
+
+# The longest key accepted by Memcached.
+MAX_KEY_LENGTH = 250
+
+
+class MemcacheProtocolError(Exception):
+    '''
+        The error raised for an unexpected response of the Memcached service.
+    '''
+
+
+class MemcacheIllegalKeyError(ValueError):
+    '''
+        The error raised for a key that can't be sent in a command of the text protocol.
+    '''
+
+
+class AsyncConnection:
+    def __init__(self, host : str, port : int):
+        '''
+            The constructor of the Async Connection, one pipelined connection to a Memcached service.
+            The requests are written without waiting for the previous responses, Memcached answers them in order,
+            so the reader task resolves the waiting futures one after another.
+        :param host: str
+            The host of the Memcached service.
+        :param port: int
+            The port of the Memcached service.
+        '''
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+        self.reader_task = None
+        self.pending = collections.deque()
+        self.connect_lock = asyncio.Lock()
+
+    async def connect(self):
+        async with self.connect_lock:
+            if self.writer is None:
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+                self.pending = collections.deque()
+                self.reader_task = asyncio.create_task(self.read_responses(self.reader, self.pending))
+
+    async def request(self, payload : bytes, kind : str):
+        '''
+            This function sends a request and waits for its response.
+        :param payload: bytes
+            The encoded command.
+        :param kind: str
+            "values" for get, "line" for the commands answered with one line.
+        :return: any
+            The values mapped by keys to (flags, data) or the response line.
+        '''
+        if self.writer is None:
+            await self.connect()
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((future, kind))
+        self.writer.write(payload)
+        return await future
+
+    async def read_responses(self, reader : asyncio.StreamReader, pending : collections.deque):
+        '''
+            This function reads the responses in order and resolves the futures of their requests.
+        '''
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    raise ConnectionError("Connection closed by Memcached")
+                future, kind = pending.popleft()
+                if kind == "line":
+                    result = line.rstrip(b"\r\n")
+                else:
+                    result = {}
+                    while not line.startswith(b"END"):
+                        parts = line.split()
+                        if parts[0] != b"VALUE":
+                            raise MemcacheProtocolError(line)
+                        data = await reader.readexactly(int(parts[3]) + 2)
+                        result[parts[1]] = (int(parts[2]), data[:-2])
+                        line = await reader.readline()
+                if not future.done():
+                    future.set_result(result)
+        except (ConnectionError, OSError, asyncio.IncompleteReadError, MemcacheProtocolError, IndexError) as error:
+            # Failing the connection only if it wasn't already replaced.
+            if self.reader is reader:
+                self.fail(error)
+
+    def fail(self, error : Exception):
+        '''
+            This function fails the waiting requests and drops the connection, the next request reconnects.
+        '''
+        while self.pending:
+            future, _ = self.pending.popleft()
+            if not future.done():
+                future.set_exception(ConnectionError(str(error)))
+        if self.reader_task is not None and self.reader_task is not asyncio.current_task():
+            self.reader_task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+        self.reader, self.writer, self.reader_task = None, None, None
+
+
+class AsyncMemcacheClient:
+    def __init__(self, server : tuple, connections : int = 2, serde = None, timeout : float = 1.0):
+        '''
+            The constructor of the Async Memcache Client, a non-blocking client of one Memcached service.
+            The requests are spread over a few persistent pipelined connections.
+        :param server: tuple
+            The host and the port of the Memcached service.
+        :param connections: int, default = 2
+            The number of connections.
+        :param serde: any, default = None
+            The serializer of the values, with the serialize and deserialize functions of pymemcache.
+        :param timeout: float, default = 1.0
+            The seconds to wait for a response.
+        '''
+        self.server = server
+        self.connections = [AsyncConnection(*server) for _ in range(connections)]
+        self.next_connection = itertools.cycle(self.connections)
+        self.serde = serde
+        self.timeout = timeout
+
+    @staticmethod
+    def encode_key(key) -> bytes:
+        '''
+            This function encodes a key, rejecting the keys that would change the command they are sent in,
+            like pymemcache does: a space or a line break would inject another command and desync the pipeline.
+        :param key: any
+            The key, encoded by its string form.
+        :return: bytes
+            The encoded key.
+        '''
+        try:
+            encoded_key = key if isinstance(key, bytes) else str(key).encode("ascii")
+        except UnicodeEncodeError:
+            raise MemcacheIllegalKeyError(f"Non-ASCII key: {key!r}")
+        if not encoded_key or len(encoded_key) > MAX_KEY_LENGTH:
+            raise MemcacheIllegalKeyError(f"The key must have 1 to {MAX_KEY_LENGTH} bytes: {key!r}")
+        if any(byte <= 32 or byte >= 127 for byte in encoded_key):
+            raise MemcacheIllegalKeyError(f"Key with whitespace or control characters: {key!r}")
+        return encoded_key
+
+    async def request(self, payload : bytes, kind : str):
+        # A timed out request keeps its place in the pipeline, its late response is read and dropped.
+        return await asyncio.wait_for(next(self.next_connection).request(payload, kind), self.timeout)
+
+    async def get_many(self, keys : list) -> dict:
+        '''
+            This function reads many keys with one request.
+        :return: dict
+            The found keys mapped to their values.
+        '''
+        if not keys:
+            return {}
+        encoded_keys = {self.encode_key(key) : key for key in keys}
+        values = await self.request(b"get " + b" ".join(encoded_keys) + b"\r\n", "values")
+        return {
+            encoded_keys[encoded_key] : self.serde.deserialize(encoded_keys[encoded_key], data, flags) if self.serde else data
+            for encoded_key, (flags, data) in values.items() if encoded_key in encoded_keys
+        }
+
+    async def get(self, key):
+        return (await self.get_many([key])).get(key)
+
+    async def set(self, key, value, expire : int = 0) -> bool:
+        '''
+            This function saves a value.
+        :return: bool
+            True if the value was stored.
+        '''
+        data, flags = self.serde.serialize(key, value) if self.serde else (value, 0)
+        payload = b"set %s %d %d %d\r\n%s\r\n" % (self.encode_key(key), flags, expire, len(data), data)
+        return await self.request(payload, "line") == b"STORED"
+
+    async def delete(self, key) -> bool:
+        return await self.request(b"delete %s\r\n" % self.encode_key(key), "line") == b"DELETED"
+
+    def close(self):
+        for connection in self.connections:
+            connection.fail(ConnectionError("Client closed"))
\ No newline at end of file
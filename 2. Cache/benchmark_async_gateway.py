@@ -0,0 +1,127 @@
+# Importing all needed modules.
+import argparse
+import asyncio
+import random
+import resource
+import time
+from urllib.parse import urlparse
+from load_generator import HttpConnection, KeyChooser, percentile, user_payload
+
+
+def rss_bytes(pid : int) -> int:
+    '''
+        This function reads the resident memory of a process from /proc.
+    '''
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+async def open_connections(host : str, port : int, count : int, chooser : KeyChooser) -> list:
+    '''
+        This function opens the connections and sends one read over each, so the server holds their state.
+    '''
+    connections = [HttpConnection(host, port) for _ in range(count)]
+    async def warm(connection : HttpConnection):
+        try:
+            await connection.request("GET", "/cache", {"user_id" : str(chooser.choose()[0])})
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            connection.close()
+    # Opening the connections in steps, so the listen backlog of the server doesn't overflow.
+    for start in range(0, count, 500):
+        await asyncio.gather(*(warm(connection) for connection in connections[start:start + 500]))
+    return connections
+
+async def client(connection : HttpConnection, chooser : KeyChooser, read_ratio : float, stop_at : float, results : dict):
+    '''
+        This function sends the reads and the writes over one connection until the end of the run.
+    '''
+    while time.monotonic() < stop_at:
+        user_id = str(chooser.choose()[0])
+        start = time.perf_counter()
+        try:
+            if random.random() < read_ratio:
+                status_code, _ = await connection.request("GET", "/cache", {"user_id" : user_id})
+            else:
+                status_code, _ = await connection.request("POST", "/save", user_payload(user_id))
+        except (OSError, ValueError, asyncio.IncompleteReadError):
+            results["errors"] += 1
+            connection.close()
+            await asyncio.sleep(0.1)
+            continue
+        if status_code in (200, 404):
+            results["latencies"].append(time.perf_counter() - start)
+        else:
+            results["errors"] += 1
+
+async def run(url : str, pid : int, concurrency : int, args) -> dict:
+    '''
+        This function measures one gateway at one number of concurrent clients.
+    '''
+    parsed = urlparse(url)
+    chooser = KeyChooser(args.keys, "zipf", 0.99)
+    baseline = rss_bytes(pid) if pid else None
+    connections = await open_connections(parsed.hostname, parsed.port or 80, concurrency, chooser)
+    memory = rss_bytes(pid) - baseline if pid else None
+
+    results = {"latencies" : [], "errors" : 0}
+    stop_at = time.monotonic() + args.duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(connection, chooser, args.read_ratio, stop_at, results) for connection in connections))
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        connection.close()
+
+    latencies = sorted(results["latencies"])
+    return {
+        "requests_per_second" : len(latencies) / elapsed,
+        "p50_ms" : percentile(latencies, 50) * 1000,
+        "p99_ms" : percentile(latencies, 99) * 1000,
+        "errors" : results["errors"],
+        "kb_per_connection" : memory / concurrency / 1024 if pid else None
+    }
+
+async def main(args):
+    targets = dict(target.split("=", 1) for target in args.target)
+    pids = {name : int(pid) for name, pid in (item.split("=", 1) for item in args.pid)}
+
+    # Preloading the users through the first gateway, both modes read the same Memcached services.
+    parsed = urlparse(next(iter(targets.values())))
+    connection = HttpConnection(parsed.hostname, parsed.port or 80)
+    for user_id in range(min(args.preload, args.keys)):
+        await connection.request("POST", "/save", user_payload(user_id))
+    connection.close()
+
+    print(f"{'gateway':<10} {'clients':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7} {'KB/conn':>8}")
+    for concurrency in args.concurrency:
+        for name, url in targets.items():
+            result = await run(url, pids.get(name), concurrency, args)
+            memory = f"{result['kb_per_connection']:>8.1f}" if result["kb_per_connection"] is not None else f"{'-':>8}"
+            print(f"{name:<10} {concurrency:>8} {result['requests_per_second']:>8.0f} {result['p50_ms']:>8.2f} "
+                  f"{result['p99_ms']:>9.2f} {result['errors']:>7} {memory}")
+            # Letting the server close the previous connections before the next run.
+            await asyncio.sleep(args.pause)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares the Flask gateway (cache-1/main.py) and the asyncio gateway "
+                                                 "(async_gateway.py) at many concurrent keep-alive clients.")
+    parser.add_argument("--target", action="append", default=None,
+                        help="name=url of a gateway, by default flask=http://127.0.0.1:5000 and async=http://127.0.0.1:7000")
+    parser.add_argument("--pid", action="append", default=[],
+                        help="name=pid of a gateway process, to measure its resident memory per connection")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--preload", type=int, default=1000)
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--pause", type=float, default=2)
+    args = parser.parse_args()
+    args.target = args.target or ["flask=http://127.0.0.1:5000", "async=http://127.0.0.1:7000"]
+
+    # Every client holds one socket, so the limit of open files is raised to its maximum.
+    soft_limit, hard_limit = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard_limit, hard_limit))
+    random.seed(0)
+    asyncio.run(main(args))
\ No newline at end of file
@@ -0,0 +1,104 @@
+# Importing all needed modules.
+import argparse
+import random
+import threading
+import time
+from circuit_breaker import CircuitBreaker
+from hash_ring import HashRing
+from memcache_pool import MemcachePool
+
+
+class FakeClient:
+    def __init__(self, latency : float, node : dict):
+        '''
+            The constructor of the Fake Client, a Memcached client of a node that can be taken down.
+        :param latency: float
+            The round trip time in seconds.
+        :param node: dict
+            The state of the node, {"down" : bool, "timeout" : seconds}.
+        '''
+        self.latency = latency
+        self.node = node
+
+    def get(self, key):
+        if self.node["down"]:
+            # A dead node costs the whole socket timeout.
+            time.sleep(self.node["timeout"])
+            raise OSError("timed out")
+        time.sleep(self.latency)
+        return key
+
+    def close(self):
+        pass
+
+
+def find_pool(hash_ring : HashRing, key) -> MemcachePool:
+    '''
+        This function routes the key like find_memcache_service of the gateways.
+    '''
+    memcache_pool = hash_ring.get_node(key)
+    if memcache_pool.available():
+        return memcache_pool
+    for name in hash_ring.get_node_names(key, len(hash_ring))[1:]:
+        if hash_ring.nodes[name].available():
+            return hash_ring.nodes[name]
+    return memcache_pool
+
+def run(args, outage : bool, breakers : bool) -> dict:
+    '''
+        This function sends the reads from the threads, taking one node down for the whole run if outage is True.
+    '''
+    nodes = {f"memcached-{index + 1}" : {"down" : False, "timeout" : args.timeout} for index in range(args.nodes)}
+    hash_ring = HashRing({
+        name : MemcachePool(("localhost", 11211 + index), max_connections=64,
+                            breaker=CircuitBreaker(reset_timeout=args.reset_timeout) if breakers else None,
+                            client_factory=lambda node=node: FakeClient(args.latency, node))
+        for index, (name, node) in enumerate(nodes.items())
+    })
+    nodes["memcached-1"]["down"] = outage
+
+    stop, latencies, errors = threading.Event(), [], [0]
+    def worker():
+        while not stop.is_set():
+            key = f"user-{random.randrange(args.keys)}"
+            start = time.perf_counter()
+            try:
+                find_pool(hash_ring, key).get(key)
+            except Exception:
+                errors[0] += 1
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies.sort()
+    return {
+        "requests_per_second" : len(latencies) / args.duration,
+        "p50_ms" : latencies[len(latencies) // 2] * 1000,
+        "p99_ms" : latencies[int(len(latencies) * 0.99)] * 1000,
+        "errors" : errors[0]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gateway read latency during a simulated Memcached node outage.")
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.001, help="the round trip time of a live node")
+    parser.add_argument("--timeout", type=float, default=0.5, help="the socket timeout paid on the dead node")
+    parser.add_argument("--reset-timeout", type=float, default=5.0)
+    parser.add_argument("--duration", type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"{'scenario':<28} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7}")
+    for name, outage, breakers in [("no outage", False, True), ("outage, no breakers", True, False),
+                                   ("outage, circuit breakers", True, True)]:
+        result = run(args, outage, breakers)
+        print(f"{name:<28} {result['requests_per_second']:>8.0f} {result['p50_ms']:>8.2f} "
+              f"{result['p99_ms']:>9.2f} {result['errors']:>7}")
\ No newline at end of file
@@ -0,0 +1,82 @@
+# Importing all needed modules.
+import argparse
+import itertools
+import random
+import time
+from hash_ring import HashRing
+from hot_keys import HotKeys
+
+
+class SimulatedClock:
+    def __init__(self, requests_per_second : float):
+        '''
+            The constructor of the Simulated Clock, every request moves the time forward.
+        '''
+        self.now = 0.0
+        self.step = 1 / requests_per_second
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def skewed_keys(keys_count : int, requests_count : int, exponent : float, celebrity_share : float) -> list:
+    '''
+        This function generates the requested keys, a Zipfian workload with one celebrity key.
+    '''
+    cumulative_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, keys_count + 1)))
+    keys = random.choices(range(keys_count), cum_weights=cumulative_weights, k=requests_count)
+    return ["celebrity" if random.random() < celebrity_share else f"user-{key}" for key in keys]
+
+def run(keys : list, names : list, replicas : int, requests_per_second : float) -> tuple:
+    '''
+        This function counts the Memcached requests of every node.
+    :param replicas: int
+        The number of nodes of a hot key, 1 for no replication.
+    :return: dict, HotKeys
+        The node names mapped to their numbers of requests.
+        The detector of the hot keys.
+    '''
+    hash_ring = HashRing({name : name for name in names})
+    clock = SimulatedClock(requests_per_second)
+    hot_keys = HotKeys(clock=clock)
+    loads = {name : 0 for name in names}
+    replicated = set()
+    for key in keys:
+        clock.now += clock.step
+        hot_keys.record(key)
+        if replicas > 1 and hot_keys.is_hot(key):
+            nodes = hash_ring.get_node_names(key, replicas)
+            node = random.choice(nodes)
+            loads[node] += 1
+            # The first read of a replica misses and reads the responsible node before copying the value.
+            if node != nodes[0] and (node, key) not in replicated:
+                replicated.add((node, key))
+                loads[nodes[0]] += 1
+        else:
+            loads[hash_ring.get_node_name(key)] += 1
+    return loads, hot_keys
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-node load skew with and without the replication of the hot keys.")
+    parser.add_argument("--nodes", type=int, default=6)
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500000)
+    parser.add_argument("--exponent", type=float, default=1.1)
+    parser.add_argument("--celebrity-share", type=float, default=0.2)
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--requests-per-second", type=float, default=20000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    keys = skewed_keys(args.keys, args.requests, args.exponent, args.celebrity_share)
+    names = [f"memcached-{index + 1}" for index in range(args.nodes)]
+
+    for replicas in (1, args.replicas):
+        start = time.perf_counter()
+        loads, hot_keys = run(keys, names, replicas, args.requests_per_second)
+        elapsed = time.perf_counter() - start
+        mean = sum(loads.values()) / len(loads)
+        print(f"replicas={replicas} max/mean={max(loads.values()) / mean:.2f} "
+              f"shares={[round(load / sum(loads.values()) * 100, 1) for load in loads.values()]} "
+              f"hot={len(hot_keys.hot)} ({len(keys) / elapsed:.0f} requests/s simulated)")
\ No newline at end of file
@@ -0,0 +1,103 @@
+# Importing all needed modules.
+import argparse
+import collections
+import itertools
+import random
+import time
+from l1_cache import L1Cache, size_of
+
+
+class LRUCache:
+    def __init__(self, max_bytes : int, size_function = size_of):
+        '''
+            The constructor of the LRU Cache, the plain LRU the segmented one is compared to, sized like it.
+        '''
+        self.max_bytes = max_bytes
+        self.size_function = size_function
+        self.entries = collections.OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value[0]
+
+    def set(self, key, value):
+        size = self.size_function(key, value)
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self.bytes -= self.entries.popitem(last=False)[1][1]
+
+
+def zipf_keys(keys_count : int, requests_count : int, exponent : float, scan_every : int) -> list:
+    '''
+        This function generates the requested keys, a Zipfian workload with an occasional scan of cold keys.
+    :param keys_count: int
+        The number of distinct keys.
+    :param requests_count: int
+        The number of requests.
+    :param exponent: float
+        The exponent of the Zipf distribution.
+    :param scan_every: int
+        The number of requests between two scans of cold keys, 0 for no scans.
+    :return: list
+        The requested keys.
+    '''
+    cumulative_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, keys_count + 1)))
+    keys = random.choices(range(keys_count), cum_weights=cumulative_weights, k=requests_count)
+    if scan_every:
+        # Every scan reads 1000 keys the workload never reads again.
+        for position in range(scan_every, requests_count, scan_every):
+            keys[position:position] = range(keys_count + position, keys_count + position + 1000)
+    return [f"user-{key}" for key in keys]
+
+def run(cache, keys : list, value : dict) -> tuple:
+    '''
+        This function reads the keys through the cache, a miss loads the value into the cache.
+    :return: float, float
+        The hit ratio.
+        The requests per second.
+    '''
+    start = time.perf_counter()
+    for key in keys:
+        if cache.get(key) is None:
+            cache.set(key, value)
+    elapsed = time.perf_counter() - start
+    return cache.hits / (cache.hits + cache.misses), len(keys) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Hit ratio of the L1 cache on a Zipfian workload.")
+    parser.add_argument("--keys", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500000)
+    parser.add_argument("--exponent", type=float, default=0.9)
+    parser.add_argument("--scan-every", type=int, default=20000)
+    parser.add_argument("--value-size", type=int, default=512)
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[0.5, 2, 8])
+    args = parser.parse_args()
+
+    random.seed(0)
+    keys = zipf_keys(args.keys, args.requests, args.exponent, args.scan_every)
+    # The cached value is a user like the ones the gateways cache, sized by the default size_of.
+    value = {"user_id" : "user-0", "name" : "User 0", "email" : "user0@example.com", "tags" : ["load-test"],
+             "bio" : "x" * args.value_size}
+    print(f"{size_of('user-0', value)} estimated bytes per entry")
+
+    print(f"{'size MB':>8} {'LRU hits':>9} {'SLRU hits':>10} {'SLRU req/s':>11}   SLRU stats")
+    for size_mb in args.sizes_mb:
+        max_bytes = int(size_mb * 1024 * 1024)
+        lru_hit_ratio, _ = run(LRUCache(max_bytes), keys, value)
+        l1_cache = L1Cache(max_bytes, ttl=30)
+        slru_hit_ratio, requests_per_second = run(l1_cache, keys, value)
+        stats = l1_cache.stats()
+        print(f"{size_mb:>8} {lru_hit_ratio:>9.3f} {slru_hit_ratio:>10.3f} {requests_per_second:>11.0f}   "
+              f"entries={stats['entries']} bytes={stats['bytes']} evictions={stats['evictions']}")
\ No newline at end of file
@@ -0,0 +1,86 @@
+# Importing all needed modules.
+import argparse
+import time
+from memcache_pool import MemcachePool
+from metrics import MetricsRegistry, MeteredSerde, NodeMetrics, RequestMetrics, RollingRatio
+from serde import CompactSerde
+
+
+class FakeClient:
+    def __init__(self, serde):
+        '''
+            The constructor of the Fake Client, an in-memory Memcached client going through the serializer.
+        '''
+        self.serde = serde
+        self.values = {}
+
+    def get(self, key):
+        if key not in self.values:
+            return None
+        data, flags = self.values[key]
+        return self.serde.deserialize(key, data, flags)
+
+    def set(self, key, value, expire : int = 0):
+        self.values[key] = self.serde.serialize(key, value)
+        return True
+
+    def close(self):
+        pass
+
+
+def measure(function, iterations : int) -> float:
+    '''
+        This function returns the mean duration of a call of the function in microseconds.
+    '''
+    start = time.perf_counter()
+    for index in range(iterations):
+        function(index)
+    return (time.perf_counter() - start) / iterations * 1000000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Overhead of the gateway metrics per /cache request.")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--keys", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    user = {"user_id" : 1, "name" : "User 1", "email" : "user1@example.com", "bio" : "x" * 200}
+    requests = {}
+    for label in ("without metrics", "with metrics"):
+        metrics_registry = MetricsRegistry() if label == "with metrics" else None
+        node_metrics = NodeMetrics(metrics_registry, "memcached-1") if metrics_registry is not None else None
+        request_metrics = RequestMetrics(metrics_registry, "cache") if metrics_registry is not None else None
+        if metrics_registry is not None:
+            hits, misses = metrics_registry.counter("cache_hits_total", "Hits."), metrics_registry.counter("cache_misses_total", "Misses.")
+            metrics_registry.gauge("cache_hit_ratio", "The hit ratio.", RollingRatio(hits, misses).ratio)
+
+        # Counting the bytes through the serializer like the pools of the gateways do.
+        serde = MeteredSerde(CompactSerde(), node_metrics) if node_metrics is not None else CompactSerde()
+        pool = MemcachePool(("localhost", 11211), min_connections=1, max_connections=1, metrics=node_metrics,
+                            client_factory=lambda: FakeClient(serde))
+        for key in range(args.keys // 2):
+            pool.set(key, user)
+
+        def request(index : int, pool=pool, request_metrics=request_metrics):
+            # One /cache request reading a key found half of the time, with the request metrics if enabled.
+            start = time.perf_counter()
+            status_code = 200 if pool.get(index % args.keys) is not None else 404
+            if request_metrics is not None:
+                request_metrics.record(time.perf_counter() - start, status_code)
+                (hits if status_code == 200 else misses).inc()
+        requests[label] = request
+
+    # Alternating the setups and keeping the fastest round of each, so the noise of the machine cancels out.
+    results = {label : float("inf") for label in requests}
+    for _ in range(args.repeats):
+        for label, request in requests.items():
+            results[label] = min(results[label], measure(request, args.iterations // args.repeats))
+    for label in results:
+        print(f"{label:<16} {results[label]:>7.2f} us per request")
+
+    print(f"{'overhead':<16} {results['with metrics'] - results['without metrics']:>7.2f} us per request")
+    start = time.perf_counter()
+    rendered = metrics_registry.render()
+    print(f"{'render':<16} {(time.perf_counter() - start) * 1000:>7.2f} ms for {len(rendered.splitlines())} lines, "
+          f"node hit ratio {node_metrics.hit_ratio.ratio():.2f}")
\ No newline at end of file
@@ -0,0 +1,58 @@
+# Importing all needed modules.
+import argparse
+import time
+from placement import create_placement
+
+
+def imbalance(placement, keys : list) -> float:
+    '''
+        This function returns the load of the busiest node relative to the mean load.
+    '''
+    counts = {name : 0 for name in placement.nodes}
+    for key in keys:
+        counts[placement.get_node_name(key)] += 1
+    return max(counts.values()) / (len(keys) / len(counts))
+
+def moved_keys(before, after, keys : list) -> float:
+    '''
+        This function returns the fraction of the keys that changed their node between two placements.
+    '''
+    return sum(before.get_node_name(key) != after.get_node_name(key) for key in keys) / len(keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lookup speed, balance and disruption of the placement strategies.")
+    parser.add_argument("--nodes", type=int, default=6)
+    parser.add_argument("--keys", type=int, default=200000)
+    parser.add_argument("--strategies", nargs="+", default=["ring", "jump", "rendezvous", "maglev"])
+    parser.add_argument("--virtual-nodes", type=int, default=160)
+    parser.add_argument("--table-size", type=int, default=65537)
+    args = parser.parse_args()
+
+    keys = [f"user-{index}" for index in range(args.keys)]
+    names = [f"memcached-{index + 1}" for index in range(args.nodes)]
+    options = {"ring" : {"virtual_nodes" : args.virtual_nodes}, "maglev" : {"table_size" : args.table_size}}
+
+    print(f"Ideal: moved on add {100 / (args.nodes + 1):.2f} %, moved on remove {100 / args.nodes:.2f} %, max / mean 1.00")
+    print(f"{'strategy':<11} {'build ms':>9} {'lookups/s':>10} {'max / mean':>11} {'moved add %':>12} "
+          f"{'moved remove last %':>20} {'moved remove first %':>21}")
+    for strategy in args.strategies:
+        start = time.perf_counter()
+        placement = create_placement({name : name for name in names}, strategy, **options.get(strategy, {}))
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Measuring the lookup speed.
+        start = time.perf_counter()
+        for key in keys:
+            placement.get_node(key)
+        lookups_per_second = len(keys) / (time.perf_counter() - start)
+
+        # Measuring the keys moved by adding a node and by removing the last or the first node.
+        grown = create_placement({name : name for name in names + [f"memcached-{args.nodes + 1}"]}, strategy,
+                                 **options.get(strategy, {}))
+        without_last = create_placement({name : name for name in names[:-1]}, strategy, **options.get(strategy, {}))
+        without_first = create_placement({name : name for name in names[1:]}, strategy, **options.get(strategy, {}))
+
+        print(f"{strategy:<11} {build_ms:>9.1f} {lookups_per_second:>10.0f} {imbalance(placement, keys):>11.3f} "
+              f"{moved_keys(placement, grown, keys) * 100:>12.2f} {moved_keys(placement, without_last, keys) * 100:>20.2f} "
+              f"{moved_keys(placement, without_first, keys) * 100:>21.2f}")
\ No newline at end of file
@@ -0,0 +1,69 @@
+# Importing all needed modules.
+import argparse
+import threading
+import time
+from memcache_pool import MemcachePool
+
+
+class SlowClient:
+    def __init__(self, latency : float):
+        '''
+            The constructor of the Slow Client, a fake Memcached client with one socket.
+            A request holds the socket for the round trip time, like a real client.
+        :param latency: float
+            The round trip time in seconds.
+        '''
+        self.latency = latency
+        self.socket_lock = threading.Lock()
+
+    def get(self, key):
+        with self.socket_lock:
+            time.sleep(self.latency)
+            return key
+
+    def close(self):
+        pass
+
+
+def run(client, threads_count : int, duration : float) -> tuple:
+    '''
+        This function sends requests from the threads for the duration.
+    :return: float, int
+        The requests per second.
+        The number of requests that timed out waiting for a pooled client.
+    '''
+    stop, counts, timeouts = threading.Event(), [0] * threads_count, [0] * threads_count
+
+    def worker(index):
+        while not stop.is_set():
+            try:
+                client.get("user")
+                counts[index] += 1
+            except TimeoutError:
+                timeouts[index] += 1
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return sum(counts) / duration, sum(timeouts)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Throughput of one shared Memcached client against a pool of clients.")
+    parser.add_argument("--latency", type=float, default=0.001, help="the round trip time in seconds")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--max-connections", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=2)
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'shared req/s':>13} {'pooled req/s':>13} {'timeouts':>9} {'created':>8}")
+    for threads_count in args.threads:
+        shared, _ = run(SlowClient(args.latency), threads_count, args.duration)
+        pool = MemcachePool(("localhost", 11211), max_connections=args.max_connections,
+                            client_factory=lambda: SlowClient(args.latency))
+        pooled, timeouts = run(pool, threads_count, args.duration)
+        print(f"{threads_count:>7} {shared:>13.0f} {pooled:>13.0f} {timeouts:>9} {pool.stats()['created']:>8}")
\ No newline at end of file
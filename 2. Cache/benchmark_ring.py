@@ -0,0 +1,52 @@
+# Importing all needed modules.
+import argparse
+import statistics
+import time
+from hash_ring import HashRing
+
+
+def distribution(ring : HashRing, keys : list) -> dict:
+    '''
+        This function counts the keys owned by every node of the ring.
+    '''
+    counts = {name : 0 for name in ring.nodes}
+    for key in keys:
+        counts[ring.get_node_name(key)] += 1
+    return counts
+
+def moved_keys(before : HashRing, after : HashRing, keys : list) -> float:
+    '''
+        This function returns the fraction of the keys that changed their node between two rings.
+    '''
+    return sum(before.get_node_name(key) != after.get_node_name(key) for key in keys) / len(keys)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Key distribution and lookup speed of the consistent-hash ring.")
+    parser.add_argument("--nodes", type=int, default=3)
+    parser.add_argument("--keys", type=int, default=300000)
+    parser.add_argument("--virtual-nodes", type=int, nargs="+", default=[1, 10, 40, 160, 500])
+    args = parser.parse_args()
+
+    keys = [f"user-{index}" for index in range(args.keys)]
+    names = [f"memcached-{index + 1}" for index in range(args.nodes)]
+
+    print(f"{'vnodes':>7} {'min %':>7} {'max %':>7} {'stdev %':>8} {'moved on add %':>15} {'lookups/s':>11}")
+    for virtual_nodes in args.virtual_nodes:
+        ring = HashRing({name : name for name in names}, virtual_nodes)
+
+        # Measuring the balance of the keys between the nodes.
+        shares = [count / len(keys) * 100 for count in distribution(ring, keys).values()]
+
+        # Measuring the keys moved by adding a node, ideally 1 / (nodes + 1) of them.
+        grown = HashRing(dict(ring.nodes, extra="extra"), virtual_nodes)
+        moved = moved_keys(ring, grown, keys) * 100
+
+        # Measuring the lookup speed.
+        start = time.perf_counter()
+        for key in keys:
+            ring.get_node(key)
+        lookups_per_second = len(keys) / (time.perf_counter() - start)
+
+        print(f"{virtual_nodes:>7} {min(shares):>7.2f} {max(shares):>7.2f} {statistics.pstdev(shares):>8.2f} "
+              f"{moved:>15.2f} {lookups_per_second:>11.0f}")
\ No newline at end of file
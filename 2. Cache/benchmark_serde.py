@@ -0,0 +1,84 @@
+# Importing all needed modules.
+import argparse
+import pickle
+import random
+import string
+import time
+import uuid
+from serde import CompactSerde, msgpack
+
+# The overhead of an item in Memcached besides the key and the value (the item header and the CAS).
+MEMCACHED_ITEM_OVERHEAD = 56
+
+
+def random_text(length : int) -> str:
+    return "".join(random.choices(string.ascii_lowercase + " ", k=length))
+
+def user_payload(index : int, posts_count : int) -> dict:
+    '''
+        This function creates a user like the ones saved through /save, with a growing list of posts.
+    '''
+    return {
+        "user_id" : index,
+        "id" : str(uuid.UUID(int=random.getrandbits(128))),
+        "name" : random_text(12).title(),
+        "email" : f"user{index}@example.com",
+        "age" : random.randint(18, 90),
+        "active" : random.random() < 0.9,
+        "tags" : random.sample(["admin", "beta", "premium", "staff", "trial", "verified"], 2),
+        "posts" : [
+            {"id" : post, "title" : random_text(30), "likes" : random.randint(0, 1000)}
+            for post in range(posts_count)
+        ]
+    }
+
+def measure(serialize, deserialize, payloads : list) -> dict:
+    '''
+        This function measures the size and the cost of a format over the payloads.
+    '''
+    start = time.perf_counter()
+    encoded = [serialize(payload) for payload in payloads]
+    encode_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    for data in encoded:
+        deserialize(data)
+    decode_seconds = time.perf_counter() - start
+    wire_bytes = sum(len(data[0]) for data in encoded)
+    return {
+        "bytes" : wire_bytes / len(payloads),
+        "memory" : (wire_bytes + len(payloads) * MEMCACHED_ITEM_OVERHEAD) / len(payloads),
+        "encode_us" : encode_seconds / len(payloads) * 1e6,
+        "decode_us" : decode_seconds / len(payloads) * 1e6
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Size and cost of the serializers of the cached users.")
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--posts", type=int, nargs="+", default=[0, 5, 50])
+    parser.add_argument("--compress-threshold", type=int, default=1024)
+    args = parser.parse_args()
+
+    random.seed(0)
+    formats = {
+        "pickle" : (lambda value: (pickle.dumps(value), 1), lambda data: pickle.loads(data[0])),
+        "repr" : (lambda value: (repr(value).encode("utf-8"), 0), lambda data: data[0])
+    }
+    serdes = {"json" : CompactSerde(0, use_msgpack=False), "json+zlib" : CompactSerde(args.compress_threshold, use_msgpack=False)}
+    if msgpack is not None:
+        serdes.update({"msgpack" : CompactSerde(0), "msgpack+zlib" : CompactSerde(args.compress_threshold)})
+    else:
+        print("msgpack isn't installed, only the JSON encoding is measured")
+    for name, serde in serdes.items():
+        formats[name] = (
+            lambda value, serde=serde: serde.serialize("key", value),
+            lambda data, serde=serde: serde.deserialize("key", data[0], data[1])
+        )
+
+    print(f"{'posts':>5} {'format':>13} {'wire B':>8} {'memory B':>9} {'encode us':>10} {'decode us':>10}")
+    for posts_count in args.posts:
+        payloads = [user_payload(index, posts_count) for index in range(args.users)]
+        for name, (serialize, deserialize) in formats.items():
+            result = measure(serialize, deserialize, payloads)
+            print(f"{posts_count:>5} {name:>13} {result['bytes']:>8.0f} {result['memory']:>9.0f} "
+                  f"{result['encode_us']:>10.2f} {result['decode_us']:>10.2f}")
\ No newline at end of file
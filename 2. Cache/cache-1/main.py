@@ -1,89 +1,763 @@
 # Importing all needed modules.
-from flask import Flask, request
-from pymemcache.client import base
-
-# Defining the Memcached clients.
-memcache_client1 = base.Client(("localhost", 11211))
-memcache_client2 = base.Client(("localhost", 11212))
-memcache_client3 = base.Client(("localhost", 11213))
-
-# Defining the Cache Ring.
-HASH_RING = {
-    0 : memcache_client1,
-    120 : memcache_client2,
-    240 : memcache_client3
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, request
+
+# The modules shared by the gateways are in the parent folder.
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from hash_ring import HashRing
+from placement import create_placement
+from memcache_pool import MemcachePool
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from l1_cache import L1Cache
+from single_flight import SingleFlight
+from serde import CompactSerde
+from ring_membership import RecentKeys, warm_keys
+from hot_keys import HotKeys
+from ttl_policy import MAX_TTL, TTLPolicy, BackgroundRefresher
+from metrics import MetricsRegistry, NodeMetrics, RequestMetrics, RollingRatio
+from read_through import UserStore, UserStoreError
+
+# Defining the serializer of the cached users, the users over 1 KB are compressed.
+SERDE = CompactSerde(compress_threshold=1024)
+
+# Defining the pools of the Memcached clients, a client is used by one request thread at a time.
+POOL_CONFIG = {
+    "serde" : SERDE,
+    "min_connections" : 2,
+    "max_connections" : 32,
+    "connect_timeout" : 0.5,
+    "timeout" : 0.5,
+    "idle_timeout" : 60,
+    "wait_timeout" : 1.0
+}
+
+# The longest call to a Memcached service: the wait for a free client, the connection and the response.
+MEMCACHE_CALL_BUDGET = POOL_CONFIG["wait_timeout"] + POOL_CONFIG["connect_timeout"] + POOL_CONFIG["timeout"]
+
+# Defining the circuit breakers of the Memcached services, the reads of an open service go to its ring successor,
+# the saves fail until it recovers.
+BREAKER_CONFIG = {
+    "failure_threshold" : 5,
+    "slow_call_duration" : 0.25,
+    "reset_timeout" : 5.0
 }
 
 
-def find_memcache_service(request_body : dict) -> int:
+# Defining the metrics of the gateway, exposed on /metrics. The metrics of a node outlive its pools across ring changes.
+METRICS = MetricsRegistry()
+NODE_METRICS = {}
+
+# The /cache requests answered with a user (from the L1 cache too) or without one, and their hit ratio of the last minute.
+CACHE_HITS = METRICS.counter("cache_hits_total", "The number of /cache requests answered with a user.")
+CACHE_MISSES = METRICS.counter("cache_misses_total", "The number of /cache requests answered without a user.")
+HIT_RATIO = RollingRatio(CACHE_HITS, CACHE_MISSES, window=60.0)
+METRICS.gauge("cache_hit_ratio", "The hit ratio of the /cache requests of the last 60 seconds.", HIT_RATIO.ratio)
+
+
+def create_memcache_pool(name : str, server : tuple) -> MemcachePool:
+    '''
+        This function creates the pool of the clients of a Memcached service with its own circuit breaker.
+    :param name: str
+        The name of the node of the Memcached service, labeling its metrics.
+    :param server: tuple
+        The host and the port of the Memcached service.
+    :return: MemcachePool
+        The pool.
+    '''
+    if name not in NODE_METRICS:
+        NODE_METRICS[name] = NodeMetrics(METRICS, name)
+    return MemcachePool(server, breaker=CircuitBreaker(**BREAKER_CONFIG), metrics=NODE_METRICS[name], **POOL_CONFIG)
+
+memcache_client1 = create_memcache_pool("memcached-1", ("localhost", 11211))
+memcache_client2 = create_memcache_pool("memcached-2", ("localhost", 11212))
+memcache_client3 = create_memcache_pool("memcached-3", ("localhost", 11213))
+
+# Defining the placement of the users on the Memcached services, "ring", "jump", "rendezvous" or "maglev".
+# The strategy and the names of the nodes define the node of every user, so they must be the same in all gateways.
+PLACEMENT_STRATEGY = os.environ.get("CACHE_PLACEMENT", "ring")
+PLACEMENT_OPTIONS = {
+    "ring" : {"virtual_nodes" : 160},
+    "maglev" : {"table_size" : 65537}
+}.get(PLACEMENT_STRATEGY, {})
+
+# Defining the Cache Ring, placed with the chosen strategy.
+HASH_RING = create_placement({
+    "memcached-1" : memcache_client1,
+    "memcached-2" : memcache_client2,
+    "memcached-3" : memcache_client3
+}, PLACEMENT_STRATEGY, **PLACEMENT_OPTIONS)
+
+
+# The users whose copy on a Memcached service may be older than their last save, mapped by the name of the service:
+# the users whose save failed and the replicas that couldn't be invalidated. They are deleted from the service
+# before it serves a read again.
+STALE_COPIES = {}
+STALE_COPIES_LOCK = threading.Lock()
+
+
+def remember_stale_copies(name : str, users_id : list):
+    '''
+        This function records the users whose copy on a Memcached service may be older than their last save.
+    '''
+    with STALE_COPIES_LOCK:
+        STALE_COPIES.setdefault(name, set()).update(users_id)
+
+def remember_failed_saves(users_id : list):
+    '''
+        This function records the users whose save failed, their responsible services and, for the recently hot
+        users, the services of their replicas may still have their older copies.
+    '''
+    hash_ring = HASH_RING
+    for user_id in users_id:
+        if HOT_KEYS.was_hot(user_id):
+            names = hash_ring.get_node_names(user_id, HOT_KEY_REPLICAS)
+        else:
+            names = [hash_ring.get_node_name(user_id)]
+        for name in names:
+            remember_stale_copies(name, [user_id])
+
+def delete_stale_copies(name : str, memcache_pool : MemcachePool) -> bool:
+    '''
+        This function deletes from a recovered Memcached service the users whose copy on it may be stale.
+        The concurrent requests of the service wait for the deletion, so none of them reads an older copy.
+    :param name: str
+        The name of the Memcached service.
+    :param memcache_pool: MemcachePool
+        The pool of the clients of the Memcached service.
+    :return: bool
+        True if the service has no more such users, False if the deletion failed.
+    '''
+    with STALE_COPIES_LOCK:
+        users_id = STALE_COPIES.get(name)
+        if users_id:
+            try:
+                memcache_pool.delete_many(list(users_id), noreply=False)
+            except Exception:
+                return False
+        STALE_COPIES.pop(name, None)
+        return True
+
+def node_ready(name : str, memcache_pool : MemcachePool) -> bool:
+    '''
+        This function checks if a Memcached service can serve the reads: its circuit breaker lets the calls through
+        and its stale copies are deleted.
+    '''
+    return memcache_pool.available() and (name not in STALE_COPIES or delete_stale_copies(name, memcache_pool))
+
+def find_memcache_service(request_body : dict, write : bool = False) -> MemcachePool:
     '''
         This function returns based on the request body the responsible service for this request.
     :param request_body: dict
         The content of the request.
-    :return: int
-        The index of the Memcached service responsible of the request.
-    '''
-    chosen_service_index = 0
-    min_difference = 360
-
-    # Extracting the hash of the user id and calculating the hash mode 360.
-    hash_payload = int(hash(request_body["user_id"]))
-    hash_mod_360 = hash_payload % 360
-
-    # Finding the degree with the lowest distance from hash mode 360.
-    for index in HASH_RING:
-        # Calculating the difference between the degree and hash mod 360.
-        difference = abs(hash_mod_360 - index)
-        if difference < min_difference:
-            # Updating the nearest degree.
-            min_difference = difference
-            chosen_service_index = index
-    return chosen_service_index
+    :param write: bool, default = False
+        True for a save, the saves are never routed away from the responsible service.
+    :return: MemcachePool
+        The pool of the clients of the Memcached service responsible of the request, or for a read of the next
+        service on the ring if the circuit breaker of the responsible one is open.
+    '''
+    hash_ring = HASH_RING
+    name = hash_ring.get_node_name(request_body["user_id"])
+    memcache_pool = hash_ring.nodes[name]
+    if node_ready(name, memcache_pool):
+        return memcache_pool
+    # A save acknowledged by a successor would be hidden by the older copy of the responsible service
+    # once it recovers, so the save is sent to the responsible service and fails with its open circuit.
+    if write:
+        return memcache_pool
+    for name in hash_ring.get_node_names(request_body["user_id"], len(hash_ring))[1:]:
+        if node_ready(name, hash_ring.nodes[name]):
+            return hash_ring.nodes[name]
+    return memcache_pool
+
+def group_by_memcache_service(request_bodies : list, write : bool = False) -> dict:
+    '''
+        This function groups the requests by their responsible Memcached services.
+    :param request_bodies: list
+        The requests, every one with a user_id.
+    :param write: bool, default = False
+        True for saves.
+    :return: dict
+        The Memcached clients mapped to the lists of their requests.
+    '''
+    groups = {}
+    for request_body in request_bodies:
+        groups.setdefault(find_memcache_service(request_body, write), []).append(request_body)
+    return groups
+
+def decode_cached_value(cached_value):
+    '''
+        This function converts a cached value to a JSON serializable one, the values saved before
+        the serializer was added are read as bytes.
+    '''
+    return cached_value.decode("utf-8") if isinstance(cached_value, bytes) else cached_value
+
+# Defining the in-process L1 cache of the hot users, disabled if L1_CACHE_MAX_BYTES is 0.
+# Its TTL is short, because a save made through another gateway doesn't invalidate it.
+L1_CACHE_MAX_BYTES = int(os.environ.get("L1_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+L1_CACHE = L1Cache(L1_CACHE_MAX_BYTES, ttl=5) if L1_CACHE_MAX_BYTES else None
+
+# Detecting the hot users, their reads are spread over the responsible node and its successors on the ring.
+# The copies live at most one detection window, so a save invalidates them while the user was hot recently.
+HOT_KEYS = HotKeys(capacity=256, window=10.0, hot_share=0.01)
+HOT_KEY_REPLICAS = 3
+REPLICA_EXPIRE = 10
+
+
+def read_cached_value(user_id):
+    '''
+        This function reads the cached user, from a random replica if the user is hot.
+    :param user_id: any
+        The id of the user.
+    :return: any
+        The cached value or None.
+    '''
+    hash_ring = HASH_RING
+    if not HOT_KEYS.is_hot(user_id):
+        return find_memcache_service({"user_id" : user_id}).get(user_id)
+
+    # Choosing a replica among the ready ones, the first one acting as the responsible node.
+    names = [name for name in hash_ring.get_node_names(user_id, HOT_KEY_REPLICAS) if node_ready(name, hash_ring.nodes[name])]
+    if not names:
+        return find_memcache_service({"user_id" : user_id}).get(user_id)
+    name = random.choice(names)
+    if name == names[0]:
+        return hash_ring.nodes[name].get(user_id)
+
+    # Copying the value from the responsible node if the replica doesn't have it yet.
+    cached_value = hash_ring.nodes[name].get(user_id)
+    if cached_value is None:
+        cached_value = hash_ring.nodes[names[0]].get(user_id)
+        if cached_value is not None:
+            hash_ring.nodes[name].set(user_id, cached_value, expire=REPLICA_EXPIRE)
+    return cached_value
+
+def invalidate_replicas(user_id):
+    '''
+        This function deletes the copies of a recently hot user from the successors of its responsible node.
+        The copies on unavailable services are deleted when the services serve the reads again.
+    '''
+    if HOT_KEYS.was_hot(user_id):
+        hash_ring = HASH_RING
+        for name in hash_ring.get_node_names(user_id, HOT_KEY_REPLICAS)[1:]:
+            if hash_ring.nodes[name].available():
+                try:
+                    hash_ring.nodes[name].delete(user_id)
+                    continue
+                except Exception:
+                    pass
+            remember_stale_copies(name, [user_id])
+
+# Defining the read-through mode, the users missing from the cache are loaded from the distributed data store
+# and cached. Every service of the data store serves the reads, so all of them are listed.
+READ_THROUGH = os.environ.get("CACHE_READ_THROUGH", "false").lower() == "true"
+USER_STORE = UserStore([
+    url for url in os.environ.get("USER_STORE_URLS", "http://127.0.0.1:8000,http://127.0.0.1:8001,http://127.0.0.1:8002").split(",") if url
+], timeout=1.0)
+
+# The function loading a user by id for the misses and the refreshes, None to serve the stale users until their hard TTL.
+USER_LOADER = USER_STORE.get_user if READ_THROUGH else None
+
+# Defining the TTL classes of the cached users. After the soft TTL a user is stale, it is still served
+# while one background refresh reloads it, after the hard TTL Memcached drops it.
+# Without a loader nothing refreshes the stale users, so they are kept at most MAX_TTL.
+TTL_POLICY = TTLPolicy(
+    classes={
+        "default" : {"soft_ttl" : 20, "hard_ttl" : 2 * MAX_TTL if USER_LOADER is not None else MAX_TTL},
+        "volatile" : {"soft_ttl" : 5, "hard_ttl" : 15}
+    },
+    rules=[
+        {"prefix" : "session-", "class" : "volatile"}
+    ]
+)
+
+# Coalescing the concurrent misses of the same user into one call, the others wait as long as the worst case of the call:
+# three Memcached calls to copy a hot user to a replica, in the read-through mode a load trying every service
+# of the data store and a save.
+SINGLE_FLIGHT_TIMEOUT = 3 * MEMCACHE_CALL_BUDGET
+if READ_THROUGH:
+    SINGLE_FLIGHT_TIMEOUT += USER_STORE.timeout * len(USER_STORE.urls) + MEMCACHE_CALL_BUDGET
+SINGLE_FLIGHT = SingleFlight(max_waiters=1000, timeout=SINGLE_FLIGHT_TIMEOUT)
+
+
+def save_user(user : dict):
+    '''
+        This function saves the user with the TTL of its class, writes it through to the L1 cache
+        and invalidates its replicas.
+    :param user: dict
+        The user, with its user_id.
+    '''
+    envelope, expire = TTL_POLICY.wrap(user["user_id"], user)
+    try:
+        find_memcache_service(user, write=True).set(user["user_id"], envelope, expire=expire)
+    except Exception:
+        if L1_CACHE is not None:
+            L1_CACHE.invalidate(user["user_id"])
+        remember_failed_saves([user["user_id"]])
+        raise
+    if L1_CACHE is not None:
+        L1_CACHE.set(user["user_id"], user)
+    invalidate_replicas(user["user_id"])
+
+def save_users(users : list) -> list:
+    '''
+        This function saves many users with one request per Memcached service and TTL, all the services in parallel,
+        writes them through to the L1 cache and invalidates their replicas.
+    :param users: list
+        The users, every one with its user_id.
+    :return: list
+        The ids of the users that weren't saved.
+    '''
+    groups = group_by_memcache_service(users, write=True)
+
+    # Putting the users in their envelopes, the users of a Memcached service are sent at once per TTL.
+    batches = {}
+    for memcache_client, group in groups.items():
+        for user in group:
+            envelope, expire = TTL_POLICY.wrap(user["user_id"], user)
+            batches.setdefault((memcache_client, expire), {})[user["user_id"]] = envelope
+
+    # Sending the batches to all the services in parallel.
+    futures = {
+        memcache_executor.submit(memcache_client.set_many, envelopes, expire=expire) : list(envelopes)
+        for (memcache_client, expire), envelopes in batches.items()
+    }
+
+    # Collecting the users that weren't saved.
+    failed = []
+    for future, users_id in futures.items():
+        try:
+            failed.extend(future.result())
+        except Exception:
+            failed.extend(users_id)
+    remember_failed_saves(failed)
+
+    # Writing the saved users through to the L1 cache, the failed ones are removed from it.
+    if L1_CACHE is not None:
+        failed_ids = set(failed)
+        for user in users:
+            if user["user_id"] in failed_ids:
+                L1_CACHE.invalidate(user["user_id"])
+            else:
+                L1_CACHE.set(user["user_id"], user)
+    for user in users:
+        invalidate_replicas(user["user_id"])
+    return failed
+
+def load_user(user_id):
+    '''
+        This function reads the cached user and, in the read-through mode, loads the missing one from the data store
+        and caches it. A user that can't be cached is still returned, the UserStoreError is raised if the data store
+        can't be reached.
+    :param user_id: any
+        The id of the user.
+    :return: any, bool
+        The cached value or the loaded user or None.
+        True if the user was loaded from the data store.
+    '''
+    cached_value = read_cached_value(user_id)
+    if cached_value is not None or USER_LOADER is None:
+        return cached_value, False
+    user = USER_LOADER(user_id)
+    if user is None:
+        return None, False
+    user = dict(user, user_id=user_id)
+    try:
+        save_user(user)
+    except Exception:
+        pass
+    return user, True
+
+def refresh_user(user_id):
+    '''
+        This function reloads a stale user with the USER_LOADER and saves it again.
+    '''
+    if USER_LOADER is None:
+        return
+    user = USER_LOADER(user_id)
+    if user is not None:
+        save_user(dict(user, user_id=user_id))
+
+def unwrap_cached_value(user_id, cached_value) -> tuple:
+    '''
+        This function takes the user out of its envelope and schedules its refresh if it is stale.
+    :return: any, bool
+        The user.
+        True if the user is stale.
+    '''
+    cached_value, stale = TTL_POLICY.unwrap(cached_value)
+    if stale:
+        REFRESHER.schedule(user_id)
+    return cached_value, stale
+
+REFRESHER = BackgroundRefresher(refresh_user, max_workers=4)
+
+# The pool sending the requests of a batch to the different Memcached services concurrently.
+memcache_executor = ThreadPoolExecutor(max_workers=16)
+
+# The other gateways, the changes of the ring made through this gateway are sent to them.
+PEERS = [peer for peer in os.environ.get("CACHE_PEERS", "http://localhost:6000").split(",") if peer]
+
+# The lock serializing the changes of the ring and the recently used users, copied to their new nodes.
+RING_LOCK = threading.Lock()
+RECENT_KEYS = RecentKeys(max_keys=10000)
+
+
+def describe_ring(hash_ring : HashRing) -> dict:
+    '''
+        This function returns the membership of the ring, as sent to the other gateways.
+    :param hash_ring: HashRing
+        The ring.
+    :return: dict
+        The placement strategy, the epoch and the addresses of the nodes of the ring.
+    '''
+    return {
+        "strategy" : PLACEMENT_STRATEGY,
+        "epoch" : hash_ring.epoch,
+        "nodes" : {name : list(memcache_pool.server) for name, memcache_pool in hash_ring.nodes.items()}
+    }
+
+def migrate(old_ring : HashRing, new_ring : HashRing, warm : bool):
+    '''
+        This function copies the recently used users to their new nodes and closes the pools of the removed nodes.
+    '''
+    if warm:
+        print(f"Ring epoch {new_ring.epoch} warmed: {warm_keys(old_ring, new_ring, RECENT_KEYS.keys())}")
+    for name, memcache_pool in old_ring.nodes.items():
+        if new_ring.nodes.get(name) is not memcache_pool:
+            memcache_pool.close()
+
+def apply_ring(epoch : int, nodes : dict, warm : bool) -> bool:
+    '''
+        This function replaces the ring with a new one, the requests use either the old or the new ring.
+    :param epoch: int
+        The epoch of the new ring, it is applied only if it is newer than the current one.
+    :param nodes: dict
+        The names of the nodes mapped to their hosts and ports.
+    :param warm: bool
+        True to copy the recently used users to their new nodes in the background.
+    :return: bool
+        True if the ring was replaced.
+    '''
+    global HASH_RING
+    with RING_LOCK:
+        old_ring = HASH_RING
+        if epoch <= old_ring.epoch:
+            return False
+
+        # Keeping the pools of the nodes that didn't change, only the moved key ranges change their nodes.
+        memcache_pools = {}
+        for name, server in nodes.items():
+            memcache_pool = old_ring.nodes.get(name)
+            if memcache_pool is None or list(memcache_pool.server) != list(server):
+                memcache_pool = create_memcache_pool(name, tuple(server))
+            memcache_pools[name] = memcache_pool
+        new_ring = create_placement(memcache_pools, PLACEMENT_STRATEGY, epoch=epoch, **PLACEMENT_OPTIONS)
+        HASH_RING = new_ring
+    threading.Thread(target=migrate, args=(old_ring, new_ring, warm), daemon=True).start()
+    return True
+
+def propagate_ring(ring_description : dict, warm : bool) -> dict:
+    '''
+        This function sends the ring to the other gateways.
+    :return: dict
+        The peers mapped to their status codes or errors.
+    '''
+    results = {}
+    for peer in PEERS:
+        try:
+            response = requests.put(f"{peer}/admin/ring", json=dict(ring_description, warm=warm), timeout=2)
+            results[peer] = response.status_code
+        except requests.RequestException as error:
+            results[peer] = str(error)
+    return results
 
 # Creating the Flask application.
 app = Flask(__name__)
 
 
+def instrumented(route : str, counts_hits : bool = False):
+    '''
+        This function returns the decorator recording the count, errors and latency of a route.
+        The metrics of the route are created once, the requests only update them.
+    :param route: str
+        The name of the route in the metrics.
+    :param counts_hits: bool, default = False
+        True to count the found (200) and the missing (404) users of the route as hits and misses.
+    '''
+    request_metrics = RequestMetrics(METRICS, route)
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                response = function(*args, **kwargs)
+            except Exception:
+                request_metrics.record(time.perf_counter() - start, 500)
+                raise
+            status_code = response[1] if isinstance(response, tuple) else response.status_code
+            request_metrics.record(time.perf_counter() - start, status_code)
+            if counts_hits and status_code in (200, 404):
+                # The users loaded by the read-through mode are misses of the cache.
+                loaded = isinstance(response, tuple) and len(response) > 2 and response[2].get("X-Cache-Status") == "miss"
+                (CACHE_HITS if status_code == 200 and not loaded else CACHE_MISSES).inc()
+            return response
+        return wrapper
+    return decorator
+
 @app.route("/save", methods=["POST"])
+@instrumented("save")
 def save():
     '''
         This endpoint processes the save requests.
     '''
     # Extracting the request body.
     request_body = request.json
+    RECENT_KEYS.record(request_body["user_id"])
 
-    # Getting the index (degree) of the responsible Memcached service.
-    memcache_index = find_memcache_service(request_body)
-
-    # Sending the request to the Memcached service.
-    HASH_RING[memcache_index].set(request_body["user_id"],
-                                  request_body,
-                                  expire=30)
+    # Sending the request to the responsible Memcached service and writing the value through to the L1 cache.
+    try:
+        save_user(request_body)
+    except CircuitOpenError:
+        return {
+            "message" : "Memcached unavailable"
+        }, 503
     return {
         "message" : "Saved!"
     }, 200
 
 @app.route("/cache", methods=["GET"])
+@instrumented("cache", counts_hits=True)
 def cache():
     '''
         This endpoint processes the caching requests.
     '''
     # Extracting the request body.
     request_body = request.json
+    RECENT_KEYS.record(request_body["user_id"])
+    HOT_KEYS.record(request_body["user_id"])
 
-    # Getting the index (degree) of the responsible Memcached service.
-    memcache_index = find_memcache_service(request_body)
+    # Answering from the L1 cache if the user is there.
+    if L1_CACHE is not None:
+        cached_value = L1_CACHE.get(request_body["user_id"])
+        if cached_value is not None:
+            return cached_value, 200
 
-    # Getting the cached value from the responsible Memcached service.
-    cached_value = HASH_RING[memcache_index].get(request_body["user_id"])
+    # Getting the cached value from the responsible Memcached service (or a replica of a hot user),
+    # or from the data store in the read-through mode, the concurrent requests share one call.
+    try:
+        cached_value, loaded = SINGLE_FLIGHT.do(request_body["user_id"], lambda: load_user(request_body["user_id"]))
+    except TimeoutError:
+        return {
+            "message" : "Timed out"
+        }, 504
+    except CircuitOpenError:
+        return {
+            "message" : "Memcached unavailable"
+        }, 503
+    except UserStoreError:
+        return {
+            "message" : "Data store unavailable"
+        }, 503
+    if loaded:
+        return cached_value, 200, {"X-Cache-Status" : "miss"}
+    cached_value, stale = unwrap_cached_value(request_body["user_id"], cached_value)
+    if cached_value and not stale and L1_CACHE is not None:
+        L1_CACHE.set(request_body["user_id"], cached_value)
 
-    # Returning the requested value or the error message.
+    # Returning the requested value (marking the stale one) or the error message.
     if cached_value:
-        return cached_value, 200
+        return cached_value, 200, {"X-Cache-Status" : "stale" if stale else "fresh"}
     else:
         return {
             "message" : "No such data"
         }, 404
 
+@app.route("/save/batch", methods=["POST"])
+@instrumented("save_batch")
+def save_batch():
+    '''
+        This endpoint processes the save requests of many users, with one request per Memcached service.
+    '''
+    # Extracting the request body and saving the users.
+    request_body = request.json
+    failed = save_users(request_body["users"])
+    return {
+        "message" : "Saved!" if not failed else "Partially saved!",
+        "failed" : failed
+    }, 200
+
+@app.route("/cache/batch", methods=["POST"])
+@instrumented("cache_batch")
+def cache_batch():
+    '''
+        This endpoint processes the caching requests of many users, with one request per Memcached service.
+    '''
+    # Extracting the request body and taking the users found in the L1 cache.
+    request_body = request.json
+    results, users_id = {}, request_body["users_id"]
+    if L1_CACHE is not None:
+        users_id = []
+        for user_id in request_body["users_id"]:
+            cached_value = L1_CACHE.get(user_id)
+            if cached_value is not None:
+                results[user_id] = decode_cached_value(cached_value)
+            else:
+                users_id.append(user_id)
+
+    # Grouping the other users by their Memcached services.
+    groups = group_by_memcache_service([{"user_id" : user_id} for user_id in users_id])
+
+    # Getting the users of every Memcached service at once, all the services in parallel.
+    futures = {
+        memcache_executor.submit(memcache_client.get_many, [user["user_id"] for user in users]) : users
+        for memcache_client, users in groups.items()
+    }
+
+    # Building the result of every user, the missing and failed users are listed instead of failing the batch.
+    missing, failed, stale_users = [], [], []
+    for future, users in futures.items():
+        try:
+            cached_values = future.result()
+        except Exception:
+            failed.extend(user["user_id"] for user in users)
+            continue
+        for user in users:
+            if cached_values.get(user["user_id"]):
+                cached_value, stale = unwrap_cached_value(user["user_id"], cached_values[user["user_id"]])
+                results[user["user_id"]] = decode_cached_value(cached_value)
+                if stale:
+                    stale_users.append(user["user_id"])
+                elif L1_CACHE is not None:
+                    L1_CACHE.set(user["user_id"], cached_value)
+            else:
+                missing.append(user["user_id"])
+
+    # Loading the missing and failed users from the data store with one bulk request and caching them.
+    loaded = []
+    if READ_THROUGH and (missing or failed):
+        try:
+            users = USER_STORE.get_users(missing + failed)
+        except Exception:
+            users = {}
+        for user_id in missing + failed:
+            if str(user_id) in users:
+                results[user_id] = dict(users[str(user_id)], user_id=user_id)
+                loaded.append(user_id)
+        save_users([results[user_id] for user_id in loaded])
+        loaded_ids = set(loaded)
+        missing = [user_id for user_id in missing if user_id not in loaded_ids]
+        failed = [user_id for user_id in failed if user_id not in loaded_ids]
+    return {
+        "results" : results,
+        "missing" : missing,
+        "failed" : failed,
+        "stale" : stale_users,
+        "loaded" : loaded
+    }, 200
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    '''
+        This endpoint returns the statistics of the pools of the Memcached clients and of the L1 cache.
+    '''
+    return {
+        "memcached" : {name : memcache_pool.stats() for name, memcache_pool in HASH_RING.nodes.items()},
+        "l1" : L1_CACHE.stats() if L1_CACHE is not None else None,
+        "single_flight" : SINGLE_FLIGHT.stats(),
+        "serde" : SERDE.stats(),
+        "hot_keys" : HOT_KEYS.stats(),
+        "refresher" : REFRESHER.stats(),
+        "read_through" : USER_STORE.stats() if READ_THROUGH else None
+    }, 200
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    '''
+        This endpoint exposes the metrics of the gateway and of its Memcached services in the Prometheus text format.
+    '''
+    return Response(METRICS.render(), mimetype="text/plain; version=0.0.4")
+
+@app.route("/admin/ring", methods=["GET"])
+def get_ring():
+    '''
+        This endpoint returns the membership of the ring.
+    '''
+    return describe_ring(HASH_RING), 200
+
+@app.route("/admin/ring", methods=["PUT"])
+def put_ring():
+    '''
+        This endpoint replaces the ring, it is called by the gateway where the ring was changed.
+    '''
+    request_body = request.json
+    if request_body.get("strategy", PLACEMENT_STRATEGY) != PLACEMENT_STRATEGY:
+        return {
+            "message" : "Different placement strategy",
+            "strategy" : PLACEMENT_STRATEGY
+        }, 409
+    if not apply_ring(request_body["epoch"], request_body["nodes"], request_body.get("warm", False)):
+        return {
+            "message" : "Stale epoch",
+            "epoch" : HASH_RING.epoch
+        }, 409
+    return {
+        "message" : "Ring replaced!",
+        "epoch" : HASH_RING.epoch
+    }, 200
+
+@app.route("/admin/ring/nodes", methods=["POST"])
+def add_node():
+    '''
+        This endpoint adds a Memcached service to the ring of this gateway and of the other gateways.
+    '''
+    request_body = request.json
+    warm = request_body.get("warm", True)
+    with RING_LOCK:
+        ring_description = describe_ring(HASH_RING)
+    if request_body["name"] in ring_description["nodes"]:
+        return {
+            "message" : "Node already exists!"
+        }, 400
+    ring_description["epoch"] += 1
+    ring_description["nodes"][request_body["name"]] = [request_body["host"], request_body["port"]]
+    if not apply_ring(ring_description["epoch"], ring_description["nodes"], warm):
+        return {
+            "message" : "Concurrent ring change, try again"
+        }, 409
+    return dict(ring_description, peers=propagate_ring(ring_description, warm)), 200
+
+@app.route("/admin/ring/nodes", methods=["DELETE"])
+def remove_node():
+    '''
+        This endpoint removes a Memcached service from the ring of this gateway and of the other gateways.
+    '''
+    request_body = request.json
+    warm = request_body.get("warm", True)
+    with RING_LOCK:
+        ring_description = describe_ring(HASH_RING)
+    if request_body["name"] not in ring_description["nodes"]:
+        return {
+            "message" : "No such node"
+        }, 404
+    if len(ring_description["nodes"]) == 1:
+        return {
+            "message" : "The last node can't be removed"
+        }, 400
+    ring_description["epoch"] += 1
+    del ring_description["nodes"][request_body["name"]]
+    if not apply_ring(ring_description["epoch"], ring_description["nodes"], warm):
+        return {
+            "message" : "Concurrent ring change, try again"
+        }, 409
+    return dict(ring_description, peers=propagate_ring(ring_description, warm)), 200
+
 # Running the main service.
 app.run()
\ No newline at end of file
@@ -0,0 +1,117 @@
+# Importing all needed modules.
+import threading
+import time
+
+# The states of the circuit breaker.
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    '''
+        The error raised by the calls rejected while the circuit breaker is open.
+    '''
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold : int = 5, slow_call_duration : float = 0.25, reset_timeout : float = 5.0,
+                 clock = time.monotonic):
+        '''
+            The constructor of the Circuit Breaker of one Memcached service.
+            The breaker opens after failure_threshold consecutive failed or slow calls and rejects the calls.
+            After reset_timeout it lets one probe call through (half-open), the probe closes the breaker
+            if it succeeds or opens it again if it fails.
+        :param failure_threshold: int, default = 5
+            The number of consecutive failed or slow calls opening the breaker.
+        :param slow_call_duration: float, default = 0.25
+            The duration in seconds from which a successful call counts as a failure.
+        :param reset_timeout: float, default = 5.0
+            The seconds the breaker stays open before the probe call.
+        :param clock: callable, default = time.monotonic
+            The function returning the current time.
+        '''
+        self.failure_threshold = failure_threshold
+        self.slow_call_duration = slow_call_duration
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+
+        # The statistics of the breaker.
+        self.opened = 0
+        self.rejected = 0
+
+    def available(self) -> bool:
+        '''
+            This function checks, without changing the state, if a call would be let through.
+        '''
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            return not self.probe_in_flight and self.clock() >= self.opened_at + self.reset_timeout
+
+    def allow(self) -> bool:
+        '''
+            This function decides if a call is let through, the first call after reset_timeout becomes the probe.
+        '''
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+            if not self.probe_in_flight and self.clock() >= self.opened_at + self.reset_timeout:
+                self.state = HALF_OPEN
+                self.probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self, duration : float):
+        '''
+            This function records a successful call, a slow one counts as a failure.
+        :param duration: float
+            The duration of the call in seconds.
+        '''
+        if duration >= self.slow_call_duration:
+            self.record_failure()
+            return
+        with self.lock:
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            self.probe_in_flight = False
+
+    def record_ignored(self):
+        '''
+            This function records a call that failed because of its input and not of the service,
+            a probe ending this way doesn't decide the state, so the next call becomes the probe.
+        '''
+        with self.lock:
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        '''
+            This function records a failed call and opens the breaker if needed.
+        '''
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.opened += 1
+                self.state = OPEN
+                self.opened_at = self.clock()
+                self.probe_in_flight = False
+
+    def stats(self) -> dict:
+        '''
+            This function returns the state and the statistics of the breaker.
+        '''
+        with self.lock:
+            return {
+                "state" : self.state,
+                "consecutive_failures" : self.consecutive_failures,
+                "opened" : self.opened,
+                "rejected" : self.rejected
+            }
\ No newline at end of file
@@ -0,0 +1,119 @@
+# Importing all needed modules.
+import bisect
+import hashlib
+
+
+def stable_hash(key) -> int:
+    '''
+        This function returns a hash of the key that is the same in every process and after every restart,
+        unlike the built-in hash(), which is salted per process.
+    :param key: any
+        The key, hashed by its string form.
+    :return: int
+        The first 64 bits of the md5 digest of the key.
+    '''
+    return int.from_bytes(hashlib.md5(str(key).encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    def __init__(self, nodes : dict = None, virtual_nodes : int = 160, epoch : int = 0):
+        '''
+            The constructor of the Hash Ring, a consistent-hash ring with virtual nodes.
+            Every node is placed on the ring virtual_nodes times, a key belongs to the first point
+            clockwise from the hash of the key, found with a binary search.
+        :param nodes: dict, default = None
+            The nodes of the ring, the names mapped to the nodes (for example the Memcached clients).
+        :param virtual_nodes: int, default = 160
+            The number of points of every node on the ring.
+        :param epoch: int, default = 0
+            The version of the membership of the ring, every change of the nodes increases it.
+        '''
+        self.virtual_nodes = virtual_nodes
+        self.epoch = epoch
+        self.nodes = {}
+        self.points = []
+        self.owners = []
+        for name, node in (nodes or {}).items():
+            self.nodes[name] = node
+        self.rebuild()
+
+    def rebuild(self):
+        '''
+            This function places the points of all the nodes on the ring.
+            The points are sorted together with the node names, so the ring is the same in every process.
+        '''
+        ring = sorted(
+            (stable_hash(f"{name}#{index}"), name)
+            for name in self.nodes
+            for index in range(self.virtual_nodes)
+        )
+        self.points = [point for point, _ in ring]
+        self.owners = [name for _, name in ring]
+
+    def add_node(self, name : str, node):
+        '''
+            This function adds a node to the ring.
+        :param name: str
+            The name of the node, it defines the positions of the node on the ring.
+        :param node: any
+            The node.
+        '''
+        self.nodes[name] = node
+        self.rebuild()
+
+    def remove_node(self, name : str):
+        '''
+            This function removes a node from the ring, its keys move to the next nodes on the ring.
+        :param name: str
+            The name of the node.
+        '''
+        del self.nodes[name]
+        self.rebuild()
+
+    def get_node_name(self, key) -> str:
+        '''
+            This function returns the name of the node responsible for the key.
+        :param key: any
+            The key.
+        :return: str
+            The name of the responsible node.
+        '''
+        if not self.points:
+            raise LookupError("The hash ring has no nodes")
+        index = bisect.bisect_right(self.points, stable_hash(key))
+        return self.owners[index if index < len(self.points) else 0]
+
+    def get_node_names(self, key, count : int) -> list:
+        '''
+            This function returns the names of the node responsible for the key and of its successors on the ring.
+        :param key: any
+            The key.
+        :param count: int
+            The number of distinct nodes, at most the number of nodes of the ring.
+        :return: list
+            The names of the nodes, the responsible one first.
+        '''
+        if not self.points:
+            raise LookupError("The hash ring has no nodes")
+        count = min(count, len(self.nodes))
+        index = bisect.bisect_right(self.points, stable_hash(key))
+        names = []
+        while len(names) < count:
+            name = self.owners[index % len(self.points)]
+            if name not in names:
+                names.append(name)
+            index += 1
+        return names
+
+    def get_node(self, key):
+        '''
+            This function returns the node responsible for the key.
+        :param key: any
+            The key.
+        :return: any
+            The responsible node.
+        '''
+        return self.nodes[self.get_node_name(key)]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
\ No newline at end of file
@@ -0,0 +1,102 @@
+# Importing all needed modules.
+import heapq
+import threading
+import time
+
+
+class HotKeys:
+    def __init__(self, capacity : int = 256, window : float = 10.0, hot_share : float = 0.01,
+                 min_count : int = 50, max_hot : int = 32, clock = time.monotonic):
+        '''
+            The constructor of the Hot Keys, the detector of the keys getting a big share of the requests.
+            The requests are counted with the space-saving algorithm in windows of fixed length, the keys
+            with at least hot_share of the requests of the last complete window are hot during the next one.
+        :param capacity: int, default = 256
+            The number of counted keys, the counters are pruned to this size when they reach twice of it.
+        :param window: float, default = 10.0
+            The length of a window in seconds.
+        :param hot_share: float, default = 0.01
+            The minimal share of the requests of a hot key.
+        :param min_count: int, default = 50
+            The minimal number of requests of a hot key in a window, so a quiet gateway has no hot keys.
+        :param max_hot: int, default = 32
+            The maximal number of hot keys.
+        :param clock: callable, default = time.monotonic
+            The function returning the current time.
+        '''
+        self.capacity = capacity
+        self.window = window
+        self.hot_share = hot_share
+        self.min_count = min_count
+        self.max_hot = max_hot
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        # The counters of the current window, a new key starts from the highest pruned count (the error bound).
+        self.counts = {}
+        self.floor = 0
+        self.total = 0
+        self.window_end = clock() + window
+
+        # The hot keys of the last complete window and of the window before it.
+        self.hot = frozenset()
+        self.previous_hot = frozenset()
+
+    def record(self, key):
+        '''
+            This function counts a request of the key.
+        '''
+        now = self.clock()
+        with self.lock:
+            if now >= self.window_end:
+                self.rotate(now)
+            self.total += 1
+            count = self.counts.get(key)
+            self.counts[key] = (count if count is not None else self.floor) + 1
+            if len(self.counts) >= 2 * self.capacity:
+                self.prune()
+
+    def prune(self):
+        '''
+            This function keeps the counters of the most requested keys, it is called with the lock held.
+        '''
+        kept = heapq.nlargest(self.capacity, self.counts.items(), key=lambda item: item[1])
+        self.floor = kept[-1][1]
+        self.counts = dict(kept)
+
+    def rotate(self, now : float):
+        '''
+            This function finds the hot keys of the finished window and starts a new one, it is called with
+            the lock held.
+        '''
+        threshold = max(self.min_count, self.hot_share * self.total)
+        top = heapq.nlargest(self.max_hot, self.counts.items(), key=lambda item: item[1])
+        self.previous_hot = self.hot
+        self.hot = frozenset(key for key, count in top if count - self.floor >= threshold)
+        self.counts, self.floor, self.total = {}, 0, 0
+        self.window_end = now + self.window
+
+    def is_hot(self, key) -> bool:
+        '''
+            This function checks if the key is hot now.
+        '''
+        return key in self.hot
+
+    def was_hot(self, key) -> bool:
+        '''
+            This function checks if the key was hot in one of the last two windows, so copies of its value
+            living at most one window may still exist.
+        '''
+        return key in self.hot or key in self.previous_hot
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the detector.
+        '''
+        with self.lock:
+            return {
+                "hot_keys" : sorted(map(str, self.hot)),
+                "counted_keys" : len(self.counts),
+                "window_requests" : self.total,
+                "error_bound" : self.floor
+            }
\ No newline at end of file
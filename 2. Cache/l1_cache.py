@@ -0,0 +1,174 @@
+# Importing all needed modules.
+import collections
+import sys
+import threading
+import time
+from ttl_policy import MAX_TTL
+
+
+def size_of(key, value) -> int:
+    '''
+        This function estimates the memory used by an entry of the cache, with the objects held by its containers,
+        the cached users are dicts of strings and lists. An object held twice is counted once.
+    :param key: any
+        The key of the entry.
+    :param value: any
+        The value of the entry.
+    :return: int
+        The estimated size in bytes.
+    '''
+    size, seen, objects = 0, set(), [key, value]
+    while objects:
+        item = objects.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            objects.extend(item.keys())
+            objects.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            objects.extend(item)
+    return size
+
+
+class L1Cache:
+    def __init__(self, max_bytes : int = 16 * 1024 * 1024, ttl : float = 5.0, protected_ratio : float = 0.8,
+                 size_function = size_of):
+        '''
+            The constructor of the L1 Cache, a segmented LRU cache bounded by bytes.
+            New entries go to the probation segment, the entries read again are promoted to the protected
+            segment, so a scan of keys read once can't evict the hot keys.
+        :param max_bytes: int, default = 16 MB
+            The maximal estimated size of all the entries.
+        :param ttl: float, default = 5.0
+            The seconds an entry is kept, at most MAX_TTL.
+        :param protected_ratio: float, default = 0.8
+            The part of max_bytes used by the protected segment.
+        :param size_function: callable, default = size_of
+            The function estimating the size of an entry from its key and value.
+        '''
+        self.max_bytes = max_bytes
+        self.protected_max_bytes = int(max_bytes * protected_ratio)
+        self.ttl = min(ttl, MAX_TTL)
+        self.size_function = size_function
+
+        # The segments map the keys to (value, size, expire time), the least recently used entries first.
+        self.probation = collections.OrderedDict()
+        self.protected = collections.OrderedDict()
+        self.probation_bytes = 0
+        self.protected_bytes = 0
+        self.lock = threading.Lock()
+
+        # The statistics of the cache.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        '''
+            This function returns the cached value of the key.
+        :param key: any
+            The key.
+        :return: any
+            The value or None if the key isn't cached or expired.
+        '''
+        now = time.monotonic()
+        with self.lock:
+            entry = self.protected.get(key)
+            if entry is not None:
+                if entry[2] <= now:
+                    self.remove_entry(key)
+                    self.expirations += 1
+                    self.misses += 1
+                    return None
+                self.protected.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+            entry = self.probation.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self.remove_entry(key)
+                    self.expirations += 1
+                self.misses += 1
+                return None
+
+            # Promoting the entry read for the second time to the protected segment.
+            del self.probation[key]
+            self.probation_bytes -= entry[1]
+            self.protected[key] = entry
+            self.protected_bytes += entry[1]
+
+            # Moving the least recently used protected entries back to the probation segment.
+            while self.protected_bytes > self.protected_max_bytes and len(self.protected) > 1:
+                demoted_key, demoted_entry = self.protected.popitem(last=False)
+                self.protected_bytes -= demoted_entry[1]
+                self.probation[demoted_key] = demoted_entry
+                self.probation_bytes += demoted_entry[1]
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        '''
+            This function caches the value of the key, it replaces the previous value.
+        :param key: any
+            The key.
+        :param value: any
+            The value.
+        '''
+        size = self.size_function(key, value)
+        if size > self.max_bytes:
+            self.invalidate(key)
+            return
+        with self.lock:
+            self.remove_entry(key)
+            self.probation[key] = (value, size, time.monotonic() + self.ttl)
+            self.probation_bytes += size
+
+            # Evicting the least recently used entries, first from the probation segment.
+            while self.probation_bytes + self.protected_bytes > self.max_bytes:
+                segment = self.probation if self.probation else self.protected
+                _, evicted_entry = segment.popitem(last=False)
+                if segment is self.probation:
+                    self.probation_bytes -= evicted_entry[1]
+                else:
+                    self.protected_bytes -= evicted_entry[1]
+                self.evictions += 1
+
+    def invalidate(self, key):
+        '''
+            This function removes the key from the cache.
+        '''
+        with self.lock:
+            self.remove_entry(key)
+
+    def remove_entry(self, key):
+        '''
+            This function removes the key from its segment, it is called with the lock held.
+        '''
+        entry = self.probation.pop(key, None)
+        if entry is not None:
+            self.probation_bytes -= entry[1]
+            return
+        entry = self.protected.pop(key, None)
+        if entry is not None:
+            self.protected_bytes -= entry[1]
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the cache.
+        '''
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                "hits" : self.hits,
+                "misses" : self.misses,
+                "hit_ratio" : self.hits / requests if requests else 0.0,
+                "evictions" : self.evictions,
+                "expirations" : self.expirations,
+                "entries" : len(self.probation) + len(self.protected),
+                "bytes" : self.probation_bytes + self.protected_bytes,
+                "max_bytes" : self.max_bytes
+            }
\ No newline at end of file
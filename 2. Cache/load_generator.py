@@ -0,0 +1,229 @@
+# Importing all needed modules.
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+from urllib.parse import urlparse
+
+
+class HttpConnection:
+    def __init__(self, host : str, port : int):
+        '''
+            The constructor of the HTTP Connection, a minimal keep-alive HTTP/1.1 client.
+        :param host: str
+            The host of the server.
+        :param port: int
+            The port of the server.
+        '''
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method : str, path : str, body : dict = None):
+        '''
+            This function sends a request, reopening the connection if the server closed it.
+        :param method: str
+            The HTTP method.
+        :param path: str
+            The path with the query string.
+        :param body: dict, default = None
+            The JSON body of the request, sent with GET too, like the gateway expects.
+        :return: int, bytes
+            The status code.
+            The response body.
+        '''
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        headers = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Length: {len(payload)}\r\n"
+        if body is not None:
+            headers += "Content-Type: application/json\r\n"
+        self.writer.write(headers.encode("ascii") + b"\r\n" + payload)
+
+        # Reading the status line and the headers.
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Connection closed by the server")
+        version, status_code = status_line.split()[:2]
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        # Reading the body and closing the connection if the server doesn't keep it alive.
+        if "content-length" in response_headers:
+            response_body = await self.reader.readexactly(int(response_headers["content-length"]))
+        else:
+            response_body = await self.reader.read()
+        if version == b"HTTP/1.0" or response_headers.get("connection", "").lower() == "close" \
+                or "content-length" not in response_headers:
+            self.close()
+        return int(status_code), response_body
+
+    def close(self):
+        '''
+            This function closes the connection.
+        '''
+        if self.writer is not None:
+            self.writer.close()
+            self.reader, self.writer = None, None
+
+
+class KeyChooser:
+    def __init__(self, keys_count : int, distribution : str, exponent : float):
+        '''
+            The constructor of the Key Chooser, it picks the user ids of the requests.
+        :param keys_count: int
+            The number of distinct user ids.
+        :param distribution: str
+            "zipf" or "uniform".
+        :param exponent: float
+            The exponent of the Zipf distribution.
+        '''
+        self.keys_count = keys_count
+        self.cumulative_weights = None
+        if distribution == "zipf":
+            self.cumulative_weights = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, keys_count + 1)))
+
+    def choose(self, count : int = 1) -> list:
+        if self.cumulative_weights is None:
+            return [random.randrange(self.keys_count) for _ in range(count)]
+        return random.choices(range(self.keys_count), cum_weights=self.cumulative_weights, k=count)
+
+
+def percentile(values : list, q : float) -> float:
+    '''
+        This function returns the q-th percentile of the sorted values.
+    '''
+    return values[min(len(values) - 1, int(q / 100 * len(values)))] if values else float("nan")
+
+def user_payload(user_id) -> dict:
+    '''
+        This function creates the saved user, its id is sent as a string like the ids of the data store,
+        pymemcache rejects the integer keys.
+    '''
+    return {
+        "user_id" : str(user_id),
+        "name" : f"User {user_id}",
+        "email" : f"user{user_id}@example.com",
+        "tags" : ["load-test"],
+        "bio" : "x" * random.randint(50, 500)
+    }
+
+async def worker(host : str, port : int, chooser : KeyChooser, read_ratio : float, stop_at : float, results : dict):
+    '''
+        This function sends the reads and the writes over one keep-alive connection until the end of the run.
+    '''
+    connection = HttpConnection(host, port)
+    while time.monotonic() < stop_at:
+        user_id = str(chooser.choose()[0])
+        operation = "cache" if random.random() < read_ratio else "save"
+        start = time.perf_counter()
+        try:
+            if operation == "cache":
+                status_code, _ = await connection.request("GET", "/cache", {"user_id" : user_id})
+            else:
+                status_code, _ = await connection.request("POST", "/save", user_payload(user_id))
+        except (OSError, ValueError, asyncio.IncompleteReadError) as error:
+            results["errors"].append(type(error).__name__)
+            connection.close()
+            await asyncio.sleep(0.1)
+            continue
+        latency = time.perf_counter() - start
+        if status_code == 200:
+            results[operation].append(latency)
+        elif operation == "cache" and status_code == 404:
+            results["misses"].append(latency)
+        else:
+            results["errors"].append(status_code)
+    connection.close()
+
+async def memcached_items(host : str, port : int) -> int:
+    '''
+        This function reads the number of items of a Memcached service (or stand-in) from its stats.
+    '''
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b"stats\r\n")
+    items = None
+    while True:
+        line = await reader.readline()
+        if not line or line.startswith(b"END"):
+            break
+        parts = line.split()
+        if len(parts) == 3 and parts[1] == b"curr_items":
+            items = int(parts[2])
+    writer.close()
+    return items
+
+async def nodes_items(connection : HttpConnection) -> dict:
+    '''
+        This function returns the number of items of every node of the ring of the gateway.
+    '''
+    status_code, body = await connection.request("GET", "/admin/ring")
+    if status_code != 200:
+        return {}
+    items = {}
+    for name, (host, port) in json.loads(body)["nodes"].items():
+        try:
+            items[name] = await memcached_items(host, port)
+        except OSError as error:
+            items[name] = type(error).__name__
+    return items
+
+async def run(args) -> dict:
+    '''
+        This function runs the load against the gateway.
+    '''
+    parsed = urlparse(args.url)
+    host, port = parsed.hostname, parsed.port or 80
+    chooser = KeyChooser(args.keys, args.distribution, args.exponent)
+
+    # Preloading the users, so the reads measure the hits and not only the misses.
+    connection = HttpConnection(host, port)
+    for user_id in range(min(args.preload, args.keys)):
+        await connection.request("POST", "/save", user_payload(user_id))
+
+    results = {"cache" : [], "save" : [], "misses" : [], "errors" : []}
+    stop_at = time.monotonic() + args.duration
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, chooser, args.read_ratio, stop_at, results) for _ in range(args.connections)))
+    elapsed = time.perf_counter() - start
+
+    report = {"requests_per_second" : sum(len(results[name]) for name in ("cache", "save", "misses")) / elapsed}
+    for name in ("cache", "save", "misses"):
+        latencies = sorted(results[name])
+        report[name] = {
+            "count" : len(latencies),
+            "p50_ms" : percentile(latencies, 50) * 1000,
+            "p99_ms" : percentile(latencies, 99) * 1000
+        }
+    reads = len(results["cache"]) + len(results["misses"])
+    report["hit_ratio"] = len(results["cache"]) / reads if reads else None
+    report["errors"] = len(results["errors"])
+    report["nodes_items"] = await nodes_items(connection)
+    connection.close()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load generator of the cache gateway, run against memcached_standin.py "
+                                                 "or the docker-compose services.")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--keys", type=int, default=10000)
+    parser.add_argument("--preload", type=int, default=1000)
+    parser.add_argument("--distribution", choices=["zipf", "uniform"], default="zipf")
+    parser.add_argument("--exponent", type=float, default=0.99)
+    parser.add_argument("--read-ratio", type=float, default=0.9)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    print(json.dumps(asyncio.run(run(args)), indent=2))
\ No newline at end of file
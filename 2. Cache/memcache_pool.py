@@ -0,0 +1,250 @@
+# Importing all needed modules.
+import collections
+import contextlib
+import threading
+import time
+from circuit_breaker import CircuitOpenError
+from metrics import MeteredSerde
+
+
+class MemcachePool:
+    def __init__(self, server : tuple, min_connections : int = 1, max_connections : int = 16,
+                 connect_timeout : float = 1.0, timeout : float = 1.0, idle_timeout : float = 60.0,
+                 wait_timeout : float = 1.0, serde = None, breaker = None, client_factory = None, metrics = None,
+                 node_errors : tuple = None):
+        '''
+            The constructor of the Memcache Pool, a thread-safe pool of the clients of one Memcached service.
+            Every client holds one socket and is used by one thread at a time.
+        :param server: tuple
+            The host and the port of the Memcached service.
+        :param min_connections: int, default = 1
+            The number of clients created at the start and kept even if idle.
+        :param max_connections: int, default = 16
+            The maximal number of clients, the next threads wait for a free one.
+        :param connect_timeout: float, default = 1.0
+            The seconds to wait for the connection to the Memcached service.
+        :param timeout: float, default = 1.0
+            The seconds to wait for the responses of the Memcached service.
+        :param idle_timeout: float, default = 60.0
+            The seconds after which an unused client above min_connections is closed.
+        :param wait_timeout: float, default = 1.0
+            The seconds a thread waits for a free client before a TimeoutError.
+        :param serde: any, default = None
+            The serializer of the values used by the pymemcache clients.
+        :param breaker: CircuitBreaker, default = None
+            The circuit breaker of the Memcached service, the calls are rejected while it is open.
+        :param client_factory: callable, default = None
+            The function creating a client, a pymemcache client by default.
+        :param metrics: NodeMetrics, default = None
+            The metrics of the Memcached service, recording the hits, the writes, the bytes and the durations of the calls.
+        :param node_errors: tuple, default = None
+            The errors counted as failures of the Memcached service by the circuit breaker, the connection and
+            socket errors and the server errors of pymemcache by default. The other errors, like an illegal key,
+            are the fault of the caller.
+        '''
+        if metrics is not None and serde is not None:
+            serde = MeteredSerde(serde, metrics)
+        if client_factory is None:
+            # Importing pymemcache only when the real clients are used, the benchmarks use fake ones.
+            from pymemcache.client import base
+            from pymemcache.exceptions import MemcacheServerError, MemcacheUnknownError
+            if node_errors is None:
+                node_errors = (OSError, MemcacheServerError, MemcacheUnknownError)
+
+            def client_factory():
+                return base.Client(server, connect_timeout=connect_timeout, timeout=timeout, no_delay=True, serde=serde)
+
+        self.server = server
+        self.min_connections = min_connections
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.client_factory = client_factory
+        self.breaker = breaker
+        self.metrics = metrics
+        self.node_errors = node_errors or (OSError,)
+
+        # The idle clients with the time they were released, the most recently used ones at the right.
+        self.idle = collections.deque()
+        self.condition = threading.Condition()
+        self.size = 0
+        self.in_use = 0
+        self.waiting = 0
+        self.created = 0
+        self.closed = 0
+        with self.condition:
+            for _ in range(min_connections):
+                self.idle.append((self.create_client(), time.monotonic()))
+
+    def create_client(self):
+        '''
+            This function creates a client, it is called with the condition held.
+        '''
+        self.size += 1
+        self.created += 1
+        return self.client_factory()
+
+    def close_client(self, client):
+        '''
+            This function closes a client, it is called with the condition held.
+        '''
+        self.size -= 1
+        self.closed += 1
+        try:
+            client.close()
+        except Exception:
+            pass
+
+    def acquire(self):
+        '''
+            This function takes a free client or creates a new one if the pool isn't full.
+        :return: any
+            The client.
+        '''
+        with self.condition:
+            deadline = time.monotonic() + self.wait_timeout
+            while not self.idle and self.size >= self.max_connections:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No free Memcached client for {self.server} after {self.wait_timeout} seconds")
+                self.waiting += 1
+                self.condition.wait(remaining)
+                self.waiting -= 1
+            self.in_use += 1
+            if self.idle:
+                return self.idle.pop()[0]
+            return self.create_client()
+
+    def release(self, client, broken : bool = False):
+        '''
+            This function returns a client to the pool and closes the clients idle for too long.
+        :param client: any
+            The client.
+        :param broken: bool, default = False
+            True if the client failed, it is closed instead of reused.
+        '''
+        with self.condition:
+            self.in_use -= 1
+            now = time.monotonic()
+            if broken:
+                self.close_client(client)
+            else:
+                self.idle.append((client, now))
+
+            # Reaping the idle clients, the oldest ones are at the left.
+            while self.idle and self.size > self.min_connections and now - self.idle[0][1] > self.idle_timeout:
+                self.close_client(self.idle.popleft()[0])
+            self.condition.notify()
+
+    def available(self) -> bool:
+        '''
+            This function checks if the circuit breaker of the Memcached service lets the calls through.
+        '''
+        return self.breaker is None or self.breaker.available()
+
+    @contextlib.contextmanager
+    def client(self):
+        '''
+            This function lends a client for the duration of a with block.
+            The failures and the durations of the calls are recorded by the circuit breaker, the time waited
+            for a free client and the errors of the caller aren't charged to the Memcached service.
+        '''
+        if self.breaker is None:
+            client = self.acquire()
+            try:
+                yield client
+            except Exception:
+                self.release(client, broken=True)
+                raise
+            self.release(client)
+            return
+
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"The circuit breaker of {self.server} is open")
+        try:
+            client = self.acquire()
+        except TimeoutError:
+            # A full pool is a local overload, not a failure of the service.
+            self.breaker.record_ignored()
+            raise
+        start = time.perf_counter()
+        try:
+            yield client
+        except self.node_errors:
+            self.release(client, broken=True)
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.release(client, broken=True)
+            self.breaker.record_ignored()
+            raise
+        self.release(client)
+        self.breaker.record_success(time.perf_counter() - start)
+
+    def call(self, operation : str, argument, *args, **kwargs):
+        '''
+            This function calls a function of a lent client and records the call in the metrics.
+        :param operation: str
+            The name of the function of the client.
+        :param argument: any
+            The first argument, the key or the keys (or the values) of the call.
+        :return: any
+            The result of the call.
+        '''
+        if self.metrics is None:
+            with self.client() as client:
+                return getattr(client, operation)(argument, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            with self.client() as client:
+                result = getattr(client, operation)(argument, *args, **kwargs)
+        except Exception:
+            self.metrics.errors.inc()
+            raise
+        self.metrics.record(operation, time.perf_counter() - start, argument, result)
+        return result
+
+    def get(self, key, *args, **kwargs):
+        return self.call("get", key, *args, **kwargs)
+
+    def set(self, key, value, *args, **kwargs):
+        return self.call("set", key, value, *args, **kwargs)
+
+    def add(self, key, value, *args, **kwargs):
+        return self.call("add", key, value, *args, **kwargs)
+
+    def get_many(self, keys, *args, **kwargs):
+        return self.call("get_many", keys, *args, **kwargs)
+
+    def set_many(self, values, *args, **kwargs):
+        return self.call("set_many", values, *args, **kwargs)
+
+    def delete(self, key, *args, **kwargs):
+        return self.call("delete", key, *args, **kwargs)
+
+    def delete_many(self, keys, *args, **kwargs):
+        return self.call("delete_many", keys, *args, **kwargs)
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the pool.
+        '''
+        with self.condition:
+            return {
+                "in_use" : self.in_use,
+                "idle" : len(self.idle),
+                "waiting" : self.waiting,
+                "size" : self.size,
+                "created" : self.created,
+                "closed" : self.closed,
+                "max_connections" : self.max_connections,
+                "breaker" : self.breaker.stats() if self.breaker is not None else None
+            }
+
+    def close(self):
+        '''
+            This function closes the idle clients.
+        '''
+        with self.condition:
+            while self.idle:
+                self.close_client(self.idle.pop()[0])
\ No newline at end of file
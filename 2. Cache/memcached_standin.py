@@ -0,0 +1,185 @@
+# Importing all needed modules.
+import argparse
+import asyncio
+import collections
+import time
+
+# The expire times up to 30 days are relative, the longer ones are unix times, like in Memcached.
+RELATIVE_EXPIRE_LIMIT = 60 * 60 * 24 * 30
+
+# The estimated memory used by an item besides its key and value.
+ITEM_OVERHEAD = 56
+
+
+class MemcachedStandIn:
+    def __init__(self, max_bytes : int = 64 * 1024 * 1024):
+        '''
+            The constructor of the Memcached Stand-In, an in-process store speaking the Memcached text protocol.
+            It supports get, gets, set, add, replace, delete, touch, stats, flush_all and version, with expire times
+            and a least recently used eviction bounded by memory.
+        :param max_bytes: int, default = 64 MB
+            The maximal estimated memory of the items.
+        '''
+        self.max_bytes = max_bytes
+
+        # The items map the keys to (flags, data, expire time or 0), the least recently used items first.
+        self.items = collections.OrderedDict()
+        self.bytes = 0
+        self.stats = collections.Counter()
+        self.started_at = time.time()
+
+    @staticmethod
+    def expire_time(exptime : int) -> float:
+        '''
+            This function converts the expire time of a command to a unix time, 0 for never.
+        '''
+        if exptime == 0:
+            return 0
+        if exptime < 0:
+            return -1
+        return time.time() + exptime if exptime <= RELATIVE_EXPIRE_LIMIT else exptime
+
+    def lookup(self, key : bytes):
+        '''
+            This function returns the live item of the key and marks it as recently used.
+        '''
+        item = self.items.get(key)
+        if item is None:
+            return None
+        if item[2] and item[2] <= time.time():
+            self.remove(key)
+            return None
+        self.items.move_to_end(key)
+        return item
+
+    def remove(self, key : bytes):
+        item = self.items.pop(key, None)
+        if item is not None:
+            self.bytes -= len(key) + len(item[1]) + ITEM_OVERHEAD
+        return item
+
+    def store(self, key : bytes, flags : int, exptime : int, data : bytes):
+        '''
+            This function stores an item and evicts the least recently used ones over the memory limit.
+        '''
+        self.remove(key)
+        expire_at = self.expire_time(exptime)
+        if expire_at == -1:
+            return
+        self.items[key] = (flags, data, expire_at)
+        self.bytes += len(key) + len(data) + ITEM_OVERHEAD
+        while self.bytes > self.max_bytes and self.items:
+            self.remove(next(iter(self.items)))
+            self.stats["evictions"] += 1
+
+    def storage_command(self, command : bytes, key : bytes, flags : int, exptime : int, data : bytes) -> bytes:
+        '''
+            This function runs set, add and replace.
+        '''
+        self.stats["cmd_set"] += 1
+        exists = self.lookup(key) is not None
+        if (command == b"add" and exists) or (command == b"replace" and not exists):
+            return b"NOT_STORED\r\n"
+        self.store(key, flags, exptime, data)
+        return b"STORED\r\n"
+
+    def get_command(self, command : bytes, keys : list) -> bytes:
+        '''
+            This function runs get and gets, the CAS of gets is a constant, the stand-in has no cas command.
+        '''
+        response = []
+        for key in keys:
+            self.stats["cmd_get"] += 1
+            item = self.lookup(key)
+            if item is None:
+                self.stats["get_misses"] += 1
+                continue
+            self.stats["get_hits"] += 1
+            cas = b" 0" if command == b"gets" else b""
+            response.append(b"VALUE %s %d %d%s\r\n%s\r\n" % (key, item[0], len(item[1]), cas, item[1]))
+        response.append(b"END\r\n")
+        return b"".join(response)
+
+    def stats_command(self) -> bytes:
+        values = {
+            "uptime" : int(time.time() - self.started_at),
+            "curr_items" : len(self.items),
+            "bytes" : self.bytes,
+            "limit_maxbytes" : self.max_bytes,
+            "cmd_get" : self.stats["cmd_get"],
+            "cmd_set" : self.stats["cmd_set"],
+            "get_hits" : self.stats["get_hits"],
+            "get_misses" : self.stats["get_misses"],
+            "evictions" : self.stats["evictions"]
+        }
+        return b"".join(b"STAT %s %d\r\n" % (name.encode(), value) for name, value in values.items()) + b"END\r\n"
+
+    async def handle(self, reader : asyncio.StreamReader, writer : asyncio.StreamWriter):
+        '''
+            This function serves one connection, the responses of the pipelined commands are sent in order.
+        '''
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.split()
+                if not parts:
+                    continue
+                command, noreply = parts[0].lower(), parts[-1] == b"noreply"
+                if command in (b"set", b"add", b"replace"):
+                    data = await reader.readexactly(int(parts[4]) + 2)
+                    response = self.storage_command(command, parts[1], int(parts[2]), int(parts[3]), data[:-2])
+                elif command in (b"get", b"gets"):
+                    response = self.get_command(command, parts[1:])
+                elif command == b"delete":
+                    response = b"DELETED\r\n" if self.remove(parts[1]) is not None else b"NOT_FOUND\r\n"
+                elif command == b"touch":
+                    item = self.lookup(parts[1])
+                    if item is not None:
+                        self.items[parts[1]] = (item[0], item[1], self.expire_time(int(parts[2])))
+                    response = b"TOUCHED\r\n" if item is not None else b"NOT_FOUND\r\n"
+                elif command == b"stats":
+                    response = self.stats_command()
+                elif command == b"flush_all":
+                    self.items.clear()
+                    self.bytes = 0
+                    response = b"OK\r\n"
+                elif command == b"version":
+                    response = b"VERSION 1.6.0-standin\r\n"
+                elif command == b"quit":
+                    break
+                else:
+                    response = b"ERROR\r\n"
+                if not noreply:
+                    writer.write(response)
+                    await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(host : str, ports : list, max_bytes : int):
+    '''
+        This function runs one stand-in on every port.
+    '''
+    servers = []
+    for port in ports:
+        stand_in = MemcachedStandIn(max_bytes)
+        servers.append(await asyncio.start_server(stand_in.handle, host, port))
+        print(f"Memcached stand-in listening on {host}:{port}")
+    await asyncio.gather(*(server.serve_forever() for server in servers))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memcached text protocol stand-ins replacing the docker-compose services.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ports", type=int, nargs="+", default=[11211, 11212, 11213, 11214, 11215, 11216])
+    parser.add_argument("--max-mb", type=float, default=64)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.ports, int(args.max_mb * 1024 * 1024)))
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -0,0 +1,311 @@
+# Importing all needed modules.
+import bisect
+import collections
+import threading
+import time
+from threading import get_ident
+
+# The default buckets of the latency histograms in seconds, from 10 microseconds to 10 seconds.
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005,
+                   0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def render_labels(labels : dict) -> str:
+    '''
+        This function renders the labels of a metric in the Prometheus text format.
+    :param labels: dict
+        The labels of the metric.
+    :return: str
+        The rendered labels, for example {route="create"}, or an empty string.
+    '''
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+
+class Counter:
+    def __init__(self, name : str, labels : dict = None):
+        '''
+            The constructor of the Counter, a monotonically increasing value.
+            Every thread adds to its own cell without a lock, the cells are summed when the counter is read.
+            The cells are keyed by the thread identifiers, which are reused after a thread ends, so the threads
+            started per request don't add cells forever.
+        :param name: str
+            The name of the metric.
+        :param labels: dict, default = None
+            The labels of the metric, rendered once when the counter is created.
+        '''
+        self.name = name
+        self.labels = render_labels(labels)
+        self.cells = {}
+
+    def inc(self, amount : int = 1):
+        cell = self.cells.get(get_ident())
+        if cell is None:
+            cell = self.cells.setdefault(get_ident(), [0])
+        cell[0] += amount
+
+    @property
+    def value(self) -> int:
+        return sum(cell[0] for cell in list(self.cells.values()))
+
+    def render(self) -> list:
+        return [f"{self.name}{self.labels} {self.value}"]
+
+
+class Gauge:
+    def __init__(self, name : str, function, labels : dict = None):
+        '''
+            The constructor of the Gauge, a value read from a function when the metrics are rendered.
+        :param name: str
+            The name of the metric.
+        :param function: callable
+            The function returning the current value.
+        :param labels: dict, default = None
+            The labels of the metric.
+        '''
+        self.name = name
+        self.labels = render_labels(labels)
+        self.function = function
+
+    def render(self) -> list:
+        return [f"{self.name}{self.labels} {self.function()}"]
+
+
+class Histogram:
+    def __init__(self, name : str, labels : dict = None, buckets : tuple = LATENCY_BUCKETS):
+        '''
+            The constructor of the Histogram.
+            The counts of the buckets are preallocated per thread like the cells of the Counter, so an observation
+            is a bisect and two additions without a lock. The threads are merged when the histogram is rendered.
+        :param name: str
+            The name of the metric.
+        :param labels: dict, default = None
+            The labels of the metric.
+        :param buckets: tuple, default = LATENCY_BUCKETS
+            The sorted upper bounds of the buckets.
+        '''
+        self.name = name
+        self.labels = labels or {}
+        self.buckets = buckets
+
+        # The cells of the threads hold the counts of the buckets followed by the sum of the values.
+        self.cells = {}
+
+    def observe(self, value : float):
+        cell = self.cells.get(get_ident())
+        if cell is None:
+            cell = self.cells.setdefault(get_ident(), [0] * (len(self.buckets) + 1) + [0.0])
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def render(self) -> list:
+        # Merging the cells, an observation in progress may be counted without its value.
+        merged = [sum(column) for column in zip(*list(self.cells.values()))] or [0] * (len(self.buckets) + 1) + [0.0]
+        counts, total = merged[:-1], merged[-1]
+
+        # Rendering the cumulative counts of the buckets.
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{render_labels(dict(self.labels, le=bound))} {cumulative}")
+        lines.append(f"{self.name}_sum{render_labels(self.labels)} {total}")
+        lines.append(f"{self.name}_count{render_labels(self.labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        '''
+            The constructor of the Metrics Registry.
+            The metrics are created once at the start, the hot paths only update the created objects.
+        '''
+        self.families = {}
+
+    def add(self, metric, metric_type : str, description : str):
+        '''
+            This function adds a metric to its family.
+        '''
+        family = self.families.setdefault(metric.name, {"type" : metric_type, "help" : description, "metrics" : []})
+        family["metrics"].append(metric)
+        return metric
+
+    def counter(self, name : str, description : str, labels : dict = None) -> Counter:
+        return self.add(Counter(name, labels), "counter", description)
+
+    def gauge(self, name : str, description : str, function, labels : dict = None) -> Gauge:
+        return self.add(Gauge(name, function, labels), "gauge", description)
+
+    def histogram(self, name : str, description : str, labels : dict = None, buckets : tuple = LATENCY_BUCKETS) -> Histogram:
+        return self.add(Histogram(name, labels, buckets), "histogram", description)
+
+    def render(self) -> str:
+        '''
+            This function renders all the metrics in the Prometheus text format.
+        :return: str
+            The rendered metrics.
+        '''
+        lines = []
+        for name, family in self.families.items():
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['type']}")
+            for metric in family["metrics"]:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RollingRatio:
+    def __init__(self, hits : Counter, misses : Counter, window : float = 60.0, clock = time.monotonic):
+        '''
+            The constructor of the Rolling Ratio, the ratio of the hits over about the last window seconds.
+            It keeps snapshots of the hit and miss counters taken when it is read, so the requests pay nothing
+            for it. The ratio covers the time since the newest snapshot at least window seconds old,
+            or since the start until the first such snapshot exists.
+        :param hits: Counter
+            The counter of the hits.
+        :param misses: Counter
+            The counter of the misses.
+        :param window: float, default = 60.0
+            The seconds covered by the ratio.
+        :param clock: callable, default = time.monotonic
+            The function returning the current time.
+        '''
+        self.hits = hits
+        self.misses = misses
+        self.window = window
+        self.clock = clock
+        self.snapshots = collections.deque([(clock(), 0, 0)])
+        self.lock = threading.Lock()
+
+    def ratio(self) -> float:
+        '''
+            This function returns the ratio of the hits of the window, NaN if there were no reads.
+        '''
+        now, hits, misses = self.clock(), self.hits.value, self.misses.value
+        with self.lock:
+            self.snapshots.append((now, hits, misses))
+            # Keeping the newest snapshot older than the window as the start of the window.
+            while len(self.snapshots) > 2 and self.snapshots[1][0] <= now - self.window:
+                self.snapshots.popleft()
+            _, start_hits, start_misses = self.snapshots[0]
+        hits, total = hits - start_hits, hits - start_hits + misses - start_misses
+        return hits / total if total else float("nan")
+
+
+class RequestMetrics:
+    def __init__(self, metrics_registry : MetricsRegistry, route : str):
+        '''
+            The constructor of the Request Metrics, the metrics of the requests of one route of the gateway.
+        :param metrics_registry: MetricsRegistry
+            The registry the metrics are added to.
+        :param route: str
+            The name of the route.
+        '''
+        labels = {"route" : route}
+        self.requests = metrics_registry.counter("cache_requests_total", "The number of processed requests.", labels)
+        self.errors = metrics_registry.counter("cache_request_errors_total", "The number of requests answered with an error status.", labels)
+        self.duration = metrics_registry.histogram("cache_request_duration_seconds", "The time spent processing the requests.", labels)
+
+    def record(self, duration : float, status_code : int):
+        '''
+            This function records a processed request.
+        :param duration: float
+            The processing time in seconds.
+        :param status_code: int
+            The status code of the response.
+        '''
+        self.requests.inc()
+        if status_code >= 400:
+            self.errors.inc()
+        self.duration.observe(duration)
+
+
+# The kinds of the Memcached calls in the metrics of the nodes.
+OPERATION_KINDS = {
+    "get" : "get",
+    "get_many" : "get",
+    "set" : "set",
+    "add" : "set",
+    "set_many" : "set",
+    "delete" : "delete",
+    "delete_many" : "delete"
+}
+
+
+class NodeMetrics:
+    def __init__(self, metrics_registry : MetricsRegistry, node : str, window : float = 60.0):
+        '''
+            The constructor of the Node Metrics, the metrics of the calls to one Memcached service of the ring.
+        :param metrics_registry: MetricsRegistry
+            The registry the metrics are added to.
+        :param node: str
+            The name of the node.
+        :param window: float, default = 60.0
+            The seconds covered by the rolling hit ratio.
+        '''
+        labels = {"node" : node}
+        self.hits = metrics_registry.counter("cache_node_hits_total", "The number of keys found by the reads.", labels)
+        self.misses = metrics_registry.counter("cache_node_misses_total", "The number of keys not found by the reads.", labels)
+        self.sets = metrics_registry.counter("cache_node_sets_total", "The number of keys sent by the writes.", labels)
+        self.errors = metrics_registry.counter("cache_node_errors_total", "The number of failed calls.", labels)
+        self.bytes_read = metrics_registry.counter("cache_node_read_bytes_total", "The size of the read values.", labels)
+        self.bytes_written = metrics_registry.counter("cache_node_written_bytes_total", "The size of the written values.", labels)
+        self.durations = {
+            kind : metrics_registry.histogram("cache_node_call_duration_seconds", "The duration of the Memcached calls.",
+                                              dict(labels, operation=kind))
+            for kind in sorted(set(OPERATION_KINDS.values()))
+        }
+        self.hit_ratio = RollingRatio(self.hits, self.misses, window)
+        metrics_registry.gauge("cache_node_hit_ratio", f"The hit ratio of the reads of the last {window:.0f} seconds.",
+                               self.hit_ratio.ratio, labels)
+
+    def record(self, operation : str, duration : float, argument, result):
+        '''
+            This function records a successful call.
+        :param operation: str
+            The name of the called function of the client.
+        :param duration: float
+            The duration of the call in seconds.
+        :param argument: any
+            The key or the keys (or the values) of the call.
+        :param result: any
+            The result of the call.
+        '''
+        if operation == "get":
+            if result is not None:
+                self.hits.inc()
+            else:
+                self.misses.inc()
+        elif operation == "get_many":
+            if result:
+                self.hits.inc(len(result))
+            if len(argument) > len(result):
+                self.misses.inc(len(argument) - len(result))
+        elif operation == "set_many":
+            # The result of set_many is the list of the keys that weren't stored.
+            self.sets.inc(len(argument) - len(result or []))
+        elif operation in ("set", "add"):
+            self.sets.inc()
+        self.durations[OPERATION_KINDS[operation]].observe(duration)
+
+
+class MeteredSerde:
+    def __init__(self, serde, node_metrics : NodeMetrics):
+        '''
+            The constructor of the Metered Serde, it counts the bytes read and written by the clients of one node.
+        :param serde: any
+            The serializer of the values.
+        :param node_metrics: NodeMetrics
+            The metrics of the node.
+        '''
+        self.serde = serde
+        self.node_metrics = node_metrics
+
+    def serialize(self, key, value) -> tuple:
+        data, flags = self.serde.serialize(key, value)
+        self.node_metrics.bytes_written.inc(len(data))
+        return data, flags
+
+    def deserialize(self, key, data, flags : int):
+        self.node_metrics.bytes_read.inc(len(data))
+        return self.serde.deserialize(key, data, flags)
\ No newline at end of file
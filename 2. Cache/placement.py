@@ -0,0 +1,200 @@
+# Importing all needed modules.
+from hash_ring import HashRing, stable_hash
+
+# The mask keeping the arithmetic of the hashes on 64 bits.
+MASK_64 = (1 << 64) - 1
+
+
+def mix64(value : int) -> int:
+    '''
+        This function scrambles a 64-bit integer (the splitmix64 finalizer), it is used to combine
+        the hashes of a key and a node without hashing their strings again.
+    '''
+    value = (value ^ (value >> 30)) * 0xBF58476D1CE4E5B9 & MASK_64
+    value = (value ^ (value >> 27)) * 0x94D049BB133111EB & MASK_64
+    return value ^ (value >> 31)
+
+def jump_hash(key_hash : int, buckets : int) -> int:
+    '''
+        This function returns the bucket of a key with the jump consistent hash of Lamping and Veach.
+    :param key_hash: int
+        The 64-bit hash of the key.
+    :param buckets: int
+        The number of buckets.
+    :return: int
+        The bucket, between 0 and buckets - 1.
+    '''
+    bucket, jump = -1, 0
+    while jump < buckets:
+        bucket = jump
+        key_hash = (key_hash * 2862933555777941757 + 1) & MASK_64
+        jump = int((bucket + 1) * ((1 << 31) / ((key_hash >> 33) + 1)))
+    return bucket
+
+
+class Placement:
+    def __init__(self, nodes : dict = None, epoch : int = 0):
+        '''
+            The constructor of the Placement, the base of the strategies placing the keys on the nodes.
+            A strategy has the interface of HashRing, so the gateways use any of them in its place.
+        :param nodes: dict, default = None
+            The nodes, the names mapped to the nodes (for example the Memcached clients).
+        :param epoch: int, default = 0
+            The version of the membership, every change of the nodes increases it.
+        '''
+        self.epoch = epoch
+        self.nodes = dict(nodes or {})
+        self.rebuild()
+
+    def rebuild(self):
+        '''
+            This function recomputes the lookup structures of the strategy after a change of the nodes.
+        '''
+
+    def add_node(self, name : str, node):
+        self.nodes[name] = node
+        self.rebuild()
+
+    def remove_node(self, name : str):
+        del self.nodes[name]
+        self.rebuild()
+
+    def get_node_names(self, key, count : int) -> list:
+        '''
+            This function returns the names of the node responsible for the key and of its fallbacks.
+        :param key: any
+            The key.
+        :param count: int
+            The number of distinct nodes, at most the number of nodes.
+        :return: list
+            The names of the nodes, the responsible one first.
+        '''
+        raise NotImplementedError
+
+    def get_node_name(self, key) -> str:
+        return self.get_node_names(key, 1)[0]
+
+    def get_node(self, key):
+        return self.nodes[self.get_node_name(key)]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+
+class JumpHash(Placement):
+    '''
+        The jump consistent hash, without any memory besides the names of the nodes and the fastest to build.
+        The nodes are buckets in the order they were added, so the configuration must list them in the same order
+        in every gateway. Adding a node or removing the last one moves the minimal share of the keys,
+        removing a node from the middle renumbers the nodes after it.
+    '''
+
+    def rebuild(self):
+        self.names = list(self.nodes)
+
+    def get_node_names(self, key, count : int) -> list:
+        if not self.names:
+            raise LookupError("The placement has no nodes")
+        bucket = jump_hash(stable_hash(key), len(self.names))
+        return [self.names[(bucket + offset) % len(self.names)] for offset in range(min(count, len(self.names)))]
+
+
+class Rendezvous(Placement):
+    '''
+        The rendezvous (highest random weight) hashing, every node scores every key and the highest score wins.
+        A change of the nodes moves only the keys of the changed node, but a lookup costs one score per node.
+    '''
+
+    def rebuild(self):
+        self.seeds = [(stable_hash(name), name) for name in sorted(self.nodes)]
+
+    def get_node_names(self, key, count : int) -> list:
+        if not self.seeds:
+            raise LookupError("The placement has no nodes")
+        key_hash = stable_hash(key)
+        if count == 1:
+            return [max(self.seeds, key=lambda seed: mix64(key_hash ^ seed[0]))[1]]
+        scores = sorted(((mix64(key_hash ^ seed), name) for seed, name in self.seeds), reverse=True)
+        return [name for _, name in scores[:count]]
+
+
+class Maglev(Placement):
+    def __init__(self, nodes : dict = None, table_size : int = 65537, epoch : int = 0):
+        '''
+            The constructor of the Maglev placement, a lookup table filled by the permutations of the nodes.
+            A lookup is one table access, the table balances the keys almost perfectly, a change of the nodes
+            moves slightly more than the minimal share of the keys.
+        :param nodes: dict, default = None
+            The nodes, the names mapped to the nodes.
+        :param table_size: int, default = 65537
+            The number of entries of the table, a prime much larger than the number of nodes.
+        :param epoch: int, default = 0
+            The version of the membership.
+        '''
+        self.table_size = table_size
+        super().__init__(nodes, epoch)
+
+    def rebuild(self):
+        '''
+            This function fills the table, the nodes take turns claiming their next preferred free entry.
+        '''
+        names = sorted(self.nodes)
+        self.table = [None] * self.table_size
+        if not names:
+            return
+        offsets = [stable_hash(f"{name}#offset") % self.table_size for name in names]
+        skips = [stable_hash(f"{name}#skip") % (self.table_size - 1) + 1 for name in names]
+        next_choices = [0] * len(names)
+        filled = 0
+        while True:
+            for index, name in enumerate(names):
+                entry = (offsets[index] + next_choices[index] * skips[index]) % self.table_size
+                while self.table[entry] is not None:
+                    next_choices[index] += 1
+                    entry = (offsets[index] + next_choices[index] * skips[index]) % self.table_size
+                self.table[entry] = name
+                next_choices[index] += 1
+                filled += 1
+                if filled == self.table_size:
+                    return
+
+    def get_node_names(self, key, count : int) -> list:
+        if not self.nodes:
+            raise LookupError("The placement has no nodes")
+        count = min(count, len(self.nodes))
+        entry = stable_hash(key) % self.table_size
+        names = [self.table[entry]]
+        # The fallbacks are the next distinct nodes of the table, like the successors on the ring.
+        while len(names) < count:
+            entry = (entry + 1) % self.table_size
+            if self.table[entry] not in names:
+                names.append(self.table[entry])
+        return names
+
+
+# The strategies selectable in the configuration of the gateways.
+PLACEMENT_STRATEGIES = {
+    "ring" : HashRing,
+    "jump" : JumpHash,
+    "rendezvous" : Rendezvous,
+    "maglev" : Maglev
+}
+
+
+def create_placement(nodes : dict, strategy : str = "ring", epoch : int = 0, **options):
+    '''
+        This function creates the placement of the nodes with the chosen strategy.
+    :param nodes: dict
+        The nodes, the names mapped to the nodes.
+    :param strategy: str, default = "ring"
+        "ring", "jump", "rendezvous" or "maglev".
+    :param epoch: int, default = 0
+        The version of the membership.
+    :param options: dict
+        The options of the strategy, for example virtual_nodes of the ring or table_size of Maglev.
+    :return: any
+        The placement, with the interface of HashRing.
+    '''
+    if strategy not in PLACEMENT_STRATEGIES:
+        raise ValueError(f"Unknown placement strategy {strategy}, expected one of {', '.join(PLACEMENT_STRATEGIES)}")
+    return PLACEMENT_STRATEGIES[strategy](nodes, epoch=epoch, **options)
\ No newline at end of file
@@ -0,0 +1,130 @@
+# Importing all needed modules.
+import itertools
+import threading
+import requests
+
+
+class UserStoreError(Exception):
+    '''
+        The error raised when no service of the data store answered or the answer is an error.
+    '''
+
+
+class UserStore:
+    def __init__(self, urls : list, timeout : float = 1.0):
+        '''
+            The constructor of the User Store, the client of the distributed data store loading the users missing
+            from the cache. Every service of the data store has all the users, so the reads are spread over them
+            and a failed service is skipped.
+        :param urls: list
+            The base URLs of the services of the data store.
+        :param timeout: float, default = 1.0
+            The seconds to wait for a service.
+        '''
+        self.urls = urls
+        self.timeout = timeout
+        self.next_start = itertools.cycle(range(len(urls)))
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+
+        # The statistics of the loads.
+        self.requests = 0
+        self.loaded = 0
+        self.missing = 0
+        self.failed = 0
+
+    def request(self, path : str, body : dict = None) -> requests.Response:
+        '''
+            This function sends a GET request to the services of the data store, one after another until one answers.
+        :param path: str
+            The path of the request.
+        :param body: dict, default = None
+            The JSON body of the request.
+        :return: requests.Response
+            The response of the first service that answered.
+        '''
+        with self.lock:
+            start = next(self.next_start)
+            self.requests += 1
+        error = None
+        for offset in range(len(self.urls)):
+            url = self.urls[(start + offset) % len(self.urls)]
+            try:
+                return self.session.get(f"{url}{path}", json=body, timeout=self.timeout)
+            except requests.RequestException as request_error:
+                error = request_error
+        with self.lock:
+            self.failed += 1
+        raise UserStoreError(f"No service of the data store answered: {error}")
+
+    def check(self, response : requests.Response):
+        '''
+            This function raises the UserStoreError for an error response of the data store.
+        '''
+        if response.status_code >= 400:
+            with self.lock:
+                self.failed += 1
+            raise UserStoreError(f"The data store answered {response.status_code}: {response.text[:200]}")
+
+    def count(self, loaded : int, missing : int):
+        with self.lock:
+            self.loaded += loaded
+            self.missing += missing
+
+    def get_user(self, user_id) -> dict:
+        '''
+            This function loads one user with GET /user/<index>.
+        :param user_id: any
+            The id of the user in the data store.
+        :return: dict or None
+            The user or None if the data store doesn't have it.
+        '''
+        response = self.request(f"/user/{user_id}")
+        if response.status_code == 404:
+            self.count(0, 1)
+            return None
+        self.check(response)
+        self.count(1, 0)
+        return response.json()
+
+    def get_users(self, users_id : list) -> dict:
+        '''
+            This function loads many users with one bulk GET /user request.
+            The data store answers 404 with the missing ids if any user is missing, then the present users
+            are requested again.
+        :param users_id: list
+            The ids of the users in the data store.
+        :return: dict
+            The found users mapped by their ids.
+        '''
+        users_id = list(dict.fromkeys(str(user_id) for user_id in users_id))
+        if not users_id:
+            return {}
+        response = self.request("/user", {"users_id" : users_id})
+        if response.status_code == 404:
+            missing_ids = set(response.json().get("ids", []))
+            present_ids = [user_id for user_id in users_id if user_id not in missing_ids]
+            if not present_ids:
+                self.count(0, len(users_id))
+                return {}
+            response = self.request("/user", {"users_id" : present_ids})
+            # Another miss means the users were deleted in between, they are reported as missing.
+            if response.status_code == 404:
+                self.count(0, len(users_id))
+                return {}
+        self.check(response)
+        users = response.json()
+        self.count(len(users), len(users_id) - len(users))
+        return users
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the loads.
+        '''
+        with self.lock:
+            return {
+                "requests" : self.requests,
+                "loaded" : self.loaded,
+                "missing" : self.missing,
+                "failed" : self.failed
+            }
\ No newline at end of file
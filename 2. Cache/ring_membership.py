@@ -0,0 +1,86 @@
+# Importing all needed modules.
+import collections
+import threading
+from hash_ring import HashRing
+from ttl_policy import MAX_TTL
+
+
+class RecentKeys:
+    def __init__(self, max_keys : int = 10000):
+        '''
+            The constructor of the Recent Keys, the most recently used keys of the gateway.
+            They are the keys copied to their new nodes when the ring changes.
+        :param max_keys: int, default = 10000
+            The maximal number of remembered keys, the least recently used ones are forgotten.
+        '''
+        self.max_keys = max_keys
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def record(self, key):
+        '''
+            This function remembers a used key.
+        '''
+        with self.lock:
+            self.entries[key] = None
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_keys:
+                self.entries.popitem(last=False)
+
+    def keys(self) -> list:
+        '''
+            This function returns the remembered keys, the most recently used ones first.
+        '''
+        with self.lock:
+            return list(reversed(self.entries))
+
+
+def moved_keys(old_ring : HashRing, new_ring : HashRing, keys : list) -> dict:
+    '''
+        This function finds the keys owned by other nodes in the new ring.
+    :param old_ring: HashRing
+        The ring before the change.
+    :param new_ring: HashRing
+        The ring after the change.
+    :param keys: list
+        The keys to check.
+    :return: dict
+        The pairs (old node name, new node name) mapped to the lists of their moved keys.
+    '''
+    moves = {}
+    for key in keys:
+        old_name, new_name = old_ring.get_node_name(key), new_ring.get_node_name(key)
+        if old_name != new_name:
+            moves.setdefault((old_name, new_name), []).append(key)
+    return moves
+
+def warm_keys(old_ring : HashRing, new_ring : HashRing, keys : list, expire : int = MAX_TTL) -> dict:
+    '''
+        This function copies the values of the moved keys from their old nodes to their new nodes.
+        The values are added, not set, so a value saved to the new node during the copy is never overwritten.
+    :param old_ring: HashRing
+        The ring before the change.
+    :param new_ring: HashRing
+        The ring after the change.
+    :param keys: list
+        The keys to copy if they moved, usually the recently used ones.
+    :param expire: int, default = MAX_TTL
+        The expire time of the copied values, Memcached doesn't return the remaining one.
+    :return: dict
+        The numbers of the moved, copied and failed keys.
+    '''
+    result = {"moved" : 0, "copied" : 0, "failed" : 0}
+    for (old_name, new_name), names_keys in moved_keys(old_ring, new_ring, keys).items():
+        result["moved"] += len(names_keys)
+        try:
+            values = old_ring.nodes[old_name].get_many(names_keys)
+        except Exception:
+            result["failed"] += len(names_keys)
+            continue
+        for key, value in values.items():
+            try:
+                new_ring.nodes[new_name].add(key, value, expire=expire)
+                result["copied"] += 1
+            except Exception:
+                result["failed"] += 1
+    return result
\ No newline at end of file
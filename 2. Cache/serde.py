@@ -0,0 +1,121 @@
+# Importing all needed modules.
+import json
+import threading
+import zlib
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# The Memcached flags of the values, the bits below 8 are left to the formats of pymemcache,
+# so the values saved by the old gateways (raw bytes and text) are still read.
+FLAG_BYTES = 0
+FLAG_TEXT = 1 << 4
+FLAG_JSON = 1 << 8
+FLAG_MSGPACK = 1 << 9
+FLAG_ZLIB = 1 << 10
+
+
+class CompactSerde:
+    def __init__(self, compress_threshold : int = 1024, compression_level : int = 1, use_msgpack : bool = True):
+        '''
+            The constructor of the Compact Serde, the serializer of the cached values for pymemcache.
+            The dicts and lists are encoded with msgpack (or compact JSON if msgpack isn't installed),
+            the encoded values over the threshold are compressed with zlib. The format of every value is
+            kept in its Memcached flags, so the values of all the formats can be read.
+        :param compress_threshold: int, default = 1024
+            The minimal size in bytes of the encoded value to be compressed, 0 disables the compression.
+        :param compression_level: int, default = 1
+            The zlib compression level.
+        :param use_msgpack: bool, default = True
+            False to encode the values with JSON even if msgpack is installed.
+        '''
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        self.use_msgpack = use_msgpack and msgpack is not None
+
+        # The statistics of the serialized values.
+        self.lock = threading.Lock()
+        self.values = 0
+        self.encoded_bytes = 0
+        self.stored_bytes = 0
+        self.compressed = 0
+
+    def encode(self, value) -> tuple:
+        '''
+            This function encodes a value without the compression.
+        :return: bytes, int
+            The encoded value.
+            The flags of the format.
+        '''
+        if isinstance(value, bytes):
+            return value, FLAG_BYTES
+        if isinstance(value, str):
+            return value.encode("utf-8"), FLAG_TEXT
+        if self.use_msgpack:
+            return msgpack.packb(value, use_bin_type=True), FLAG_MSGPACK
+        return json.dumps(value, separators=(",", ":")).encode("utf-8"), FLAG_JSON
+
+    def serialize(self, key, value) -> tuple:
+        '''
+            This function serializes a value saved in Memcached.
+        :param key: str
+            The key of the value.
+        :param value: any
+            The value.
+        :return: bytes, int
+            The stored value.
+            The Memcached flags.
+        '''
+        data, flags = self.encode(value)
+        encoded_size = len(data)
+        if self.compress_threshold and encoded_size >= self.compress_threshold:
+            compressed = zlib.compress(data, self.compression_level)
+            if len(compressed) < encoded_size:
+                data, flags = compressed, flags | FLAG_ZLIB
+
+        with self.lock:
+            self.values += 1
+            self.encoded_bytes += encoded_size
+            self.stored_bytes += len(data)
+            self.compressed += bool(flags & FLAG_ZLIB)
+        return data, flags
+
+    def deserialize(self, key, data : bytes, flags : int):
+        '''
+            This function deserializes a value read from Memcached.
+        :param key: str
+            The key of the value.
+        :param data: bytes
+            The stored value.
+        :param flags: int
+            The Memcached flags.
+        :return: any
+            The value.
+        '''
+        if flags & FLAG_ZLIB:
+            data = zlib.decompress(data)
+        if flags & FLAG_MSGPACK:
+            if msgpack is None:
+                raise ValueError(f"The value of {key} is encoded with msgpack, which isn't installed")
+            return msgpack.unpackb(data, raw=False)
+        if flags & FLAG_JSON:
+            return json.loads(data)
+        if flags & FLAG_TEXT:
+            return data.decode("utf-8")
+        return data
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the serialized values.
+        '''
+        with self.lock:
+            return {
+                "format" : "msgpack" if self.use_msgpack else "json",
+                "values" : self.values,
+                "encoded_bytes" : self.encoded_bytes,
+                "stored_bytes" : self.stored_bytes,
+                "saved_bytes" : self.encoded_bytes - self.stored_bytes,
+                "compressed" : self.compressed
+            }
\ No newline at end of file
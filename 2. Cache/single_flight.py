@@ -0,0 +1,94 @@
+# Importing all needed modules.
+import threading
+
+
+class Call:
+    def __init__(self):
+        '''
+            The constructor of the Call, the outstanding call of one key shared by the waiting requests.
+        '''
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, max_waiters : int = 1000, timeout : float = 1.0):
+        '''
+            The constructor of the Single Flight, it coalesces the concurrent calls for the same key.
+            The first request of a key makes the call, the next ones wait for its result.
+        :param max_waiters: int, default = 1000
+            The maximal number of requests waiting for one call, the next ones make their own calls.
+        :param timeout: float, default = 1.0
+            The seconds a request waits for the call before a TimeoutError.
+        '''
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self.calls = {}
+        self.lock = threading.Lock()
+
+        # The statistics of the coalescing.
+        self.calls_made = 0
+        self.coalesced = 0
+        self.overflows = 0
+        self.timeouts = 0
+
+    def do(self, key, function):
+        '''
+            This function returns the result of the function, shared by all the concurrent requests of the key.
+        :param key: any
+            The key identifying the call.
+        :param function: callable
+            The function making the call.
+        :return: any
+            The result of the function, the errors of the function are raised to all the waiting requests.
+        '''
+        with self.lock:
+            call = self.calls.get(key)
+            if call is None:
+                call = self.calls[key] = Call()
+                self.calls_made += 1
+                leader = True
+            elif call.waiters >= self.max_waiters:
+                self.overflows += 1
+                call, leader = None, False
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        # Making an own call if too many requests already wait for the key.
+        if call is None:
+            return function()
+
+        if leader:
+            try:
+                call.result = function()
+            except Exception as error:
+                call.error = error
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+        elif not call.done.wait(self.timeout):
+            with self.lock:
+                self.timeouts += 1
+            raise TimeoutError(f"The call for {key} took more than {self.timeout} seconds")
+
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the coalescing.
+        '''
+        with self.lock:
+            return {
+                "calls" : self.calls_made,
+                "coalesced" : self.coalesced,
+                "overflows" : self.overflows,
+                "timeouts" : self.timeouts,
+                "in_flight" : len(self.calls)
+            }
\ No newline at end of file
@@ -0,0 +1,131 @@
+# Importing all needed modules.
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# The key marking the values saved with their soft expire time.
+ENVELOPE_KEY = "__soft_expires_at__"
+
+# The hard TTL of the cached users when no loader refreshes them, the other copies of a user
+# (the L1 cache, the keys warmed on a new node) never live longer.
+MAX_TTL = 30
+
+
+class TTLPolicy:
+    def __init__(self, classes : dict, rules : list = None, default : str = "default"):
+        '''
+            The constructor of the TTL Policy, it chooses the soft and hard TTL of every saved value.
+            Until the soft TTL the value is fresh, between the soft and the hard TTL it is stale but still served,
+            after the hard TTL Memcached drops it.
+        :param classes: dict
+            The names of the TTL classes mapped to {"soft_ttl" : seconds, "hard_ttl" : seconds}.
+        :param rules: list, default = None
+            The rules choosing the classes, the first matching one is used, for example
+            {"prefix" : "session-", "class" : "volatile"} on the key or {"field" : "active", "value" : False, "class" : "long"}
+            on the value.
+        :param default: str, default = "default"
+            The class of the values matching no rule.
+        '''
+        for name, ttl_class in classes.items():
+            if not 0 < ttl_class["soft_ttl"] <= ttl_class["hard_ttl"]:
+                raise ValueError(f"The soft TTL of {name} must be positive and not longer than its hard TTL")
+        self.classes = classes
+        self.rules = rules or []
+        self.default = default
+
+    def classify(self, key, value) -> str:
+        '''
+            This function returns the name of the TTL class of a value.
+        '''
+        for rule in self.rules:
+            if "prefix" in rule and str(key).startswith(rule["prefix"]):
+                return rule["class"]
+            if "field" in rule and isinstance(value, dict) and value.get(rule["field"]) == rule["value"]:
+                return rule["class"]
+        return self.default
+
+    def wrap(self, key, value) -> tuple:
+        '''
+            This function puts the value in an envelope with its soft expire time.
+        :param key: any
+            The key of the value.
+        :param value: any
+            The value.
+        :return: dict, int
+            The envelope saved in Memcached.
+            The hard TTL, used as the Memcached expire time.
+        '''
+        ttl_class = self.classes[self.classify(key, value)]
+        return {ENVELOPE_KEY : time.time() + ttl_class["soft_ttl"], "value" : value}, ttl_class["hard_ttl"]
+
+    @staticmethod
+    def unwrap(cached_value) -> tuple:
+        '''
+            This function takes the value out of its envelope.
+        :param cached_value: any
+            The value read from Memcached, the values saved without an envelope are fresh.
+        :return: any, bool
+            The value.
+            True if the value passed its soft TTL.
+        '''
+        if isinstance(cached_value, dict) and ENVELOPE_KEY in cached_value:
+            return cached_value["value"], cached_value[ENVELOPE_KEY] <= time.time()
+        return cached_value, False
+
+
+class BackgroundRefresher:
+    def __init__(self, refresh, max_workers : int = 4):
+        '''
+            The constructor of the Background Refresher, it refreshes the stale values off the request path.
+            A key is refreshed by one task at a time, however many requests find it stale.
+        :param refresh: callable
+            The function refreshing the value of a key.
+        :param max_workers: int, default = 4
+            The number of threads running the refreshes.
+        '''
+        self.refresh = refresh
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.pending = set()
+        self.lock = threading.Lock()
+
+        # The statistics of the refreshes.
+        self.scheduled = 0
+        self.deduplicated = 0
+        self.failed = 0
+
+    def schedule(self, key) -> bool:
+        '''
+            This function schedules the refresh of a key, unless it is already scheduled.
+        :return: bool
+            True if a new refresh was scheduled.
+        '''
+        with self.lock:
+            if key in self.pending:
+                self.deduplicated += 1
+                return False
+            self.pending.add(key)
+            self.scheduled += 1
+        self.executor.submit(self.run, key)
+        return True
+
+    def run(self, key):
+        try:
+            self.refresh(key)
+        except Exception:
+            with self.lock:
+                self.failed += 1
+        finally:
+            with self.lock:
+                self.pending.discard(key)
+
+    def stats(self) -> dict:
+        '''
+            This function returns the statistics of the refreshes.
+        '''
+        with self.lock:
+            return {
+                "scheduled" : self.scheduled,
+                "deduplicated" : self.deduplicated,
+                "failed" : self.failed,
+                "pending" : len(self.pending)
+            }
\ No newline at end of file